@@ -1,38 +1,176 @@
 #!/usr/bin/python3
-# Last Modified at Nov 25, 2025
+# Last Modified at Oct 19, 2026
 
+"""@file baseline.py
+@brief  Profile every image in `stable_args.json` with its stable arguments.
+@author Haney Kang
+
+@details
+Profiles are memoized in a content-addressed cache (core.cache). An image is
+profiled again only when its digest, its create kwargs, `inst.c` or the
+monitoring duration changed.
+
+A sweep is journaled (core.journal, `<result_dir>/journal.jsonl`): after a crash,
+running it again removes the containers left behind, keeps every profile already
+collected and profiles only the images which were not finished.
+"""
 
 import os
 import json
-from core.container import Container
-from monitoring.agent import MonitoringAgent
-
-if os.geteuid() != 0:
-    print("Run as super user")
-    exit(0)
-
-done = list(map(lambda f: f[:-5], os.listdir("result")))
-
-from pprint import pprint
-
-with open("stable_args.json") as f:
-    container_args = json.load(f)
-
-for k, v in container_args.items():
-    if k in done:
-        continue
-    container = Container(img=k, **v)
-    monitoring = MonitoringAgent(60)
-    monitoring.start()
-    container.start()
-    monitoring.notify(container)
-    ev = monitoring.get_result_monitoring()
-    container.clean()
-
-    if ev is None:
-        print(f"No data: {k}")
-    else:
-        #        print(ev.syscalls())
-        #        print(ev.capabilities())
-        with open(f"result/{k}.json", "w") as f:
-            json.dump(ev.syscalls(), f, indent=4)
+import logging
+from time import sleep
+from typing import Any, Dict, Optional
+
+from core.cache import ProfileCache
+from core.container import Container, get_client, image_digest, result_name
+from core.journal import Journal
+from core.metrics import metrics
+from monitoring.agent import MonitoringSession
+
+
+def profile(
+    img: str,
+    kwargs: Dict[str, Any],
+    duration: int,
+    session: Optional[MonitoringSession] = None,
+    journal: Optional[Journal] = None,
+    digest: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    @brief Run one monitoring session for an image.
+
+    @param  img         Image reference.
+    @param  kwargs      Create kwargs of the container.
+    @param  duration    Monitoring window in seconds.
+    @param  session     Loaded session shared by a sweep (a private one is loaded if None).
+    @param  journal     Journal recording each state of the image (and its container id).
+    @param  digest      Image digest stored in the record.
+    @return Profile record or None if no data has been collected.
+    """
+    own_session = session is None
+    if own_session:
+        session = MonitoringSession()
+    if journal is not None:
+        kwargs = {
+            **kwargs,
+            "labels": {**(kwargs.get("labels") or {}), **journal.labels(img)},
+        }
+
+    def note(state: str, **fields):
+        if journal is not None:
+            journal.record(img, state, **fields)
+
+    container = None
+    window = False
+    try:
+        session.open_window()  # Probes of an on-demand session run from before the start
+        window = True
+        container = Container(img=img, **kwargs)
+        note("created", cid=container.container_id)
+        container.start()
+        if container.get_pid() <= 0:
+            return None
+        note("started", pid=container.pid)
+
+        note("monitoring")
+        sleep(duration)
+        ev = session.snapshot(container)
+        session.forget(container)
+        if ev is None:
+            return None
+        record = {"image": img, **ev.profile.to_json()}
+        if digest is not None:
+            record["digest"] = digest
+        note("collected", profile=record)
+        return record
+    finally:
+        if window:
+            session.close_window()
+        if container is not None:
+            container.clean()
+            note("cleaned")
+        if own_session:
+            session.cleanup()
+
+
+def sweep(
+    args_file: str = "stable_args.json",
+    result_dir: str = "result",
+    duration: int = 60,
+    metrics_file: Optional[str] = None,
+    session: Optional[MonitoringSession] = None,
+):
+    """
+    @brief Profile all images of `args_file`, reusing cached profiles and resuming a crashed sweep.
+
+    @param args_file    JSON file of {image: create kwargs}.
+    @param result_dir   Directory of `<image>.json` results (syscall numbers).
+    @param duration     Monitoring window in seconds.
+    @param metrics_file Write runtime metrics (OpenMetrics text) here at the end.
+    @param session      Loaded session (e.g. on core.fake.FakeBPF). Loaded once for the sweep if None.
+    """
+    journal = Journal(os.path.join(result_dir, "journal.jsonl"))
+    journal.reap(get_client())
+
+    with open(args_file) as f:
+        container_args = json.load(f)
+
+    own_session = session is None
+    if own_session:
+        # Probes detached while images are pulled, their run time accounted for --metrics
+        session = MonitoringSession(ondemand=True, stats=metrics_file is not None)
+    ## Profiles of another backend, or of another build of its program, are not reused
+    cache = ProfileCache(os.path.join(result_dir, "cache"), session.program_file)
+    program = {"backend": session.backend, "duration": duration}
+    try:
+        for k, v in container_args.items():
+            record = journal.profile(k)
+            if (
+                record is not None
+            ):  # Collected before a crash: only write its outputs again
+                logging.info(f"[baseline] {k} already profiled in this sweep.")
+                key = cache.key(record["digest"], v, **program)
+                cached = False
+            else:
+                digest = image_digest(k, pull=True)
+                if digest is None:
+                    print(f"No image: {k}")
+                    continue
+
+                key = cache.key(digest, v, **program)
+                record = cache.get(key)
+                cached = record is not None
+                if cached:
+                    journal.record(k, "collected", profile=record, cached=True)
+                else:
+                    record = profile(k, v, duration, session, journal, digest)
+                    if record is None:
+                        print(f"No data: {k}")
+                        continue
+
+            if not cached:
+                cache.put(key, record)
+            with open(os.path.join(result_dir, f"{result_name(k)}.json"), "w") as f:
+                json.dump(record["syscalls"], f, indent=4)
+        journal.finish()
+    finally:
+        journal.close()
+        if own_session:
+            session.cleanup()  # Collects probe statistics and map occupancy first
+        elif metrics_file:
+            session.collect()
+
+    logging.info(cache.summary())
+    metrics.set("cache_hits", cache.hits, "Profile cache hits", kind="counter")
+    metrics.set("cache_misses", cache.misses, "Profile cache misses", kind="counter")
+    metrics.log_summary()
+    if metrics_file:
+        metrics.write(metrics_file)
+
+
+if __name__ == "__main__":
+    if os.geteuid() != 0:
+        print("Run as super user")
+        exit(0)
+
+    sweep()
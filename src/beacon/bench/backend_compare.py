@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file backend_compare.py
+@brief  Compare the BCC and libbpf (CO-RE) backends: startup time and per-event cost.
+@author Haney Kang
+
+@details
+Startup is the time MonitoringSession takes to be ready (compilation and attachment
+for BCC, relocation and attachment for libbpf), over `--loads` sessions. Per-event
+cost is the mean run time of the sys_enter program (kernel.bpf_stats_enabled) while
+a syscall-heavy container (`dd bs=1`) runs, as in bench/count_overhead.py.
+
+USAGE (from src/beacon, as root, after `make -C monitoring/ebpf`):
+    python -m bench.backend_compare [--loads 3] [--bytes 200000]
+"""
+
+import os
+import argparse
+from statistics import median
+from time import perf_counter, sleep
+
+from core.wrapper import set_bpf_stats
+from core.container import Container
+from monitoring.agent import MonitoringSession
+
+## Name of the raw_syscalls:sys_enter program of each backend
+SYS_ENTER = ("tracepoint__raw_syscalls__sys_enter", "sys_enter_btf", "sys_enter_tp")
+
+
+def sys_enter_stats(session: MonitoringSession):
+    for name, stats in session.bpf.prog_stats().items():
+        if name in SYS_ENTER:
+            return name, stats
+    raise KeyError("sys_enter program not found")
+
+
+def startup(backend: str, loads: int) -> float:
+    """
+    @return Median seconds until a session is ready.
+    """
+    times = []
+    for _ in range(loads):
+        init_time = perf_counter()
+        session = MonitoringSession(backend=backend)
+        times.append(perf_counter() - init_time)
+        session.cleanup()
+    return median(times)
+
+
+def per_event(backend: str, nbytes: int):
+    """
+    @return (program name, probe runs, mean ns per run, syscalls seen in the container)
+    """
+    session = MonitoringSession(backend=backend, stats=True)
+    container = Container(
+        img="alpine",
+        command=["dd", "if=/dev/zero", "of=/dev/null", "bs=1", f"count={nbytes}"],
+    )
+    try:
+        name, before = sys_enter_stats(session)
+        container.start()
+        container.namespace()
+        while container.alive():
+            sleep(0.01)
+        ev = session.snapshot(container) if container.alive() else None
+        _, after = sys_enter_stats(session)
+        runs, run_ns = after[0] - before[0], after[1] - before[1]
+        return (
+            name,
+            runs,
+            run_ns / max(runs, 1),
+            None if ev is None else len(ev.syscalls()),
+        )
+    finally:
+        container.clean()
+        session.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--loads", type=int, default=3)
+    parser.add_argument("--bytes", type=int, default=200000)
+    parser.add_argument("--backends", nargs="+", default=["bcc", "libbpf"])
+    args = parser.parse_args()
+
+    previous = set_bpf_stats(True)
+    try:
+        print(
+            f"{'backend':<8}{'startup s':>11}{'program':>38}{'probe runs':>12}{'ns/probe':>10}"
+        )
+        for backend in args.backends:
+            try:
+                ready = startup(backend, args.loads)
+                name, runs, ns, _ = per_event(backend, args.bytes)
+            except FileNotFoundError as e:
+                print(f"{backend:<8}skipped: {e}")
+                continue
+            print(f"{backend:<8}{ready:>11.3f}{name:>38}{runs:>12}{ns:>10.1f}")
+    finally:
+        set_bpf_stats(previous)
+
+
+if __name__ == "__main__":
+    if os.geteuid() != 0:
+        print("Run as super user")
+        exit(0)
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file count_overhead.py
+@brief  Benchmark the probe overhead of counting mode against bitmap-only mode.
+@author Haney Kang
+
+@details
+Each mode loads inst.c, runs a syscall-heavy container (`dd bs=1`, one read and one
+write per byte) and reads the run statistics of the `raw_syscalls:sys_enter` probe
+(kernel.bpf_stats_enabled). The probe also runs for untracked processes of the
+host, so the mean includes the cheap early-return path.
+
+USAGE (from src/beacon, as root):
+    python -m bench.count_overhead [--bytes 200000] [--runs 3]
+"""
+
+import os
+import argparse
+from time import sleep, time
+
+from core.BPF import RobustBPF
+from core.container import Container
+from core.wrapper import set_bpf_stats
+from monitoring.ebpf.types import Namespace_t, cast_data
+
+SRC = b"monitoring/ebpf/inst.c"
+PROBE = "tracepoint__raw_syscalls__sys_enter"
+MODES = {"bitmap": [], "count": ["-DBEACON_COUNT"]}
+
+
+def run_once(cflags, nbytes: int):
+    """
+    @brief Run one workload under a freshly loaded program.
+
+    @return (probe run count, probe run time in ns, workload seconds, histogram of the container)
+    """
+    bpf = RobustBPF(src_file=SRC, cflags=cflags)
+    container = Container(
+        img="alpine",
+        command=["dd", "if=/dev/zero", "of=/dev/null", "bs=1", f"count={nbytes}"],
+    )
+    try:
+        before = bpf.prog_stats()[PROBE]
+        init_time = time()
+        container.start()
+        ns = container.namespace()
+        while container.alive():
+            sleep(0.01)
+        elapsed = time() - init_time
+        after = bpf.prog_stats()[PROBE]
+
+        hist = {}
+        if cflags and ns is not None:
+            ev = cast_data(bpf["event"], bpf["sys_count"]).get(Namespace_t(**ns))
+            hist = ev.histogram() if ev is not None else {}
+        return after[0] - before[0], after[1] - before[1], elapsed, hist
+    finally:
+        container.clean()
+        bpf.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bytes", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    previous = set_bpf_stats(True)
+    try:
+        print(f"{'mode':<8}{'probe runs':>12}{'ns/probe':>10}{'workload s':>12}")
+        for mode, cflags in MODES.items():
+            cnt, ns, elapsed = 0, 0, 0.0
+            for _ in range(args.runs):
+                run_cnt, run_ns, run_elapsed, hist = run_once(cflags, args.bytes)
+                cnt, ns, elapsed = cnt + run_cnt, ns + run_ns, elapsed + run_elapsed
+                if cflags:
+                    # read(0) and write(1) are called once per byte
+                    assert (
+                        hist.get(0, 0) >= args.bytes and hist.get(1, 0) >= args.bytes
+                    ), hist
+            print(
+                f"{mode:<8}{cnt // args.runs:>12}{ns / max(cnt, 1):>10.1f}{elapsed / args.runs:>12.3f}"
+            )
+    finally:
+        set_bpf_stats(previous)
+
+
+if __name__ == "__main__":
+    if os.geteuid() != 0:
+        print("Run as super user")
+        exit(0)
+    main()
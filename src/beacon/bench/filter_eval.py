@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file filter_eval.py
+@brief  Benchmark the evaluation cost of generated seccomp filters.
+@author Haney Kang
+
+@details
+Cost is the mean number of cBPF instructions executed per syscall, weighted by a
+syscall distribution. The reference is Docker's default profile layout: a linear
+JEQ chain over its allow list in alphabetical order (as emitted by libseccomp
+without tree optimization). The allow list is approximated by every syscall of
+event_nametable.
+
+USAGE (from src/beacon):
+    python -m bench.filter_eval [--result result/nginx:latest.json] [--freq hist.json]
+"""
+
+import json
+import random
+import argparse
+from typing import Dict, List
+
+from event_nametable import syscalls
+from policy.cbpf import LAYOUTS, build_filter, expected_cost, run
+
+
+def zipf_freq(nums: List[int], seed: int = 0, s: float = 1.2) -> Dict[int, float]:
+    """
+    @brief Synthetic skewed distribution: a random ranking of `nums` with Zipf weights.
+    """
+    ranked = list(nums)
+    random.Random(seed).shuffle(ranked)
+    return {num: 1e6 / (rank + 1) ** s for rank, num in enumerate(ranked)}
+
+
+def p99(prog, freq: Dict[int, float]) -> int:
+    """Instructions executed at the 99th percentile of syscalls."""
+    steps = sorted((run(prog, num)[1], count) for num, count in freq.items())
+    total, acc = sum(freq.values()), 0.0
+    for step, count in steps:
+        acc += count
+        if acc >= 0.99 * total:
+            return step
+    return steps[-1][0] if steps else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--result", help="Result JSON (list of syscall numbers)")
+    parser.add_argument("--freq", help="Histogram JSON ({syscall number: count})")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.result:
+        with open(args.result) as f:
+            allowed = json.load(f)
+    else:
+        allowed = sorted(random.Random(args.seed).sample(sorted(syscalls), 120))
+
+    if args.freq:
+        with open(args.freq) as f:
+            freq = {int(num): count for num, count in json.load(f).items()}
+    else:
+        freq = zipf_freq(allowed, args.seed)
+
+    docker = sorted(syscalls, key=lambda num: syscalls[num])
+    progs = {"docker-default": build_filter(docker, "linear")}
+    for layout in LAYOUTS:
+        progs[layout] = build_filter(allowed, layout, freq)
+
+    print(f"{len(allowed)} allowed syscalls, {len(freq)} in distribution")
+    print(f"{'layout':<16}{'insns':>8}{'mean/syscall':>14}{'p99':>6}")
+    base = expected_cost(progs["docker-default"], freq)
+    for name, prog in progs.items():
+        cost = expected_cost(prog, freq)
+        print(
+            f"{name:<16}{len(prog):>8}{cost:>14.2f}{p99(prog, freq):>6}  ({cost / base * 100:.1f}%)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file key_modes.py
+@brief  Compare the namespace-tuple and cgroup-id keys of the maps.
+@author Haney Kang
+
+@details
+For each keying mode (default, -DBEACON_CGROUP_KEY):
+  - Probe cost: mean run time of the sys_enter program (kernel.bpf_stats_enabled)
+    while a syscall-heavy container (`dd bs=1`) runs, as in bench/count_overhead.py.
+  - Readiness: from the start request of a container to its map key being known
+    (lsns for namespace keys, /proc/<pid>/cgroup and a stat for cgroup ids), i.e.
+    the point from which its entry can be read, median over `--starts` containers.
+
+USAGE (from src/beacon, as root):
+    python -m bench.key_modes [--starts 5] [--bytes 200000] [--backend bcc]
+"""
+
+import os
+import argparse
+from statistics import median
+from time import perf_counter, sleep
+
+from core.wrapper import set_bpf_stats
+from core.container import Container
+from monitoring.agent import MonitoringSession
+from bench.backend_compare import sys_enter_stats
+
+MODES = {"namespace": False, "cgroup": True}
+
+
+def readiness(session: MonitoringSession, starts: int) -> float:
+    """
+    @return Median seconds from a start request to the container key.
+    """
+    times = []
+    for _ in range(starts):
+        container = Container(img="alpine", command=["sleep", "5"])
+        try:
+            init_time = perf_counter()
+            container.start()
+            if session._key(container) is None:
+                raise RuntimeError("Container key is unavailable")
+            times.append(perf_counter() - init_time)
+        finally:
+            container.clean()
+    return median(times)
+
+
+def probe_cost(session: MonitoringSession, nbytes: int):
+    """
+    @return (probe runs, mean ns per run, syscalls seen in the container)
+    """
+    container = Container(
+        img="alpine",
+        command=["dd", "if=/dev/zero", "of=/dev/null", "bs=1", f"count={nbytes}"],
+    )
+    try:
+        _, before = sys_enter_stats(session)
+        container.start()
+        ev = session.snapshot(container)
+        while container.alive():
+            ev = session.snapshot(container) or ev
+            sleep(0.01)
+        _, after = sys_enter_stats(session)
+        runs, run_ns = after[0] - before[0], after[1] - before[1]
+        return runs, run_ns / max(runs, 1), None if ev is None else len(ev.syscalls())
+    finally:
+        session.forget(container)
+        container.clean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--starts", type=int, default=5)
+    parser.add_argument("--bytes", type=int, default=200000)
+    parser.add_argument("--backend", default="bcc")
+    args = parser.parse_args()
+
+    previous = set_bpf_stats(True)
+    try:
+        print(
+            f"{'key':<10}{'ready s':>9}{'probe runs':>12}{'ns/probe':>10}{'syscalls':>10}"
+        )
+        for mode, cgroup_key in MODES.items():
+            try:
+                session = MonitoringSession(
+                    backend=args.backend, stats=True, cgroup_key=cgroup_key
+                )
+            except FileNotFoundError as e:
+                print(f"{mode:<10}skipped: {e}")
+                continue
+            try:
+                ready = readiness(session, args.starts)
+                runs, ns, syscalls = probe_cost(session, args.bytes)
+            finally:
+                session.cleanup()
+            print(
+                f"{mode:<10}{ready:>9.3f}{runs:>12}{ns:>10.1f}{syscalls if syscalls is not None else '-':>10}"
+            )
+    finally:
+        set_bpf_stats(previous)
+
+
+if __name__ == "__main__":
+    if os.geteuid() != 0:
+        print("Run as super user")
+        exit(0)
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file offline.py
+@brief  Benchmark of the Python pipeline on fake eBPF tables and a fake Docker API.
+@author Haney Kang
+
+@details
+Runs without root, BCC or a Docker daemon: core.fake provides per-CPU `event` tables
+shaped like BCC's (ctypes leaves per CPU) and a Docker API (create/start/inspect/events).
+Cases:
+  - cast_data:  decode of an `event` table of `--entries` keys x `--cpus` CPUs.
+  - event_t:    syscalls() and capabilities() of every decoded Event_t.
+  - read_data:  Monitoring.read_data of one container among `--entries` keys.
+  - window:     MonitoringSession.window_profile of one container (-DBEACON_EPOCH) when
+                all `--entries` keys have new bits in the epoch.
+  - readiness:  create, start (event loop callback) and removal of a container.
+  - compare:    data_comparison.compare of `--images` results against LLM lists.
+
+Every case checks its output, then its best time over `--repeat` runs is divided by
+the best time of a fixed calibration loop interleaved with them, so that results of
+different hosts (or of a host whose speed drifts) are comparable. A case more than
+`--tolerance` slower than bench/baselines.json fails the run (exit status 1), and
+`--update` records the current results as the new baselines. Cases dominated by thread
+wake-ups (readiness) get a wider tolerance from the "tolerance" section of the file.
+
+USAGE (from src/beacon):
+    python -m bench.offline [--repeat 7] [--tolerance 0.5] [--update] [--only cast_data]
+"""
+
+import gc
+import os
+import json
+import random
+import argparse
+import tempfile
+from queue import Queue
+from time import perf_counter
+from typing import Any, Callable, Dict, Tuple
+
+import data_comparison
+from core.container import Container, set_client
+from core.fake import FakeBPF, FakeDockerClient, fake_profile
+from core.profile import Profile
+from event_registry import get_registry
+from monitoring.agent import EPOCH_MAPS, Monitoring, MonitoringSession
+from monitoring.ebpf.structs import NS_FIELDS, Epoch, SysAndCap
+from monitoring.ebpf.types import Namespace_t, cast_data, raw_key
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+## A case returns (run, check): run() is timed, check(run()) validates its output
+Case = Callable[[argparse.Namespace], Tuple[Callable[[], Any], Callable[[Any], bool]]]
+
+
+def calibrate():
+    """
+    @brief Fixed pure-Python loop (bitset operations, like the pipeline).
+    """
+    profile = Profile()
+    for i in range(10000):
+        profile = profile | Profile.from_lists([i % 335, (i * 7) % 335], [i % 41])
+    profile.syscalls()
+
+
+def fill(bpf: FakeBPF, entries: int) -> Dict[Namespace_t, str]:
+    """
+    @brief Record the profile of `entries` fake images in `event`, one namespace each,
+           each bit on a random CPU (FakeBPF.track() without the other maps).
+
+    @return {namespace: image}
+    """
+    rnd = random.Random(0)
+    table = bpf["event"]
+    images = {}
+    for i in range(entries):
+        ns = Namespace_t(*(1000000 + i * 8 + j for j in range(len(NS_FIELDS))))
+        image = f"image{i}:latest"
+        syscalls, caps = fake_profile(image)
+        leaves = [SysAndCap() for _ in range(bpf.ncpu)]
+        for leaf in leaves:
+            leaf.seccomp_flag = True
+        for num in syscalls:
+            leaves[rnd.randrange(bpf.ncpu)].sys[num // 32] |= 1 << (num % 32)
+        for num in caps:
+            leaves[rnd.randrange(bpf.ncpu)].cap[num // 32] |= 1 << (num % 32)
+        table[raw_key(table, ns)] = leaves
+        images[ns] = image
+    return images
+
+
+def case_cast_data(args):
+    bpf = FakeBPF(ncpu=args.cpus)
+    images = fill(bpf, args.entries)
+    ns, image = next(iter(images.items()))
+
+    def check(result):
+        return (
+            len(result) == args.entries
+            and result[ns].syscalls() == fake_profile(image)[0]
+        )
+
+    return lambda: cast_data(bpf["event"]), check
+
+
+def case_event_t(args):
+    bpf = FakeBPF(ncpu=args.cpus)
+    fill(bpf, args.entries)
+    events = cast_data(bpf["event"])
+
+    def run():
+        return [(ev.syscalls(), ev.capabilities()) for ev in events.values()]
+
+    def check(result):
+        return len(result) == args.entries and all(syscalls for syscalls, _ in result)
+
+    return run, check
+
+
+def case_read_data(args):
+    bpf = FakeBPF(ncpu=args.cpus)
+    client = FakeDockerClient(bpf)
+    set_client(client, namespace_of=client.namespace_of, cgroup_of=client.cgroup_of)
+    fill(bpf, args.entries - 1)
+    container = Container(img="nginx:latest")
+    container.start()
+    container.get_pid()
+    output: Queue = Queue()
+    monitoring = Monitoring(0, Queue(), output, session=MonitoringSession(bpf=bpf))
+
+    def run():
+        monitoring.read_data(container)
+        return output.get()
+
+    def check(ev):
+        return ev is not None and ev.syscalls() == fake_profile("nginx:latest")[0]
+
+    return run, check
+
+
+def case_window(args):
+    bpf = FakeBPF(ncpu=args.cpus)
+    client = FakeDockerClient(bpf)
+    set_client(client, namespace_of=client.namespace_of, cgroup_of=client.cgroup_of)
+    fill(bpf, args.entries - 1)
+    container = Container(img="nginx:latest")
+    container.start()
+    container.get_pid()
+    session = MonitoringSession(bpf=bpf, epoch=True)
+    epochs = [bpf[name] for name in EPOCH_MAPS]
+    Leaf = epochs[0].Leaf
+    written = [  # Bits of one window, as the probes would write them
+        (key, Leaf(*(Epoch(sys=leaf.sys, cap=leaf.cap) for leaf in leaves)))
+        for key, leaves in bpf["event"].items()
+    ]
+
+    def run():
+        active = epochs[bpf["epoch_idx"][0].value & 1]
+        for key, leaves in written:
+            active[key] = leaves
+        return session.window_profile(container)
+
+    return run, lambda profile: profile.syscalls() == fake_profile("nginx:latest")[0]
+
+
+def case_readiness(args):
+    client = FakeDockerClient()
+    set_client(client, namespace_of=client.namespace_of, cgroup_of=client.cgroup_of)
+
+    def run():
+        pids = []
+        for _ in range(args.containers):
+            container = Container(img="nginx:latest")
+            container.start()
+            pids.append(container.get_pid())
+            container.clean()
+        return pids
+
+    return run, lambda pids: all(pid > 0 for pid in pids)
+
+
+def case_compare(args):
+    registry = get_registry("x86_64")
+    tmp = tempfile.mkdtemp()
+    llm_dir, dyn_dir = os.path.join(tmp, "llm") + "/", os.path.join(tmp, "result") + "/"
+    os.makedirs(llm_dir)
+    os.makedirs(dyn_dir)
+    images = {}
+    for i in range(args.images):
+        name = f"image{i}"
+        syscalls, _ = fake_profile(name)
+        images[f"{name}:latest"] = {}
+        with open(f"{dyn_dir}{name}:latest.json", "w") as f:
+            json.dump(syscalls, f)
+        with open(
+            f"{llm_dir}{name}__trial1", "w"
+        ) as f:  # Half of the list, and some others
+            names = (
+                registry.syscall_name(nr)
+                for nr in syscalls[::2] + list(range(0, 335, 17))
+            )
+            json.dump([name for name in names if name], f)
+    args_file, output = os.path.join(tmp, "args.json"), os.path.join(
+        tmp, "analysis.csv"
+    )
+    with open(args_file, "w") as f:
+        json.dump(images, f)
+
+    def run():
+        data_comparison.LLM_path, data_comparison.dyn_path = llm_dir, dyn_dir
+        data_comparison.compare(args_file, output)
+        with open(output) as f:
+            return f.read().splitlines()
+
+    def check(lines):
+        return len(lines) == args.images + 1 and all("FN" in line for line in lines[1:])
+
+    return run, check
+
+
+CASES: Dict[str, Case] = {
+    "cast_data": case_cast_data,
+    "event_t": case_event_t,
+    "read_data": case_read_data,
+    "window": case_window,
+    "readiness": case_readiness,
+    "compare": case_compare,
+}
+
+
+def measure(run: Callable[[], Any], repeat: int) -> Tuple[float, float, Any]:
+    """
+    @return (best seconds of `repeat` runs after a warm-up, best seconds of the calibration
+            loop run in between, output of the last run)
+
+    Each run follows a calibration run, so that both see the same state of the host. The
+    best runs are the least disturbed by other processes, and the garbage collector is
+    disabled while timing.
+    """
+    result = run()
+    samples, units = [], []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = perf_counter()
+            calibrate()
+            units.append(perf_counter() - start)
+            start = perf_counter()
+            result = run()
+            samples.append(perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(samples), min(units), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1024)
+    parser.add_argument("--cpus", type=int, default=8)
+    parser.add_argument("--containers", type=int, default=200)
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.5, help="Allowed slowdown (0.5: 50%%)"
+    )
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument(
+        "--update", action="store_true", help="Record the results as baselines"
+    )
+    parser.add_argument(
+        "--only", action="append", choices=sorted(CASES), help="Run these cases only"
+    )
+    args = parser.parse_args()
+
+    params = {
+        "entries": args.entries,
+        "cpus": args.cpus,
+        "containers": args.containers,
+        "images": args.images,
+    }
+    baselines: Dict[str, Any] = {"params": params, "cases": {}}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    def tolerance(name: str) -> float:
+        return max(args.tolerance, baselines.get("tolerance", {}).get(name, 0.0))
+
+    if baselines["params"] != params and not args.update:
+        print(
+            f"Baselines were recorded with {baselines['params']}, not {params}: run with --update"
+        )
+        exit(1)
+
+    print(f"{'case':<12}{'best ms':>10}{'relative':>10}{'baseline':>10}{'change':>9}")
+    failures = []
+    results = {}
+    for name, setup in CASES.items():
+        if args.only and name not in args.only:
+            continue
+        run, check = setup(args)
+        elapsed, unit, output = measure(run, args.repeat)
+        relative = elapsed / unit
+        results[name] = round(relative, 4)
+        baseline = baselines["cases"].get(name)
+        change = "-" if baseline is None else f"{(relative / baseline - 1) * 100:+.0f}%"
+        status = ""
+        if not check(output):
+            status = "  WRONG OUTPUT"
+        elif (
+            baseline is not None
+            and relative > baseline * (1 + tolerance(name))
+            and not args.update
+        ):
+            status = "  REGRESSION"
+        if status:
+            failures.append(name)
+        print(
+            f"{name:<12}{elapsed * 1000:>10.2f}{relative:>10.3f}"
+            f"{baseline if baseline is not None else '-':>10}{change:>9}{status}"
+        )
+
+    if args.update and not failures:
+        kept = baselines["cases"] if baselines["params"] == params else {}
+        baselines = {**baselines, "params": params, "cases": {**kept, **results}}
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=4)
+            f.write("\n")
+        print(f"Baselines written to {args.baselines}")
+    if failures:
+        print(
+            f"FAILED: {', '.join(f'{name} (tolerance {tolerance(name):.0%})' for name in failures)}"
+        )
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file ondemand.py
+@brief  Latency and completeness of on-demand probe attachment.
+@author Haney Kang
+
+@details
+An on-demand session (MonitoringSession(ondemand=True)) attaches its probes when the
+first window opens and detaches them when the last one closes. For `--cycles` windows:
+  - Latency: attachment and detachment times (probe_attach_seconds and
+    probe_detach_seconds of core.metrics).
+  - Boundaries: a container running `/bin/true; sleep` is started right after the
+    window opens and read (MonitoringSession.snapshot) right before it closes. Its entry
+    must hold execve and exit_group, i.e. the first and the last syscall of /bin/true,
+    and the entries of the previous cycles, whose containers keep running, must still
+    be in the map after the probes were detached.
+  - Canary: with --verify, a getppid of this process is checked at both boundaries.
+
+USAGE (from src/beacon, as root):
+    python -m bench.ondemand [--cycles 10] [--verify] [--backend bcc]
+"""
+
+import os
+import argparse
+from time import sleep, time
+from typing import List, Tuple
+
+from core.container import Container
+from core.metrics import metrics
+from event_registry import get_registry, host_arch
+from monitoring.agent import MonitoringSession
+
+REGISTRY = get_registry(host_arch())
+SYS_EXECVE = REGISTRY.syscall_number("execve")
+SYS_EXIT_GROUP = REGISTRY.syscall_number("exit_group")
+READ_TIMEOUT = 5  # Seconds to wait for /bin/true to exit
+
+
+def cycle(session: MonitoringSession, containers: List[Container]) -> bool:
+    """
+    @brief Run one window around a new container, appended to `containers`.
+
+    @return True if execve and exit_group of /bin/true were recorded.
+    """
+    container = Container(img="alpine", command=["sh", "-c", "/bin/true; sleep 3600"])
+    containers.append(container)
+    with session.window():
+        container.start()
+        deadline = time() + READ_TIMEOUT
+        while time() < deadline:
+            ev = session.snapshot(container)
+            if (
+                ev is not None
+                and ev.profile.has_syscall(SYS_EXECVE)
+                and ev.profile.has_syscall(SYS_EXIT_GROUP)
+            ):
+                return True
+            sleep(0.01)
+    return False
+
+
+def latency(name: str) -> Tuple[int, float, float]:
+    """
+    @return (count, mean ms, max ms) of a timing summary of core.metrics.
+    """
+    count, total, peak = metrics.timing(name)
+    return count, total / count * 1000 if count else 0.0, peak * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--backend", default="bcc")
+    args = parser.parse_args()
+
+    session = MonitoringSession(backend=args.backend, ondemand=True, verify=args.verify)
+    containers: List[Container] = []
+    complete = 0
+    try:
+        for _ in range(args.cycles):
+            complete += cycle(session, containers)
+        kept = sum(session.snapshot(container) is not None for container in containers)
+        for container in containers:
+            session.forget(container)
+    finally:
+        for container in containers:
+            container.clean()
+        session.cleanup()
+
+    print(f"{'':<10}{'n':>5}{'mean ms':>10}{'max ms':>10}")
+    for label, name in (
+        ("attach", "probe_attach_seconds"),
+        ("detach", "probe_detach_seconds"),
+    ):
+        count, mean, peak = latency(name)
+        print(f"{label:<10}{count:>5}{mean:>10.2f}{peak:>10.2f}")
+    print(
+        f"complete entries: {complete}/{args.cycles}, kept across windows: {kept}/{len(containers)}"
+    )
+    if args.verify:
+        print(f"canary failures: {metrics.counter('probe_canary_failures'):g}")
+
+
+if __name__ == "__main__":
+    if os.geteuid() != 0:
+        print("Run as super user")
+        exit(0)
+    main()
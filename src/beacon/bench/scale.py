@@ -0,0 +1,275 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file scale.py
+@brief  Stress the Python pipeline with synthetic maps and result stores of production size.
+@author Haney Kang
+
+@details
+Synthesizer draws container profiles from the rows of analysis.csv: the syscalls
+BeaCon observed for an image (TP and FN cells) and the ones the LLM listed (TP and FP
+cells). Each synthetic container copies a random row, drops some of its syscalls and
+adds others with their frequency over all rows, so that bitmaps have the sizes and
+correlations of real images. Frequent syscalls are spread over several CPUs, rare
+ones land on one, as the probes would record them.
+
+The pipeline then runs end to end, each stage timed with its tracemalloc peak:
+  - generate:   fill a fake `event` table (core.fake.FakeTable) of `--entries` keys
+                x `--cpus` per-CPU leaves,
+  - decode:     cast_data() of the whole table,
+  - lookup:     read_key() of every key,
+  - store:      write `--results` result files (decoded events, then synthetic ones),
+  - compare:    data_comparison.compare() of the results against the LLM lists,
+  - export:     seccomp profile and cBPF filter of every result.
+
+USAGE (from src/beacon):
+    python -m bench.scale [--entries 16384] [--cpus 192] [--results 10000] [--json out.json]
+"""
+
+import os
+import csv
+import json
+import random
+import argparse
+import shutil
+import resource
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple
+
+import data_comparison
+from core.fake import FakeTable
+from core.profile import Profile
+from event_registry import get_registry
+from monitoring.ebpf.structs import NS_FIELDS, SysAndCap, tables
+from monitoring.ebpf.types import Namespace_t, cast_data, raw_key, read_key
+from policy.cbpf import assemble, build_filter
+from policy.seccomp import DOCKER_DEFAULT_CAPS, seccomp_profile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYSIS = os.path.join(BASE_DIR, "analysis.csv")
+COMMON_CAPS = tuple(
+    sorted(get_registry().cap_number(cap) for cap in DOCKER_DEFAULT_CAPS)
+)
+
+
+class Synthesizer:
+    """
+    @class Synthesizer
+    @brief Random profiles shaped like the rows of analysis.csv.
+    """
+
+    def __init__(
+        self,
+        path: str = ANALYSIS,
+        seed: int = 0,
+        drop: float = 0.05,
+        noise: float = 0.05,
+    ):
+        """
+        @param path     analysis.csv written by data_comparison.compare().
+        @param drop     Probability to drop each syscall of the copied row.
+        @param noise    Scale of the frequency of other syscalls added to a copy.
+        """
+        self.rows: List[Tuple[List[int], List[int]]] = (
+            []
+        )  # (observed, listed by the LLM)
+        with open(path) as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            nums = [int(cell) for cell in header[1:] if cell.isdigit()]
+            for row in reader:
+                cells = dict(zip(nums, row[1:]))
+                observed = [num for num, cell in cells.items() if cell in ("TP", "FN")]
+                listed = [num for num, cell in cells.items() if cell in ("TP", "FP")]
+                if observed:
+                    self.rows.append((observed, listed))
+        if not self.rows:
+            raise ValueError(f"No profiled image in {path}")
+        ## Fraction of images using each syscall
+        self.freq: Dict[int, float] = {num: 0.0 for num in nums}
+        for observed, _ in self.rows:
+            for num in observed:
+                self.freq[num] += 1 / len(self.rows)
+        self.rnd = random.Random(seed)
+        self.drop = drop
+        self.noise = noise
+
+    def profile(self) -> Tuple[List[int], List[int], List[int]]:
+        """
+        @return (syscalls, capabilities, syscalls listed by the LLM) of a new container.
+        """
+        observed, listed = self.rows[self.rnd.randrange(len(self.rows))]
+        kept = {num for num in observed if self.rnd.random() >= self.drop}
+        kept.update(
+            num for num, p in self.freq.items() if self.rnd.random() < p * self.noise
+        )
+        caps = sorted(self.rnd.sample(COMMON_CAPS, self.rnd.randint(0, 6)))
+        return sorted(kept), caps, listed
+
+    def leaves(self, syscalls: List[int], caps: List[int], ncpu: int):
+        """
+        @return Per-CPU SysAndCap array: each syscall on 1 + freq * ncpu / 4 CPUs, from a
+                random one on.
+        """
+        per_cpu = (SysAndCap * ncpu)()
+        words = [
+            [0] * len(per_cpu[0].sys) for _ in range(ncpu)
+        ]  # ctypes fields are slow to update
+        for num in syscalls:
+            first = self.rnd.randrange(ncpu)
+            for i in range(min(ncpu, 1 + int(self.freq.get(num, 0) * ncpu / 4))):
+                words[(first + i) % ncpu][num // 32] |= 1 << (num % 32)
+        for leaf, sys in zip(per_cpu, words):
+            leaf.sys[:] = sys
+            leaf.seccomp_flag = True
+        for num in caps:
+            per_cpu[self.rnd.randrange(ncpu)].cap[num // 32] |= 1 << (num % 32)
+        return per_cpu
+
+
+class Stages:
+    """
+    @class Stages
+    @brief Time and tracemalloc peak of each stage.
+    """
+
+    def __init__(self):
+        self.rows: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str, items: int) -> Iterator[None]:
+        if hasattr(tracemalloc, "reset_peak"):  # Python >= 3.9
+            tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        start = perf_counter()
+        yield
+        elapsed = perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        self.rows.append(
+            {
+                "stage": name,
+                "items": items,
+                "seconds": round(elapsed, 3),
+                "per_second": round(items / elapsed, 1) if elapsed else None,
+                "peak_mb": round((peak - base) / 2**20, 1),
+                "retained_mb": round((current - base) / 2**20, 1),
+            }
+        )
+        row = self.rows[-1]
+        print(
+            f"{name:<10}{items:>9}{elapsed:>10.2f}{row['per_second'] or 0:>12.0f}"
+            f"{row['peak_mb']:>10.1f}{row['retained_mb']:>10.1f}"
+        )
+
+
+def run(args: argparse.Namespace, synth: Synthesizer, tmp: str):
+    """
+    @brief Run every stage, with the result store in `tmp`.
+    """
+    registry = get_registry("x86_64")
+    key_type, leaf_type, _, _ = tables(False)["event"]
+    llm_dir, dyn_dir = os.path.join(tmp, "llm") + "/", os.path.join(tmp, "result") + "/"
+    os.makedirs(llm_dir)
+    os.makedirs(dyn_dir)
+
+    print(
+        f"{'stage':<10}{'items':>9}{'seconds':>10}{'items/s':>12}{'peak MB':>10}{'kept MB':>10}"
+    )
+    tracemalloc.start()
+    stages = Stages()
+
+    table = FakeTable(key_type, leaf_type, args.cpus, max_entries=args.entries)
+    listed: Dict[Namespace_t, List[int]] = {}
+    with stages.stage("generate", args.entries):
+        for i in range(args.entries):
+            ns = Namespace_t(*(4026530000 + i * 8 + j for j in range(len(NS_FIELDS))))
+            syscalls, caps, listed[ns] = synth.profile()
+            table[raw_key(table, ns)] = synth.leaves(syscalls, caps, args.cpus)
+
+    with stages.stage("decode", args.entries):
+        events = cast_data(table)
+    assert len(events) == args.entries
+
+    with stages.stage("lookup", args.entries):
+        found = sum(read_key(table, key) is not None for key in table.keys())
+    assert found == args.entries
+    del table  # Only the decoded events are stored
+
+    images: Dict[str, Dict] = {}
+    with stages.stage("store", args.results):
+        decoded = iter(events.items())
+        for i in range(args.results):
+            ns, ev = next(decoded, (None, None))
+            if ev is None:  # More results than map entries
+                syscalls, caps, llm = synth.profile()
+                profile = Profile.from_lists(syscalls, caps)
+            else:
+                profile, llm = ev.profile, listed[ns]
+            name = f"synthetic{i}"
+            images[f"{name}:latest"] = {}
+            with open(f"{dyn_dir}{name}:latest.json", "w") as f:
+                json.dump(profile.to_json(), f)
+            with open(f"{llm_dir}{name}__trial1", "w") as f:
+                names = (registry.syscall_name(num) for num in llm)
+                json.dump([name for name in names if name], f)
+    del events, listed
+    args_file = os.path.join(tmp, "args.json")
+    with open(args_file, "w") as f:
+        json.dump(images, f)
+
+    with stages.stage("compare", args.results):
+        data_comparison.LLM_path, data_comparison.dyn_path = llm_dir, dyn_dir
+        data_comparison.compare(args_file, os.path.join(tmp, "analysis.csv"))
+
+    with stages.stage("export", args.results):
+        for image in images:
+            with open(f"{dyn_dir}{image}.json") as f:
+                profile = Profile.from_json(json.load(f))
+            json.dumps(seccomp_profile(profile))
+            assemble(build_filter(profile.syscalls()))
+    tracemalloc.stop()
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"Peak RSS: {max_rss:.0f} MB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "params": vars(args),
+                    "stages": stages.rows,
+                    "max_rss_mb": round(max_rss, 1),
+                },
+                f,
+                indent=4,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=16384)
+    parser.add_argument("--cpus", type=int, default=192)
+    parser.add_argument("--results", type=int, default=10000)
+    parser.add_argument("--analysis", default=ANALYSIS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the measurements to this file")
+    parser.add_argument(
+        "--keep", action="store_true", help="Keep the generated result store"
+    )
+    args = parser.parse_args()
+
+    synth = Synthesizer(args.analysis, args.seed)
+    tmp = tempfile.mkdtemp()
+
+    print(f"{len(synth.rows)} images of {args.analysis}, results in {tmp}")
+    try:
+        run(args, synth, tmp)
+    finally:
+        if not args.keep:
+            shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file startup.py
+@brief  Startup time regression benchmark of the `beacon` CLI.
+@author Haney Kang
+
+@details
+Each command runs in a fresh interpreter; the median wall time over several runs is
+compared with the budget. The run also fails if a command imports a subsystem it
+should defer (docker-py, BCC, pydantic).
+
+USAGE (from src/beacon):
+    python -m bench.startup [--runs 10] [--budget-ms 200]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+from time import perf_counter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLI = os.path.join(BASE_DIR, "cli.py")
+DEFERRED = ("docker", "bcc", "pydantic", "requests")
+
+PROBE = """
+import sys
+sys.argv = {argv!r}
+sys.path.insert(0, {base!r})
+import cli
+try:
+    cli.app()
+except SystemExit:
+    pass
+print("\\n" + ",".join(m for m in {deferred!r} if m in sys.modules), file=sys.stderr)
+"""
+
+
+def wall_time(cmd, runs: int) -> float:
+    """Median seconds of running `cmd` over `runs` runs."""
+    samples = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(perf_counter() - start)
+    return median(samples)
+
+
+def deferred_imports(argv) -> str:
+    """Deferred modules imported by a command (empty string if none)."""
+    code = PROBE.format(argv=["beacon"] + argv, base=BASE_DIR, deferred=DEFERRED)
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    return proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump([0, 1, 3, 9, 60, 231], f)
+        sample = f.name
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({}, f)  # No image: data_comparison and the registry are loaded only
+        no_images = f.name
+    csv = f"{no_images}.csv"
+
+    commands = [
+        ["--help"],
+        ["export", "--help"],
+        ["export", sample, "--cbpf", os.devnull],
+        ["inspect", "nginx:latest"],
+        ["compare", "--args-file", no_images, "--output", csv],
+    ]
+    failed = False
+    try:
+        base = wall_time([sys.executable, "-c", "pass"], args.runs)
+        print(f"{'command':<40}{'median ms':>10}  deferred imports")
+        print(f"{'(python -c pass)':<40}{base * 1000:>10.1f}")
+        for argv in commands:
+            elapsed = wall_time([sys.executable, CLI] + argv, args.runs) * 1000
+            leaked = deferred_imports(argv)
+            ok = elapsed <= args.budget_ms and not leaked
+            failed |= not ok
+            print(
+                f"{' '.join(argv)[:39]:<40}{elapsed:>10.1f}  {leaked or '-'}{'' if ok else '  FAIL'}"
+            )
+    finally:
+        for path in (sample, no_images, csv):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    if failed:
+        print(
+            f"Startup regression: budget {args.budget_ms:.0f} ms, deferred {', '.join(DEFERRED)}"
+        )
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
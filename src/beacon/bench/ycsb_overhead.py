@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file ycsb_overhead.py
+@brief  Throughput/latency penalty of the inst.c probes on real services (YCSB).
+@author Haney Kang
+
+@details
+Every service of `emulating/wl_command.json` is measured three ways:
+ - none      : inst.c is not loaded.
+ - untracked : inst.c is attached, but the container's entry is removed right after
+               start, so each probe only pays the lookup miss.
+ - tracked   : inst.c is attached and the container is monitored.
+All modes keep Docker's default seccomp profile, so only the probes differ.
+Results are stored as JSON named after the inst.c hash, and `--baseline` compares
+the tracked overhead with a previous version.
+
+USAGE (from src/beacon, as root, YCSB_HOME pointing at a YCSB distribution):
+    python -m bench.ycsb_overhead [--services redis:latest ...] [--records 10000]
+        [--operations 100000] [--baseline bench/results/ycsb-<hash>.json]
+"""
+
+import os
+import re
+import json
+import argparse
+import subprocess
+from time import sleep, strftime
+from statistics import median
+from typing import Any, Dict, List, Optional
+
+from core.cache import INST_SRC, file_hash
+from core.container import Container
+from emulating.agent import load_stable_args
+from emulating.workload import wait_port
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WL_COMMAND = os.path.join(BASE_DIR, "emulating", "wl_command.json")
+RESULT_DIR = os.path.join(BASE_DIR, "bench", "results")
+MODES = ("none", "untracked", "tracked")
+
+METRIC = re.compile(r"^\[(\w+)\], ([^,]+), ([0-9.]+)$")
+
+
+def service_port(container: Container) -> Optional[int]:
+    """First exposed TCP port of the image."""
+    exposed = container.inspect().get("Config", {}).get("ExposedPorts") or {}
+    ports = sorted(int(p.split("/")[0]) for p in exposed if p.endswith("/tcp"))
+    return ports[0] if ports else None
+
+
+def ycsb(
+    ycsb_home: str, phase: str, client: str, props: Dict[str, str], workload: str
+) -> Dict[str, Any]:
+    """
+    @brief Run one YCSB phase and parse its summary.
+
+    @return {"ops": <overall ops/sec>, "p99": {operation: 99th percentile latency in us}}
+    """
+    cmd = [
+        os.path.join(ycsb_home, "bin", "ycsb.sh"),
+        phase,
+        client,
+        "-P",
+        os.path.join(ycsb_home, "workloads", workload),
+    ]
+    for key, value in props.items():
+        cmd += ["-p", f"{key}={value}"]
+    proc = subprocess.run(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True
+    )
+    result: Dict[str, Any] = {"ops": 0.0, "p99": {}}
+    for line in proc.stdout.splitlines():
+        m = METRIC.match(line.strip())
+        if not m:
+            continue
+        section, name, value = m.groups()
+        if section == "OVERALL" and name == "Throughput(ops/sec)":
+            result["ops"] = float(value)
+        elif name == "99thPercentileLatency(us)" and not section.endswith("FAILED"):
+            result["p99"][section] = float(value)
+    return result
+
+
+def measure(image: str, wl: Dict[str, Any], mode: str, session, args) -> Dict[str, Any]:
+    """
+    @brief Start the service, load and run YCSB against it, and remove it.
+    """
+    container = Container(img=image, **load_stable_args().get(image, {}))
+    try:
+        container.start()
+        namespace = container.namespace()
+        if mode == "untracked" and namespace is not None:
+            table = session.bpf["event"]
+            del table[table.Key(**namespace)]
+
+        ip = container.ip()
+        port = service_port(container)
+        if ip is None or (port is not None and not wait_port(ip, port, 120)):
+            raise RuntimeError(f"{image} is not reachable")
+        sleep(args.settle)
+
+        props = {k: v.replace("$IP", ip) for k, v in wl["properties"].items()}
+        props.update(recordcount=str(args.records), operationcount=str(args.operations))
+        ycsb(args.ycsb, "load", wl["ycsb_client"], props, args.workload)
+        return ycsb(args.ycsb, "run", wl["ycsb_client"], props, args.workload)
+    finally:
+        container.clean()
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median throughput and per-operation p99 over repetitions."""
+    ops = [run["ops"] for run in runs]
+    names = sorted({name for run in runs for name in run["p99"]})
+    return {
+        "ops": median(ops) if ops else 0.0,
+        "p99": {
+            name: median(run["p99"][name] for run in runs if name in run["p99"])
+            for name in names
+        },
+    }
+
+
+def delta(value: float, base: float) -> str:
+    return f"{(value - base) / base * 100:+.1f}%" if base else "-"
+
+
+def print_table(results: Dict[str, Dict[str, Any]]):
+    print(
+        f"{'service':<36}{'mode':<11}{'ops/s':>11}{'Δops':>9}{'p99 us':>10}{'Δp99':>9}"
+    )
+    for image, modes in results.items():
+        base = modes.get("none")
+        for mode, res in modes.items():
+            p99 = max(res["p99"].values()) if res["p99"] else 0.0
+            base_p99 = max(base["p99"].values()) if base and base["p99"] else 0.0
+            print(
+                f"{image[:35]:<36}{mode:<11}{res['ops']:>11.1f}"
+                f"{delta(res['ops'], base['ops']) if base else '-':>9}{p99:>10.0f}{delta(p99, base_p99):>9}"
+            )
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_file: str):
+    """Print tracked-mode overhead of this version next to a previous one."""
+    with open(baseline_file) as f:
+        previous = json.load(f)
+    print(f"\nTracked overhead vs {previous['inst_hash'][:12]} ({previous['date']})")
+    for image, modes in results.items():
+        old = previous["results"].get(image)
+        if not old or "tracked" not in modes or "none" not in modes:
+            continue
+        now = (
+            (modes["tracked"]["ops"] - modes["none"]["ops"])
+            / max(modes["none"]["ops"], 1e-9)
+            * 100
+        )
+        then = (
+            (old["tracked"]["ops"] - old["none"]["ops"])
+            / max(old["none"]["ops"], 1e-9)
+            * 100
+        )
+        print(f"{image[:35]:<36}{then:>+8.1f}% -> {now:>+8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--ycsb", default=os.environ.get("YCSB_HOME", "ycsb"))
+    parser.add_argument(
+        "--services", nargs="*", help="Images of wl_command.json (all by default)"
+    )
+    parser.add_argument("--workload", default="workloada")
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--operations", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--settle", type=float, default=5.0, help="Seconds to wait after the port opens"
+    )
+    parser.add_argument(
+        "--output", help="Result JSON (default: bench/results/ycsb-<inst.c hash>.json)"
+    )
+    parser.add_argument("--baseline", help="Previous result JSON to compare with")
+    args = parser.parse_args()
+
+    with open(WL_COMMAND) as f:
+        commands = json.load(f)
+    services = args.services or list(commands)
+
+    runs: Dict[str, Dict[str, List[Dict[str, Any]]]] = {
+        image: {mode: [] for mode in MODES} for image in services
+    }
+    # Without probes first: the session must not be loaded at all in this mode
+    for image in services:
+        for _ in range(args.repeat):
+            runs[image]["none"].append(
+                measure(image, commands[image], "none", None, args)
+            )
+
+    from monitoring.agent import MonitoringSession
+
+    session = MonitoringSession()
+    try:
+        for image in services:
+            for mode in ("untracked", "tracked"):
+                for _ in range(args.repeat):
+                    runs[image][mode].append(
+                        measure(image, commands[image], mode, session, args)
+                    )
+    finally:
+        session.cleanup()
+
+    results = {
+        image: {mode: summarize(r) for mode, r in modes.items()}
+        for image, modes in runs.items()
+    }
+    print_table(results)
+
+    inst_hash = file_hash(INST_SRC)
+    output = args.output or os.path.join(RESULT_DIR, f"ycsb-{inst_hash[:12]}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(
+            {
+                "inst_hash": inst_hash,
+                "date": strftime("%Y-%m-%d %H:%M:%S"),
+                "workload": args.workload,
+                "results": results,
+            },
+            f,
+            indent=4,
+        )
+    print(f"\nSaved to {output}")
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    if os.geteuid() != 0:
+        print("Run as super user")
+        exit(0)
+    main()
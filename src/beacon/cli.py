@@ -0,0 +1,412 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file cli.py
+@brief  `beacon` command line interface
+@author Haney Kang
+
+@details
+Subsystems (Docker client and event loop, BCC compilation, JSON tables) are imported
+inside the commands which need them, so `beacon --help` and the offline commands
+(compare, export, inspect <image>) start without touching Docker or the kernel.
+"""
+
+import os
+import sys
+import json
+from typing import List, Optional
+
+import typer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if (
+    BASE_DIR not in sys.path
+):  # Modules import each other as top-level packages (core, monitoring, ...)
+    sys.path.insert(0, BASE_DIR)
+
+STABLE_JSON = os.path.join(BASE_DIR, "emulating", "stable_args.json")
+
+app = typer.Typer(
+    help="BeaCon: automatic container policy generation using dynamic analysis.",
+    no_args_is_help=True,
+    add_completion=False,
+    rich_markup_mode=None,  # Plain click help, rich's import alone takes ~140ms
+)
+
+
+def _governor(enabled: bool, pin: bool, max_workers: int):
+    """Started core.governor.Governor if requested (pinning implies it), else None."""
+    if not (enabled or pin):
+        return None
+    from core.governor import Governor
+
+    return Governor(max_workers, pin=pin).start()
+
+
+def _read_token(path: Optional[str]) -> Optional[str]:
+    """Shared token of the daemon API, from a file (kept out of the command line)."""
+    if path is None:
+        return None
+    with open(path) as f:
+        token = f.read().strip()
+    if not token:
+        typer.echo(f"Empty token file: {path}", err=True)
+        raise typer.Exit(1)
+    return token
+
+
+def _require_root():
+    if os.geteuid() != 0:
+        typer.echo("Run as super user", err=True)
+        raise typer.Exit(1)
+
+
+@app.command()
+def profile(
+    image: str = typer.Argument(..., help="Image reference, e.g. nginx:latest"),
+    duration: int = typer.Option(60, help="Monitoring window in seconds"),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Write the profile to a file"
+    ),
+):
+    """Profile one image with its stable arguments."""
+    _require_root()
+    from baseline import profile as run_profile
+    from emulating.agent import load_stable_args
+
+    record = run_profile(image, load_stable_args().get(image, {}), duration)
+    if record is None:
+        typer.echo(f"No data: {image}", err=True)
+        raise typer.Exit(1)
+    body = json.dumps(record, indent=4)
+    if output:
+        with open(output, "w") as f:
+            f.write(body)
+    else:
+        typer.echo(body)
+
+
+@app.command()
+def sweep(
+    args_file: str = typer.Option(STABLE_JSON, help="JSON of {image: create kwargs}"),
+    result_dir: str = typer.Option("result", help="Directory of the results"),
+    duration: int = typer.Option(60, help="Monitoring window in seconds"),
+    metrics_file: Optional[str] = typer.Option(
+        None, "--metrics", help="Write runtime metrics (OpenMetrics)"
+    ),
+):
+    """Profile every image of ARGS_FILE, reusing cached profiles."""
+    _require_root()
+    from baseline import sweep as run_sweep
+
+    run_sweep(args_file, result_dir, duration, metrics_file)
+
+
+@app.command()
+def run(
+    spec: str = typer.Argument(..., help="Profile spec (JSON or YAML)"),
+    result_dir: str = typer.Option("result", help="Directory of the results"),
+    count: bool = typer.Option(False, help="Count calls of each syscall"),
+    metrics_file: Optional[str] = typer.Option(
+        None,
+        "--metrics",
+        help="Write runtime metrics with probe statistics (OpenMetrics)",
+    ),
+    period: Optional[float] = typer.Option(
+        None, help="Also record newly seen syscalls every PERIOD seconds (timeline)"
+    ),
+    governor: bool = typer.Option(
+        False, help="Start containers only as far as the host load allows"
+    ),
+    pin: bool = typer.Option(
+        False, help="Pin each container to its own CPUs (implies --governor)"
+    ),
+):
+    """Profile all containers of a spec concurrently."""
+    _require_root()
+    from emulating.spec import load_spec
+    from emulating.runner import BatchRunner
+
+    profile_spec = load_spec(spec)
+    gov = _governor(governor, pin, len(profile_spec.containers))
+    try:
+        results = BatchRunner(
+            profile_spec, result_dir, count, metrics_file, period, gov
+        ).run()
+    finally:
+        if gov is not None:
+            gov.stop()
+    for ref, ev in results.items():
+        typer.echo(f"{ref}\t{'-' if ev is None else len(ev.syscalls())}")
+
+
+@app.command()
+def validate(
+    spec: str = typer.Argument(
+        ..., help="Profile spec (JSON or YAML) the results were profiled with"
+    ),
+    result_dir: str = typer.Option("result", help="Directory of the results"),
+    workers: Optional[int] = typer.Option(
+        None, help="Images validated at once (all by default)"
+    ),
+    duration: Optional[int] = typer.Option(
+        None, help="Run window in seconds (duration_sec of each image by default)"
+    ),
+    merge: bool = typer.Option(
+        False, help="Add denied syscalls and capabilities to the results"
+    ),
+    governor: bool = typer.Option(
+        False, help="Start containers only as far as the host load allows"
+    ),
+    pin: bool = typer.Option(
+        False, help="Pin each container to its own CPUs (implies --governor)"
+    ),
+):
+    """Relaunch each image under its generated policy and report the denials."""
+    _require_root()
+    from emulating.spec import load_spec
+    from policy.validate import PolicyValidator, merge as merge_report
+
+    profile_spec = load_spec(spec)
+    gov = _governor(governor, pin, workers or len(profile_spec.containers))
+    try:
+        reports = PolicyValidator(
+            profile_spec, result_dir, workers, duration, governor=gov
+        ).run()
+    finally:
+        if gov is not None:
+            gov.stop()
+    for ref, report in sorted(reports.items()):
+        status = "error" if report.error else "ok" if report.passed else "denied"
+        typer.echo(
+            f"{ref}\t{status}\t{len(report.denied_syscalls)}\t{len(report.denied_caps)}"
+        )
+        if merge:
+            merge_report(result_dir, report)
+    if not all(report.passed for report in reports.values()):
+        raise typer.Exit(1)
+
+
+@app.command()
+def daemon(
+    socket_path: Optional[str] = typer.Option(
+        "/run/beacon.sock", "--socket", help="Unix socket of the API"
+    ),
+    listen: Optional[str] = typer.Option(
+        None, help="Serve on HOST:PORT instead of the unix socket"
+    ),
+    workers: int = typer.Option(4, help="Containers profiled at once"),
+    result_dir: str = typer.Option("result", help="Directory of the results"),
+    count: bool = typer.Option(False, help="Count calls of each syscall"),
+    period: Optional[float] = typer.Option(
+        None, help="Also record timelines sampled every PERIOD seconds"
+    ),
+    fake: bool = typer.Option(False, help="Fake Docker and BPF backends (API testing)"),
+    governor: bool = typer.Option(
+        False, help="Run fewer than WORKERS jobs when the host is loaded"
+    ),
+    pin: bool = typer.Option(
+        False, help="Pin each container to its own CPUs (implies --governor)"
+    ),
+    ondemand: bool = typer.Option(
+        True, "--ondemand/--always-on", help="Detach the probes while no job runs"
+    ),
+    token_file: Optional[str] = typer.Option(
+        None,
+        envvar="BEACON_TOKEN_FILE",
+        help="File of the token required on --listen (mandatory off loopback)",
+    ),
+):
+    """Serve a job queue API, keeping the eBPF program loaded between jobs."""
+    if not fake:
+        _require_root()
+    import logging
+    from service.server import Daemon, is_loopback, serve
+
+    token = _read_token(token_file)
+    if listen and not token and not is_loopback(listen.rpartition(":")[0]):
+        typer.echo(
+            f"--listen {listen} is reachable from other hosts: give --token-file",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    logging.basicConfig(level=logging.INFO)
+    profiler = Daemon(
+        workers,
+        result_dir,
+        count,
+        period,
+        fake,
+        _governor(governor, pin, workers),
+        ondemand,
+    )
+    serve(profiler, None if listen else socket_path, listen, token)
+
+
+@app.command()
+def coordinate(
+    worker: List[str] = typer.Option(
+        [], help="HOST:PORT of a worker daemon (repeatable)"
+    ),
+    local: int = typer.Option(0, help="Also spawn N local fake workers (testing)"),
+    args_file: str = typer.Option(STABLE_JSON, help="JSON of {image: create kwargs}"),
+    result_dir: str = typer.Option("result", help="Merged result directory"),
+    duration: int = typer.Option(60, help="Monitoring window in seconds"),
+    attempts: int = typer.Option(3, help="Attempts of an image before giving up"),
+    token_file: Optional[str] = typer.Option(
+        None, envvar="BEACON_TOKEN_FILE", help="File of the token of the workers"
+    ),
+):
+    """Shard a sweep over worker daemons and merge their results."""
+    import logging
+    from service.coordinator import Coordinator, spawn_workers
+
+    logging.basicConfig(level=logging.INFO)
+    token = _read_token(token_file)
+    procs, addresses = (
+        spawn_workers(local, token_file=token_file) if local else ([], [])
+    )
+    with open(args_file) as f:
+        images = json.load(f)
+    try:
+        coordinator = Coordinator(
+            list(worker) + addresses, result_dir, duration, attempts, token
+        )
+        results = coordinator.run(images)
+    finally:
+        for p in procs:
+            p.terminate()
+    typer.echo(f"{len(results)} profiled, {len(coordinator.failed)} failed")
+    for image, errors in coordinator.failed.items():
+        typer.echo(f"{image}\t{errors[-1]}", err=True)
+
+
+@app.command()
+def compare(
+    args_file: str = typer.Option(
+        STABLE_JSON, help="JSON whose keys are the compared images"
+    ),
+    output: str = typer.Option("analysis.csv", help="CSV file to write"),
+):
+    """Compare LLM-generated syscall lists with BeaCon's results."""
+    from data_comparison import compare as run_compare
+
+    run_compare(args_file, output)
+
+
+@app.command()
+def similar(
+    image: Optional[str] = typer.Argument(
+        None, help="Indexed image, or a profile JSON file"
+    ),
+    result_dir: str = typer.Option(
+        "result", help="Directory of the results (index kept there)"
+    ),
+    k: int = typer.Option(10, "-k", help="Number of neighbors"),
+    threshold: float = typer.Option(0.0, help="Minimum Jaccard similarity"),
+    categories: bool = typer.Option(
+        False, help="Report cohesion and outliers of each category"
+    ),
+    clusters: Optional[float] = typer.Option(
+        None, help="List clusters of images above this similarity"
+    ),
+):
+    """Find profiled images which behave like IMAGE (MinHash/LSH index of the results)."""
+    from core.profile import Profile
+    from similarity import (
+        INDEX_FILE,
+        SimilarityIndex,
+        category_report,
+        load_categories,
+        suggest_categories,
+    )
+
+    path = os.path.join(result_dir, INDEX_FILE)
+    index = SimilarityIndex.load(path)
+    if index.update(result_dir):
+        index.save(path)
+
+    if image is not None:
+        if image in index:
+            profile, neighbors = index.profiles[image], index.similar(
+                image, k, threshold
+            )
+        elif os.path.exists(image):
+            with open(image) as f:
+                profile = Profile.from_json(json.load(f))
+            neighbors = index.query(profile, k, threshold)
+        else:
+            typer.echo(f"Not indexed: {image}", err=True)
+            raise typer.Exit(1)
+        for ref, score in neighbors:
+            typer.echo(f"{ref}\t{score:.3f}")
+        for category, share in suggest_categories(
+            index, profile, load_categories(), k, image
+        )[:3]:
+            typer.echo(f"# {category}\t{share:.2f}")
+    if categories:
+        typer.echo(json.dumps(category_report(index, load_categories()), indent=4))
+    if clusters is not None:
+        for group in index.clusters(clusters):
+            typer.echo(" ".join(group))
+
+
+@app.command()
+def export(
+    result: str = typer.Argument(..., help="Result JSON (list of syscall numbers)"),
+    fmt: str = typer.Option("docker", "--format", help="docker or oci"),
+    output: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Write the profile to a file"
+    ),
+    cbpf: Optional[str] = typer.Option(
+        None, help="Also write a raw cBPF filter to this file"
+    ),
+    layout: str = typer.Option(
+        "bsearch", help="cBPF layout: linear, bsearch or frequency"
+    ),
+):
+    """Export a seccomp profile from a profiling result."""
+    from policy.seccomp import seccomp_profile
+
+    with open(result) as f:
+        observed = json.load(f)
+    body = json.dumps(seccomp_profile(observed, fmt), indent=4)
+    if output:
+        with open(output, "w") as f:
+            f.write(body)
+    else:
+        typer.echo(body)
+
+    if cbpf:
+        from policy.cbpf import assemble, build_filter
+
+        with open(cbpf, "wb") as f:
+            f.write(assemble(build_filter(observed, layout)))
+
+
+@app.command()
+def inspect(
+    image: Optional[str] = typer.Argument(
+        None, help="Show the stored information of one image"
+    ),
+):
+    """Inspect official images (pull, run and record exposed ports and categories)."""
+    if image is not None:
+        from tool.inspector.inspect import load_info
+
+        info = load_info().get(image)
+        if info is None:
+            typer.echo(f"Not inspected: {image}", err=True)
+            raise typer.Exit(1)
+        typer.echo(json.dumps(info, indent=4))
+        return
+
+    _require_root()
+    from tool.inspector.inspect import main as run_inspect
+
+    run_inspect()
+
+
+if __name__ == "__main__":
+    app()
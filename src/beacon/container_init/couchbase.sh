@@ -1,13 +1,16 @@
+# Run by emulating.init as a ScriptStep: IP (and PORT) are the address of the container
+PORT="${PORT:-8091}"
+
 # Init Authentication
-curl -s -X POST http://172.17.0.2:8091/clusterInit \
+curl -sf -X POST "http://${IP:?}:${PORT}/clusterInit" \
   -d "username=ycsb_admin" \
   -d "password=ycsb_passwd" \
   -d "services=kv,n1ql,index" \
   -d "memoryQuota=512" \
   -d "indexMemoryQuota=256" \
-  -d "port=SAME"
+  -d "port=SAME" || exit 1
 
 # Create Bucket
-curl -s -u ycsb_admin:ycsb_passwd -X POST \
-  "http://172.17.0.2:8091/pools/default/buckets" \
-  -d name=ycsb -d bucketType=couchbase -d ramQuota=256
+curl -sf -u ycsb_admin:ycsb_passwd -X POST \
+  "http://${IP}:${PORT}/pools/default/buckets" \
+  -d name=ycsb -d bucketType=couchbase -d ramQuota=256 || exit 1
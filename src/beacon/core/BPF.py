@@ -1,5 +1,5 @@
 #!/usr/bin/python3
-# Last Modified at Jul 25, 2025
+# Last Modified at Oct 19, 2026
 
 """@file BPF.py
 @brief  Extension of BCC BPF with more robust cleanup support.
@@ -7,10 +7,12 @@
 """
 
 import os
+from typing import Dict, List, Tuple
 from bcc import BPF
 from bcc.libbcc import lib
 from bcc.table import PerfEventArray
 
+
 class RobustBPF(BPF):
     """
     @class RobustBPF
@@ -20,7 +22,85 @@ class RobustBPF(BPF):
     This subclass adds a `cleanup()` method to detach and destroy all active probes, tracepoints,
     perf events, and ring buffers. This helps ensure clean shutdowns of eBPF programs and avoids
     lingering state in the kernel.
+
+    Probes defined by name (TRACEPOINT_PROBE, kprobe__, kretprobe__) are attached by BCC
+    at load time. detach_probes() and attach_probes() remove and restore them without
+    unloading the programs, so maps keep their data while no probe runs.
     """
+
+    probes_attached = True
+
+    def _probes(self) -> List[Tuple[str, bytes, bytes]]:
+        """
+        @return (kind, target, function name) of the probes BCC attaches by name.
+        """
+        probes = []
+        for i in range(lib.bpf_num_functions(self.module)):
+            name = lib.bpf_function_name(self.module, i)
+            if name.startswith(b"kprobe__"):
+                probes.append(("kprobe", name[len(b"kprobe__") :], name))
+            elif name.startswith(b"kretprobe__"):
+                probes.append(("kretprobe", name[len(b"kretprobe__") :], name))
+            elif name.startswith(b"tracepoint__"):
+                probes.append(
+                    (
+                        "tracepoint",
+                        name[len(b"tracepoint__") :].replace(b"__", b":"),
+                        name,
+                    )
+                )
+        return probes
+
+    def detach_probes(self):
+        """
+        @brief Detaches the probes attached by name. Programs and maps stay loaded.
+        """
+        if not self.probes_attached:
+            return
+        for kind, target, _ in self._probes():
+            if kind == "kprobe":
+                self.detach_kprobe(event=target)
+            elif kind == "kretprobe":
+                self.detach_kretprobe(event=target)
+            else:
+                self.detach_tracepoint(tp=target)
+        self.probes_attached = False
+
+    def attach_probes(self):
+        """
+        @brief Attaches again the probes removed by detach_probes() (already loaded programs).
+        """
+        if self.probes_attached:
+            return
+        for kind, target, fn_name in self._probes():
+            if kind == "kprobe":
+                self.attach_kprobe(event=target, fn_name=fn_name)
+            elif kind == "kretprobe":
+                self.attach_kretprobe(event=target, fn_name=fn_name)
+            else:
+                self.attach_tracepoint(tp=target, fn_name=fn_name)
+        self.probes_attached = True
+
+    def prog_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        @brief Reads run statistics of the loaded programs from their fdinfo.
+
+        @return {function name: (run_cnt, run_time_ns)}
+
+        @note
+        Counters stay 0 unless `set_bpf_stats(True)` has been called.
+        """
+        stats = {}
+        for func_name, func in list(self.funcs.items()):
+            info = {}
+            with open(f"/proc/self/fdinfo/{func.fd}") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    info[key.strip()] = value.strip()
+            name = func_name.decode() if isinstance(func_name, bytes) else func_name
+            stats[name] = (int(info.get("run_cnt", 0)), int(info.get("run_time_ns", 0)))
+        return stats
+
     def cleanup(self):
         """
         @brief Safely detaches all active eBPF components and releases resources.
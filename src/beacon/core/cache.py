@@ -0,0 +1,156 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file cache.py
+@brief  Content-addressed cache for monitoring profiles.
+@author Haney Kang
+
+@details
+A profile is stored under the hash of every input which may change its content:
+the image digest, the normalized create kwargs, the eBPF program (inst.c, or the
+CO-RE object of the libbpf backend) and the run configuration (e.g., backend and
+monitoring duration). A moved `:latest` tag misses the
+cache, while the same digest under another tag hits it.
+"""
+
+import os
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INST_SRC = os.path.join(BASE_DIR, "monitoring", "ebpf", "inst.c")
+
+
+def file_hash(path: str) -> str:
+    """
+    @brief Compute sha256 of a file.
+
+    @param  path    File path to hash.
+    @return str     Hex digest of the file content.
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def normalize_kwargs(kwargs: Optional[Dict[str, Any]]) -> str:
+    """
+    @brief Serialize create kwargs into a canonical string (sorted keys, no spaces).
+
+    @param  kwargs  Keyword arguments given to `Container`.
+    @return str     Canonical JSON representation.
+    """
+    return json.dumps(kwargs or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ProfileCache:
+    """
+    @class ProfileCache
+    @brief Directory of profiles addressed by the hash of their inputs.
+
+    Each entry is `<root>/<key>.json`. Lookup statistics are kept per instance
+    so that a sweep can report its hit rate at the end.
+    """
+
+    def __init__(self, root: str = "result/cache", src_file: str = INST_SRC):
+        """
+        @param root     Directory where cached profiles are stored.
+        @param src_file eBPF program (source or object) whose hash is part of every key.
+        """
+        self.root = root
+        self.src_hash = file_hash(src_file)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, digest: str, kwargs: Optional[Dict[str, Any]], **run_config) -> str:
+        """
+        @brief Build the cache key of one profiling run.
+
+        @param  digest      Image digest (e.g., `sha256:...`).
+        @param  kwargs      Create kwargs of the container.
+        @param  run_config  Other parameters affecting the result (e.g., duration).
+        @return str         Hex key.
+        """
+        h = hashlib.sha256()
+        for part in (
+            digest,
+            normalize_kwargs(kwargs),
+            self.src_hash,
+            normalize_kwargs(run_config),
+        ):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        @brief Look up a profile.
+
+        @param  key     Key from `key()`.
+        @return Cached record or None on miss.
+        """
+        try:
+            with open(self._path(key)) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    def put(self, key: str, record: Dict[str, Any]):
+        """
+        @brief Store a profile atomically (a crash never leaves a partial entry).
+
+        @param key      Key from `key()`.
+        @param record   JSON-serializable profile record.
+        """
+        path = self._path(key)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(record, f, indent=4)
+        os.replace(tmp, path)
+
+    def hit_rate(self) -> float:
+        """
+        @brief Ratio of hits among lookups done by this instance.
+
+        @return float in [0, 1], 0 when nothing was looked up.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        """
+        @brief Human readable lookup statistics.
+        """
+        return (
+            f"[core.cache] Profile cache: {self.hits} hit(s), {self.misses} miss(es), "
+            f"hit rate {self.hit_rate() * 100:.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    print("== Testing ProfileCache ==")
+    with tempfile.TemporaryDirectory() as root:
+        cache = ProfileCache(root)
+        k1 = cache.key("sha256:aaaa", {"b": 1, "a": [1, 2]}, duration=60)
+        k2 = cache.key("sha256:aaaa", {"a": [1, 2], "b": 1}, duration=60)
+        assert k1 == k2, "Key should not depend on kwargs order"
+        assert k1 != cache.key("sha256:bbbb", {"a": [1, 2], "b": 1}, duration=60)
+        assert k1 != cache.key("sha256:aaaa", {"a": [1, 2], "b": 1}, duration=30)
+
+        assert cache.get(k1) is None
+        cache.put(k1, {"syscalls": [0, 1], "capabilities": []})
+        assert cache.get(k2) == {"syscalls": [0, 1], "capabilities": []}
+        print(cache.summary())
+    print("== Test passed ==")
@@ -1,5 +1,5 @@
 #!/usr/bin/python3
-# Last modified at Nov 23, 2025
+# Last modified at Oct 19, 2026
 
 """@file container.py
 @brief  Wrapper for container operations using Docker Library.
@@ -7,31 +7,95 @@
 
 @details
 Provides a class to manage the lifecycle and properties of a container instance via docker-py library.
+The Docker client and the event loop are created on first use, so importing this module
+neither imports docker-py nor connects to the daemon.
 """
 
 import os
-import docker
+import re
 import logging
 from threading import Thread, Lock, Event
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
-from core.wrapper import lsns
+from time import perf_counter
 
-client = docker.APIClient()
+from core.metrics import metrics
+from core.wrapper import cgroup_id, lsns
+
+DOCKER_DOC = "Docker API round trip"
+
+## Grammar of docker/distribution references: [domain[:port]/]component(/component)*, and tags
+_LABEL = r"[a-zA-Z0-9](?:[a-zA-Z0-9-]*[a-zA-Z0-9])?"
+_COMPONENT = r"[a-z0-9]+(?:(?:[._]|__|-+)[a-z0-9]+)*"
+IMAGE_NAME = re.compile(
+    rf"(?:{_LABEL}(?:\.{_LABEL})*(?::[0-9]+)?/)?{_COMPONENT}(?:/{_COMPONENT})*"
+)
+IMAGE_TAG = re.compile(r"\w[\w.-]{0,127}")
+
+_client = None
+_event_loop = None
+_namespace_of = lsns
+_cgroup_of = cgroup_id
+_init_lock = Lock()
+
+
+def set_client(client, namespace_of=None, cgroup_of=None):
+    """
+    @brief Replaces the Docker client (e.g. with core.fake.FakeDockerClient) before first use.
+
+    @param client       Object implementing the docker.APIClient calls used here.
+    @param namespace_of Namespace resolver of a pid (lsns by default).
+    @param cgroup_of    Cgroup id resolver of a pid (core.wrapper.cgroup_id by default).
+    """
+    global _client, _event_loop, _namespace_of, _cgroup_of
+    with _init_lock:
+        _client = client
+        _event_loop = None
+        _namespace_of = namespace_of or lsns
+        _cgroup_of = cgroup_of or cgroup_id
+
+
+def get_client():
+    """
+    @brief Returns the shared docker.APIClient, connecting on first call.
+    """
+    global _client
+    with _init_lock:
+        if _client is None:
+            import docker
+
+            _client = docker.APIClient()
+    return _client
+
+
+def get_event_loop() -> "DockerEventLoop":
+    """
+    @brief Returns the shared DockerEventLoop, starting it on first call.
+    """
+    global _event_loop
+    client = get_client()
+    with _init_lock:
+        if _event_loop is None:
+            _event_loop = DockerEventLoop(client)
+            _event_loop.start()
+    return _event_loop
 
 
 class DockerEventLoop(Thread):
-    def __init__(self):
+
+    def __init__(self, client):
         super().__init__(daemon=True)
         self._subscribers = {}
         self._lock = Lock()
+        # Subscribe now (not in run()) so that no event is missed once the loop exists
+        self._events = client.events(decode=True)
 
     def subscribe_start(self, cid: str, callback):
         with self._lock:
             self._subscribers[cid] = callback
 
     def run(self):
-        for event in client.events(decode=True):
+        for event in self._events:
             if event.get("Type") != "container":
                 continue
             if event.get("Action") != "start":
@@ -47,10 +111,6 @@ class DockerEventLoop(Thread):
                 callback()
 
 
-event_loop = DockerEventLoop()
-event_loop.start()
-
-
 class Container:
     """
     @class Container
@@ -71,18 +131,23 @@ class Container:
         self.img = img
         self.pid = -1
         self.ns = None
-        self.container_id = client.create_container(self.img, **kwargs)["Id"]
+        self.cgroup = None
+        with metrics.timer("docker_seconds", DOCKER_DOC, op="create"):
+            self.container_id = get_client().create_container(self.img, **kwargs)["Id"]
         self._ready = Event()
+        self._start_time = None
         logging.info(
             f"[core.container] Creating container.\n\tImage: {self.img}, ID: {self.container_id}"
         )
-        event_loop.subscribe_start(self.container_id, self._on_container_started)
+        get_event_loop().subscribe_start(self.container_id, self._on_container_started)
 
     def start(self):
         """
         @brief Starts the container.
         """
-        client.start(self.container_id)
+        self._start_time = perf_counter()
+        with metrics.timer("docker_seconds", DOCKER_DOC, op="start"):
+            get_client().start(self.container_id)
 
         logging.info(
             f"[core.container] Starting container.\n\t Image: {self.img}, ID: {self.container_id}"
@@ -94,7 +159,25 @@ class Container:
 
         @return Dictionary with container inspection info, or None on error.
         """
-        return client.inspect_container(self.container_id)
+        with metrics.timer("docker_seconds", DOCKER_DOC, op="inspect"):
+            return get_client().inspect_container(self.container_id)
+
+    def ip(self) -> Optional[str]:
+        """
+        @brief Address where services of the container are reachable from the host.
+
+        @return IP address (127.0.0.1 on the host network), or None if not attached.
+        """
+        settings = self.inspect().get("NetworkSettings", {})
+        networks = settings.get("Networks") or {}
+        if "host" in networks:
+            return "127.0.0.1"
+        if settings.get("IPAddress"):
+            return settings["IPAddress"]
+        for network in networks.values():
+            if network.get("IPAddress"):
+                return network["IPAddress"]
+        return None
 
     def alive(self) -> bool:
         """
@@ -105,16 +188,24 @@ class Container:
         inspection = self.inspect()
         return inspection and inspection.get("State", {}).get("Status") == "running"
 
+    @metrics.timed(
+        "container_started_callback_seconds", "Handling of a container start event"
+    )
     def _on_container_started(self):
-        info = client.inspect_container(self.container_id)
+        info = self.inspect()
         state = info.get("State", {})
         pid = state.get("Pid", 0)
         if not pid:
             return
 
         self.pid = pid
-        self.ns = lsns(pid)
         self._ready.set()
+        if self._start_time is not None:
+            metrics.observe(
+                "container_ready_seconds",
+                perf_counter() - self._start_time,
+                "From start request to the pid of the container",
+            )
 
     def wait_until_ready(self, timeout=None):
         if not self._ready.wait(timeout=timeout):
@@ -134,24 +225,68 @@ class Container:
 
     def namespace(self) -> Optional[Dict[str, str]]:
         """
-        @brief Gets the namespace object of the container.
+        @brief Gets the namespace object of the container (lsns on first call).
 
         @return Namespace object or None on failure.
         """
-        if self.ns is not None:
-            return self.ns
-
-        if self.pid == 0:
-            return None
+        if self.ns is None and self.get_pid() > 0:
+            self.ns = _namespace_of(self.pid)
+        return self.ns
 
-        self.wait_until_ready(5)
-        if self.pid == 0 or self.ns is None:
-            return None
+    def cgroup_id(self) -> Optional[int]:
+        """
+        @brief Gets the cgroup v2 id of the container (key of -DBEACON_CGROUP_KEY maps).
 
-        return self.ns
+        @return Cgroup id or None on failure.
+        """
+        if self.cgroup is None and self.get_pid() > 0:
+            self.cgroup = _cgroup_of(self.pid)
+        return self.cgroup
 
     def clean(self):
-        client.remove_container(self.container_id, force=True)
+        with metrics.timer("docker_seconds", DOCKER_DOC, op="remove"):
+            get_client().remove_container(self.container_id, force=True)
+
+
+def split_reference(ref: str) -> Tuple[str, str]:
+    """
+    @brief Split an image reference into repository and tag ("latest" if none).
+
+    A colon of the registry (`registry:5000/app`) does not start a tag.
+    """
+    repo, _, tag = ref.rpartition(":") if ":" in ref.split("/")[-1] else (ref, "", "")
+    return repo, tag or "latest"
+
+
+def result_name(ref: str) -> str:
+    """
+    @brief File name (without extension) of the results of an image, e.g. `nginx:latest`.
+
+    Slashes of the repository are replaced by "+" (not allowed in references), so that
+    results of `org/app` stay in the result directory.
+    """
+    return ref.replace("/", "+")
+
+
+def image_digest(img: str, pull: bool = False) -> Optional[str]:
+    """
+    @brief Resolves the content digest (image ID) which a tag currently points to.
+
+    @param  img     Image reference, e.g. `nginx:latest`.
+    @param  pull    Pull the tag first so that a moved tag is noticed.
+    @return Image ID (`sha256:...`) or None if the image is unavailable.
+    """
+    from docker.errors import APIError
+
+    client = get_client()
+    try:
+        if pull:
+            repo, tag = split_reference(img)
+            client.pull(repo, tag=tag)
+        return client.inspect_image(img)["Id"]
+    except APIError as e:
+        logging.warning(f"[core.container] Unable to resolve digest of {img}: {e}")
+        return None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,390 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file fake.py
+@brief  In-memory stand-ins for the Docker API and the eBPF program.
+@author Haney Kang
+
+@details
+FakeDockerClient implements the subset of docker.APIClient used by core.container, and
+FakeBPF exposes the tables of inst.c shaped like BCC's tables (a ctypes Key, and an
+array of ctypes Leaf values per CPU for per-CPU maps). When a fake container starts,
+its namespace (or its cgroup id, with cgroup_key=True) gets an entry with a bitmap
+derived from the image name, spread across CPUs, so the whole pipeline runs without root, a kernel with BCC, or a Docker daemon.
+A seccomp profile or capability set in the host config of a container is enforced on
+that profile: filtered syscalls and ungranted capabilities are recorded as denials
+(`denials` map of -DBEACON_DENY) instead of usage. The profile is also written to the
+epoch map selected by `epoch_idx` (-DBEACON_EPOCH).
+
+    bpf = FakeBPF()
+    client = FakeDockerClient(bpf)
+    set_client(client, namespace_of=client.namespace_of, cgroup_of=client.cgroup_of)
+    session = MonitoringSession(bpf=bpf)
+"""
+
+import random
+import builtins
+import hashlib
+import ctypes as ct
+from queue import Queue
+from threading import Lock
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from monitoring.ebpf.structs import (
+    NS_FIELDS,
+    Attrib,
+    Epoch,
+    Namespace,
+    SysAndCap,
+    tables,
+)
+
+
+class FakeTable:
+    """
+    @class FakeTable
+    @brief Hash table with BCC's table interface (items/getitem/setitem/delitem/len/clear).
+
+    Values of a per-CPU table are arrays of `ncpu` leaves, as BCC's PerCpuHash returns them.
+    """
+
+    def __init__(
+        self,
+        key_type,
+        leaf_type,
+        ncpu: int = 4,
+        max_entries: int = 16384,
+        percpu: bool = True,
+    ):
+        self.Key = key_type
+        self.sLeaf = leaf_type
+        self.Leaf = leaf_type * ncpu if percpu else leaf_type
+        self.ncpu = ncpu
+        self.percpu = percpu
+        self.max_entries = max_entries
+        self._data: Dict[bytes, Any] = {}
+        self._lock = Lock()
+
+    def _k(self, key) -> bytes:
+        if isinstance(key, int):
+            key = self.Key(key)
+        return bytes(key)
+
+    def __getitem__(self, key):
+        with self._lock:
+            if self._k(key) not in self._data:
+                raise KeyError(key)
+            return self._data[self._k(key)][1]
+
+    def __setitem__(self, key, values):
+        with self._lock:
+            if self._k(key) not in self._data and len(self._data) >= self.max_entries:
+                raise Exception("Could not update table: E2BIG")
+            if self.percpu and not isinstance(values, self.Leaf):
+                leaf = self.Leaf()
+                for cpu, value in enumerate(values):
+                    leaf[cpu] = value
+            else:
+                leaf = values
+            self._data[self._k(key)] = (key, leaf)
+
+    def __delitem__(self, key):
+        with self._lock:
+            if self._data.pop(self._k(key), None) is None:
+                raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return self._k(key) in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.values())
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FakeBPF:
+    """
+    @class FakeBPF
+    @brief RobustBPF stand-in holding the tables of inst.c (all optional modes included).
+    """
+
+    def __init__(
+        self, ncpu: int = 4, arg_entries: int = 65536, cgroup_key: bool = False
+    ):
+        """
+        @param cgroup_key   Key the tables by cgroup id, like -DBEACON_CGROUP_KEY.
+        """
+        self.ncpu = ncpu
+        self.cgroup_key = cgroup_key
+        self.tables = {
+            name: FakeTable(
+                key, leaf, ncpu, arg_entries if name == "sys_args" else size, percpu
+            )
+            for name, (key, leaf, size, percpu) in tables(cgroup_key).items()
+        }
+        self.tables["arg_drops"][0] = [0] * ncpu
+        self.tables["attrib_drops"][0] = [0] * ncpu
+        self.tables["epoch_idx"][0] = ct.c_uint(0)
+        self.attached = True
+        self.probes_attached = True
+        self.lost = 0  # Profiles tracked while the probes were detached
+
+    def __getitem__(self, name: str) -> FakeTable:
+        return self.tables[name]
+
+    def attach_probes(self):
+        self.probes_attached = True
+
+    def detach_probes(self):
+        self.probes_attached = False
+
+    def track(
+        self,
+        namespace: Union[Dict[str, int], int],
+        syscalls: List[int],
+        caps: List[int],
+        seed: int = 0,
+        args: Optional[Dict[int, List[List[int]]]] = None,
+        binaries: Optional[Dict[str, List[int]]] = None,
+        denials: Optional[Dict[Tuple[int, int, int], int]] = None,
+    ):
+        """
+        @brief Record a profile for a namespace, each event on a random CPU (like the probes do).
+
+        @param namespace    Namespace tuple, or the cgroup id if the tables are keyed by it.
+        @param args     {syscall number: [6 raw arguments of a call, ...]}, kept as sys_enter
+                        would keep them: masked by arg_mask, once per distinct tuple.
+        @param binaries {comm: syscall numbers} issued by each executable.
+        @param denials  {(number, is capability, errno): count} of failed calls and checks.
+        """
+        if not self.probes_attached:  # Nothing runs the probes: the profile is lost
+            self.lost += 1
+            return
+        rnd = random.Random(seed)
+        leaves = [SysAndCap() for _ in range(self.ncpu)]
+        for leaf in leaves:
+            leaf.seccomp_flag = True
+        counts: Dict[int, List[int]] = {}
+        for num in syscalls:
+            cpu = rnd.randrange(self.ncpu)
+            leaves[cpu].sys[num // 32] |= 1 << (num % 32)
+            per_cpu = counts.setdefault(num, [0] * self.ncpu)
+            per_cpu[cpu] += rnd.randint(1, 1000)
+        for num in caps:
+            leaves[rnd.randrange(self.ncpu)].cap[num // 32] |= 1 << (num % 32)
+        key = (
+            self.tables["event"].Key(namespace)
+            if self.cgroup_key
+            else Namespace(**namespace)
+        )
+        self.tables["event"][key] = leaves
+        epoch = self.tables[
+            "epoch_b" if self.tables["epoch_idx"][0].value & 1 else "epoch_a"
+        ]
+        epoch[key] = [Epoch(sys=leaf.sys, cap=leaf.cap) for leaf in leaves]
+        for num, per_cpu in counts.items():
+            self.tables["sys_count"][self.tables["sys_count"].Key(key, num)] = per_cpu
+        for comm, nums in (binaries or {}).items():
+            attrib = [Attrib() for _ in range(self.ncpu)]
+            for num in nums:
+                attrib[rnd.randrange(self.ncpu)].sys[num // 32] |= 1 << (num % 32)
+            self.tables["sys_attrib"][
+                self.tables["sys_attrib"].Key(key, comm.encode()[:15])
+            ] = attrib
+        for (num, cap, err), total in (denials or {}).items():
+            per_cpu = [0] * self.ncpu
+            per_cpu[rnd.randrange(self.ncpu)] = total
+            self.tables["denials"][
+                self.tables["denials"].Key(key, num, cap, err)
+            ] = per_cpu
+        for num, calls in (args or {}).items():
+            if num not in self.tables["arg_mask"]:
+                continue
+            mask = self.tables["arg_mask"][num].value
+            for call in calls:
+                arg_key = self.tables["sys_args"].Key(ns=key, nr=num, mask=mask)
+                for i, value in enumerate(call):
+                    if mask & (1 << i):
+                        arg_key.args[i] = value
+                if arg_key in self.tables["sys_args"]:
+                    continue
+                try:
+                    self.tables["sys_args"][arg_key] = ct.c_ubyte(1)
+                except Exception:
+                    self.tables["arg_drops"][0][rnd.randrange(self.ncpu)] += 1
+
+    def prog_stats(self):
+        return {}
+
+    def cleanup(self):
+        self.attached = False
+
+
+def fake_profile(image: str):
+    """Deterministic (syscalls, capabilities) of an image, seeded by its name."""
+    rnd = random.Random(hashlib.sha256(image.encode()).digest())
+    syscalls = sorted(rnd.sample(range(0, 335), rnd.randint(40, 120)))
+    caps = sorted(rnd.sample(range(0, 41), rnd.randint(0, 6)))
+    return syscalls, caps
+
+
+def enforce(syscalls: List[int], caps: List[int], host_config: Dict[str, Any]):
+    """
+    Apply the seccomp profile (SecurityOpt "seccomp=<json>") and CapAdd/CapDrop of a host
+    config to a profile, as the kernel would.
+
+    @return (syscalls reaching sys_enter, {(number, is capability, errno): count} of denials)
+    """
+    import json
+
+    from policy.seccomp import EPERM, allowed_syscalls, granted_capabilities
+
+    denials: Dict[Tuple[int, int, int], int] = {}
+    for opt in host_config.get("SecurityOpt") or []:
+        if opt.startswith("seccomp=") and opt != "seccomp=unconfined":
+            profile = json.loads(opt[len("seccomp=") :])
+            allowed = allowed_syscalls(profile)
+            err = profile.get("defaultErrnoRet", EPERM)
+            denials.update(((num, 0, err), 1) for num in syscalls if num not in allowed)
+            syscalls = [num for num in syscalls if num in allowed]
+    if "CapAdd" in host_config or "CapDrop" in host_config:
+        granted = granted_capabilities(
+            host_config.get("CapAdd") or [], host_config.get("CapDrop") or []
+        )
+        denials.update(((num, 1, EPERM), 1) for num in caps if num not in granted)
+    return syscalls, denials
+
+
+class FakeDockerClient:
+    """
+    @class FakeDockerClient
+    @brief docker.APIClient stand-in: containers live in memory and a start emits an event.
+    """
+
+    def __init__(self, bpf: Optional[FakeBPF] = None, start_delay: float = 0.0):
+        """
+        @param bpf          Fake program receiving the profile of each started container.
+        @param start_delay  Seconds a start takes (before its event is emitted).
+        """
+        self.bpf = bpf
+        self.start_delay = start_delay
+        self._containers: Dict[str, Dict[str, Any]] = {}
+        self._events: Queue = Queue()
+        self._ids = count(1)
+        self._lock = Lock()
+
+    def create_container(self, image: str, **kwargs) -> Dict[str, str]:
+        cid = hashlib.sha256(f"{image}-{next(self._ids)}".encode()).hexdigest()
+        with self._lock:
+            self._containers[cid] = {
+                "image": image,
+                "kwargs": kwargs,
+                "status": "created",
+                "pid": 0,
+                "labels": kwargs.get("labels") or {},
+            }
+        return {"Id": cid}
+
+    def start(self, cid: str):
+        from time import sleep
+
+        with self._lock:
+            container = self._containers[cid]
+            pid = 10000 + len(self._containers) + next(self._ids)
+        if self.start_delay:
+            sleep(self.start_delay)
+        container.update(status="running", pid=pid)
+        if self.bpf is not None:
+            syscalls, caps = fake_profile(container["image"])
+            syscalls, denials = enforce(
+                syscalls, caps, container["kwargs"].get("host_config") or {}
+            )
+            key = self.cgroup_of(pid) if self.bpf.cgroup_key else self.namespace_of(pid)
+            self.bpf.track(key, syscalls, caps, seed=pid, denials=denials)
+        self._events.put({"Type": "container", "Action": "start", "id": cid})
+
+    def stop(self, cid: str):
+        self._containers[cid]["status"] = "exited"
+
+    def inspect_container(self, cid: str) -> Dict[str, Any]:
+        container = self._containers.get(cid)
+        if container is None:
+            raise KeyError(f"No such container: {cid}")
+        return {
+            "Id": cid,
+            "Config": {"Image": container["image"], "Labels": container["labels"]},
+            "State": {"Status": container["status"], "Pid": container["pid"]},
+            "NetworkSettings": {"IPAddress": "127.0.0.1", "Networks": {}},
+        }
+
+    def remove_container(self, cid: str, force: bool = False):
+        with self._lock:
+            self._containers.pop(cid, None)
+
+    def containers(
+        self, all: bool = False, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """docker.APIClient.containers(): running ones unless `all`, filtered by "label" ("key[=value]")."""
+        labels = (filters or {}).get("label") or []
+        labels = [labels] if isinstance(labels, str) else labels
+        result = []
+        for cid, c in list(self._containers.items()):
+            if not all and c["status"] != "running":
+                continue
+            matches = (
+                key in c["labels"] and (not value or c["labels"][key] == value)
+                for key, _, value in (label.partition("=") for label in labels)
+            )
+            if builtins.all(matches):
+                result.append(
+                    {
+                        "Id": cid,
+                        "Image": c["image"],
+                        "Labels": c["labels"],
+                        "State": c["status"],
+                    }
+                )
+        return result
+
+    def events(self, decode: bool = True):
+        while True:
+            yield self._events.get()
+
+    def pull(self, repo: str, tag: str = "latest"):
+        pass
+
+    def inspect_image(self, image: str) -> Dict[str, Any]:
+        return {"Id": "sha256:" + hashlib.sha256(image.encode()).hexdigest()}
+
+    def namespace_of(self, pid: int) -> Dict[str, int]:
+        """lsns stand-in: a distinct namespace tuple per pid."""
+        return {name: 4026530000 + pid * 8 + i for i, name in enumerate(NS_FIELDS)}
+
+    def cgroup_of(self, pid: int) -> int:
+        """core.wrapper.cgroup_id stand-in: a distinct cgroup id per pid."""
+        return 0x100000000 + pid
+
+
+def install(start_delay: float = 0.0, cgroup_key: bool = False) -> FakeBPF:
+    """
+    @brief Route core.container to a FakeDockerClient and return the FakeBPF it feeds.
+
+    @param start_delay  Seconds each container start takes.
+    @param cgroup_key   Key the fake tables by cgroup id.
+    """
+    from core.container import set_client
+
+    bpf = FakeBPF(cgroup_key=cgroup_key)
+    client = FakeDockerClient(bpf, start_delay)
+    set_client(client, namespace_of=client.namespace_of, cgroup_of=client.cgroup_of)
+    return bpf
@@ -0,0 +1,495 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file governor.py
+@brief  Adapt the number of containers profiled at once to the load of the host.
+@author Haney Kang
+
+@details
+Profiling many containers at once saturates the host: services slow down (and behave
+differently), and every probe run costs more. A Governor samples the host every
+`interval` seconds:
+  - CPU utilization from /proc/stat, available memory from /proc/meminfo,
+  - PSI pressure (/proc/pressure/{cpu,memory,io}, "some avg10"),
+  - CPU rate and memory of each monitored container (its cgroup v2 cpu.stat and
+    memory.current),
+and adjusts its concurrency limit like a congestion window (AIMD): one more slot
+while the host is idle and work is waiting, half the slots when it is overloaded.
+A new container is also admitted only if the available memory can hold one more
+container of the mean observed size.
+
+Workers take a Slot before starting a container. With `pin`, each slot owns a
+disjoint group of CPUs (cgroup cpuset, Docker's CpusetCpus), the first
+`reserve_cpus` CPUs being left to the host and the probes:
+
+    governor = Governor(max_workers=8, pin=True).start()
+    with governor.slot() as slot:
+        ev, _ = run_container(session, ref, kwargs, slot=slot)
+    governor.stop()
+"""
+
+import os
+import logging
+from time import monotonic
+from threading import Condition, Event, Lock, Thread
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from core.metrics import metrics
+from core.wrapper import CGROUP_ROOT, cgroup_path
+
+PROC_ROOT = "/proc"
+PSI_RESOURCES = ("cpu", "memory", "io")
+
+
+class ContainerStats(NamedTuple):
+    cpu: Optional[
+        float
+    ]  # CPUs used (cpu.stat usage_usec rate), None on the first sample
+    memory: int  # memory.current, bytes
+
+
+class HostSample(NamedTuple):
+    cpu_busy: Optional[float]  # Fraction of CPU time not idle since the last sample
+    mem_total: int  # Bytes
+    mem_available: int  # Bytes
+    psi: Dict[str, float]  # {resource: "some avg10" in percent}, empty without PSI
+    containers: Dict[str, ContainerStats]  # {slot name: stats}
+
+
+def read_cpu_times(proc_root: str = PROC_ROOT) -> Tuple[int, int]:
+    """
+    @return (busy, total) jiffies of all CPUs (idle and iowait are not busy).
+    """
+    with open(os.path.join(proc_root, "stat")) as f:
+        fields = [int(value) for value in f.readline().split()[1:]]
+    total = sum(fields[:8])  # guest times are already part of user and nice
+    return total - fields[3] - fields[4], total
+
+
+def read_meminfo(proc_root: str = PROC_ROOT) -> Tuple[int, int]:
+    """
+    @return (MemTotal, MemAvailable) in bytes.
+    """
+    info = {}
+    with open(os.path.join(proc_root, "meminfo")) as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            info[key] = int(value.split()[0]) * 1024
+    return info["MemTotal"], info.get("MemAvailable", info.get("MemFree", 0))
+
+
+def read_psi(resource: str, proc_root: str = PROC_ROOT) -> Optional[float]:
+    """
+    @return "some avg10" of /proc/pressure/<resource>, None if PSI is unavailable.
+    """
+    try:
+        with open(os.path.join(proc_root, "pressure", resource)) as f:
+            for line in f:
+                kind, *values = line.split()
+                if kind == "some":
+                    return float(dict(value.split("=") for value in values)["avg10"])
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def read_cgroup_stats(path: str) -> Optional[Tuple[int, int]]:
+    """
+    @return (cpu.stat usage_usec, memory.current) of a cgroup v2 directory, None if it is gone.
+    """
+    try:
+        with open(os.path.join(path, "cpu.stat")) as f:
+            usage = next(
+                int(line.split()[1]) for line in f if line.startswith("usage_usec")
+            )
+        with open(os.path.join(path, "memory.current")) as f:
+            memory = int(f.read())
+    except (OSError, StopIteration, ValueError):
+        return None
+    return usage, memory
+
+
+class HostMonitor:
+    """
+    @class HostMonitor
+    @brief Samples the host and the cgroups of the monitored containers (rates since the last sample).
+    """
+
+    def __init__(self, proc_root: str = PROC_ROOT):
+        self.proc_root = proc_root
+        self._cpu: Optional[Tuple[int, int]] = None
+        self._usage: Dict[str, Tuple[float, int]] = {}  # {cgroup: (time, usage_usec)}
+
+    def sample(self, cgroups: Dict[str, str]) -> HostSample:
+        """
+        @param cgroups  {name: cgroup directory} of the monitored containers.
+        """
+        busy, total = read_cpu_times(self.proc_root)
+        cpu_busy = None
+        if self._cpu is not None and total > self._cpu[1]:
+            cpu_busy = (busy - self._cpu[0]) / (total - self._cpu[1])
+        self._cpu = (busy, total)
+        mem_total, mem_available = read_meminfo(self.proc_root)
+        psi = {}
+        for resource in PSI_RESOURCES:
+            value = read_psi(resource, self.proc_root)
+            if value is not None:
+                psi[resource] = value
+
+        now = monotonic()
+        containers, usage = {}, {}
+        for name, path in cgroups.items():
+            stats = read_cgroup_stats(path)
+            if stats is None:
+                continue
+            cpu = None
+            if path in self._usage and now > self._usage[path][0]:
+                cpu = (
+                    (stats[0] - self._usage[path][1])
+                    / 1e6
+                    / (now - self._usage[path][0])
+                )
+            usage[path] = (now, stats[0])
+            containers[name] = ContainerStats(cpu, stats[1])
+        self._usage = usage
+        return HostSample(cpu_busy, mem_total, mem_available, psi, containers)
+
+
+class Slot:
+    """
+    @class Slot
+    @brief Permission to run one container, with its CPUs if the governor pins containers.
+    """
+
+    def __init__(
+        self, cpus: Optional[List[int]] = None, cgroup_root: str = CGROUP_ROOT
+    ):
+        self.cpus = cpus
+        self.cgroup_root = cgroup_root
+        self.name: Optional[str] = None
+        self.cgroup: Optional[str] = None
+
+    def apply(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        @return Create kwargs restricted to the CPUs of the slot (kwargs itself is untouched).
+        """
+        if not self.cpus:
+            return kwargs
+        host_config = dict(kwargs.get("host_config") or {})
+        host_config["CpusetCpus"] = ",".join(map(str, self.cpus))
+        return {**kwargs, "host_config": host_config}
+
+    def attach(self, name: str, pid: int):
+        """
+        @brief Account the cgroup of a started container to this slot.
+        """
+        self.name = name
+        self.cgroup = cgroup_path(pid, self.cgroup_root)
+
+
+class Governor:
+    """
+    @class Governor
+    @brief Concurrency limit of the profiled containers, adjusted to the host load (AIMD).
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        min_workers: int = 1,
+        interval: float = 1.0,
+        cpu_high: float = 0.85,
+        cpu_low: float = 0.6,
+        psi_high: float = 20.0,
+        mem_low: float = 0.1,
+        cooldown: float = 10.0,
+        pin: bool = False,
+        cpus_per_container: int = 1,
+        reserve_cpus: int = 1,
+        monitor: Optional[HostMonitor] = None,
+        cgroup_root: str = CGROUP_ROOT,
+    ):
+        """
+        @param max_workers  Upper bound of the limit (which starts at min_workers).
+        @param min_workers  Containers always allowed, whatever the load.
+        @param interval     Sampling period in seconds.
+        @param cpu_high     CPU utilization above which the host is overloaded.
+        @param cpu_low      CPU utilization below which one more container is allowed.
+        @param psi_high     PSI "some avg10" (%) of cpu or memory above which the host is overloaded.
+        @param mem_low      Fraction of memory which must stay available.
+        @param cooldown     Seconds between two decreases (avg10 needs time to reflect one).
+        @param pin          Give each slot its own CPUs (cpuset).
+        @param cpus_per_container   CPUs of a slot when pinning.
+        @param reserve_cpus CPUs left to the host when pinning.
+        @param monitor      Host sampler (HostMonitor reading /proc if None).
+        @param cgroup_root  Mount point of cgroup2.
+        """
+        self.min_workers = max(1, min_workers)
+        self.max_workers = max(self.min_workers, max_workers)
+        self.interval = interval
+        self.cpu_high, self.cpu_low = cpu_high, cpu_low
+        self.psi_high = psi_high
+        self.mem_low = mem_low
+        self.cooldown = cooldown
+        self.monitor = monitor or HostMonitor()
+        self.cgroup_root = cgroup_root
+
+        self._free_cpus: Optional[List[List[int]]] = None
+        if pin:
+            cpus = sorted(os.sched_getaffinity(0))[reserve_cpus:]
+            self._free_cpus = [
+                cpus[i : i + cpus_per_container]
+                for i in range(
+                    0, len(cpus) - cpus_per_container + 1, cpus_per_container
+                )
+            ]
+            if not self._free_cpus:
+                raise ValueError(
+                    f"No CPU left to pin containers ({len(cpus)} after {reserve_cpus} reserved)"
+                )
+            self.max_workers = min(self.max_workers, len(self._free_cpus))
+            self.min_workers = min(self.min_workers, self.max_workers)
+
+        self.limit = self.min_workers
+        self.sample: Optional[HostSample] = None
+        self._slots: List[Slot] = []
+        self._waiting = 0
+        self._admit_memory = True
+        self._last_decrease = float("-inf")
+        self._cond = Condition(Lock())
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def running(self) -> int:
+        return len(self._slots)
+
+    def start(self) -> "Governor":
+        """
+        @brief Sample the host in a background thread until stop().
+        """
+        self.poll()
+        self._thread = Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:  # Keep the last limit, never stall the workers
+                logging.warning(f"[core.governor] Host sampling failed: {e}")
+
+    def poll(self) -> int:
+        """
+        @brief Sample the host once and adjust the limit.
+
+        @return New limit.
+        """
+        with self._cond:
+            cgroups = {
+                slot.name: slot.cgroup
+                for slot in self._slots
+                if slot.cgroup is not None
+            }
+        sample = self.monitor.sample(cgroups)
+        with self._cond:
+            self.sample = sample
+            self._adjust(sample)
+            self._cond.notify_all()
+        metrics.set("governor_limit", self.limit, "Containers allowed at once")
+        metrics.set(
+            "governor_running", self.running, "Containers running under the governor"
+        )
+        if sample.cpu_busy is not None:
+            metrics.set("host_cpu_busy", sample.cpu_busy, "Host CPU utilization")
+        metrics.set(
+            "host_memory_available_bytes", sample.mem_available, "Host available memory"
+        )
+        for resource, value in sample.psi.items():
+            metrics.set(
+                "host_pressure_some_avg10",
+                value,
+                "Host PSI some avg10 (%)",
+                resource=resource,
+            )
+        for name, stats in sample.containers.items():
+            if stats.cpu is not None:
+                metrics.set(
+                    "container_cpu",
+                    stats.cpu,
+                    "CPUs used by a monitored container",
+                    image=name,
+                )
+            metrics.set(
+                "container_memory_bytes",
+                stats.memory,
+                "Memory of a monitored container",
+                image=name,
+            )
+        return self.limit
+
+    def _overloaded(self, sample: HostSample) -> Optional[str]:
+        if sample.cpu_busy is not None and sample.cpu_busy > self.cpu_high:
+            return f"cpu {sample.cpu_busy:.0%}"
+        for resource in ("cpu", "memory"):
+            if sample.psi.get(resource, 0.0) > self.psi_high:
+                return f"{resource} pressure {sample.psi[resource]:.1f}%"
+        if sample.mem_available < self.mem_low * sample.mem_total:
+            return f"{sample.mem_available >> 20} MiB available"
+        return None
+
+    def _adjust(self, sample: HostSample):
+        memories = [stats.memory for stats in sample.containers.values()]
+        expected = sum(memories) / len(memories) if memories else 0
+        self._admit_memory = (
+            sample.mem_available - expected >= self.mem_low * sample.mem_total
+        )
+
+        reason = self._overloaded(sample)
+        now = monotonic()
+        if reason is not None:
+            if (
+                self.limit > self.min_workers
+                and now - self._last_decrease >= self.cooldown
+            ):
+                self.limit = max(self.min_workers, self.limit // 2)
+                self._last_decrease = now
+                logging.info(
+                    f"[core.governor] Host overloaded ({reason}), limit lowered to {self.limit}."
+                )
+            return
+        idle = (sample.cpu_busy is None or sample.cpu_busy < self.cpu_low) and all(
+            sample.psi.get(resource, 0.0) < self.psi_high / 2
+            for resource in ("cpu", "memory")
+        )
+        if (
+            idle
+            and self._waiting
+            and self.running >= self.limit
+            and self.limit < self.max_workers
+        ):
+            self.limit += 1
+            logging.debug(f"[core.governor] Host idle, limit raised to {self.limit}.")
+
+    def _admissible(self) -> bool:
+        if self.running < self.min_workers:
+            return True
+        return self.running < self.limit and self._admit_memory
+
+    @contextmanager
+    def slot(self) -> Iterator[Slot]:
+        """
+        @brief Wait for a slot, and release it when the block exits.
+        """
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._admissible():
+                    self._cond.wait(self.interval)
+            finally:
+                self._waiting -= 1
+            slot = Slot(
+                self._free_cpus.pop(0) if self._free_cpus is not None else None,
+                self.cgroup_root,
+            )
+            self._slots.append(slot)
+        try:
+            yield slot
+        finally:
+            with self._cond:
+                self._slots.remove(slot)
+                if slot.cpus is not None:
+                    self._free_cpus.append(slot.cpus)
+                self._cond.notify()
+
+    def __enter__(self) -> "Governor":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from time import sleep
+    from concurrent.futures import ThreadPoolExecutor
+
+    proc = tempfile.mkdtemp()
+    os.makedirs(os.path.join(proc, "pressure"))
+
+    def host(busy: int, idle: int, available_kb: int, psi_cpu: float):
+        with open(os.path.join(proc, "stat"), "w") as f:
+            f.write(f"cpu  {busy} 0 0 {idle} 0 0 0 0 0 0\n")
+        with open(os.path.join(proc, "meminfo"), "w") as f:
+            f.write(
+                f"MemTotal: 1000000 kB\nMemFree: 1 kB\nMemAvailable: {available_kb} kB\n"
+            )
+        for resource in PSI_RESOURCES:
+            with open(os.path.join(proc, "pressure", resource), "w") as f:
+                value = psi_cpu if resource == "cpu" else 0.0
+                f.write(f"some avg10={value:.2f} avg60=0.00 avg300=0.00 total=0\n")
+
+    host(0, 0, 900000, 0.0)
+    governor = Governor(8, interval=0.01, cooldown=0, monitor=HostMonitor(proc))
+    governor.poll()
+
+    busy = idle = 0
+    hold = Event()
+
+    def work(_):
+        with governor.slot():
+            hold.wait()
+
+    # Idle host with queued work: the limit grows one slot per sample
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        pool.map(work, range(6))
+        for step in range(10):
+            busy, idle = busy + 10, idle + 90
+            host(busy, idle, 900000, 1.0)
+            governor.poll()
+            sleep(0.05)
+        grown, running = governor.limit, governor.running
+        hold.set()
+    if grown == 6 and running == 6:
+        print(f"✅ Limit raised to {grown} on an idle host with queued containers")
+    else:
+        print(f"❌ Limit {grown}, running {running}")
+
+    busy, idle = busy + 95, idle + 5
+    host(busy, idle, 900000, 1.0)
+    governor.poll()
+    if governor.limit == 3:
+        print("✅ Limit halved when CPU is saturated")
+    else:
+        print(f"❌ Limit {governor.limit} after overload")
+    busy, idle = busy + 10, idle + 90
+    host(busy, idle, 900000, 35.0)
+    governor.poll()
+    if governor.limit == 1:
+        print("✅ Limit halved under CPU pressure (PSI), never below min_workers")
+    else:
+        print(f"❌ Limit {governor.limit} under pressure")
+
+    if len(os.sched_getaffinity(0)) >= 3:
+        pinned = Governor(8, min_workers=2, monitor=HostMonitor(proc), pin=True)
+        with pinned.slot() as a, pinned.slot() as b:
+            disjoint = not set(a.cpus) & set(b.cpus) and 0 not in a.cpus + b.cpus
+            kwargs = a.apply({"host_config": {"NetworkMode": "host"}})
+        if disjoint and kwargs["host_config"]["CpusetCpus"] == ",".join(
+            map(str, a.cpus)
+        ):
+            print("✅ Pinned slots own disjoint CPUs, CPU 0 reserved")
+        else:
+            print(f"❌ Pinned slots {a.cpus} {b.cpus}")
+    else:
+        print("Pinning skipped (fewer than 3 CPUs)")
+
+    print("\n== Test passed ==")
@@ -0,0 +1,261 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file journal.py
+@brief  Write-ahead journal of a sweep, so that a crashed sweep resumes where it stopped.
+@author Haney Kang
+
+@details
+Every state change of an image is appended as one JSON line and fsync'ed before the
+sweep acts on it:
+
+    created (container id) -> started -> monitoring -> collected (profile) -> cleaned
+
+Containers of a sweep carry the labels `beacon.sweep=<sweep id>` and
+`beacon.image=<image>`. When a sweep restarts on the same journal:
+  - reap() removes every container left by the crashed run (labels and ids),
+  - done() images (profile collected) are not profiled again,
+  - other images which were in flight are profiled again from scratch.
+
+A truncated last line (crash in the middle of a write) is ignored on replay.
+"""
+
+import os
+import json
+import uuid
+import logging
+from time import time
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+STATES = ("created", "started", "monitoring", "collected", "cleaned")
+SWEEP_LABEL = "beacon.sweep"
+IMAGE_LABEL = "beacon.image"
+
+
+class Journal:
+    """
+    @class Journal
+    @brief Append-only JSONL log of the state of each image of a sweep.
+    """
+
+    def __init__(self, path: str):
+        """
+        @param path     Journal file (created if missing, replayed otherwise).
+                        A journal of a finished sweep is rotated, so that a new sweep starts.
+        """
+        self.path = path
+        self.sweep_id: Optional[str] = None
+        self.entries: Dict[str, Dict[str, Any]] = (
+            {}
+        )  # {image: merged fields of its records}
+        self.finished = False
+        self._lock = Lock()
+        self._replay()
+        if self.finished:
+            rotated = f"{path}.{int(time())}"
+            os.replace(path, rotated)
+            logging.info(
+                f"[core.journal] Previous sweep finished, journal moved to {rotated}."
+            )
+            self.sweep_id, self.entries, self.finished = None, {}, False
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a")
+        if self.sweep_id is None:
+            self.sweep_id = uuid.uuid4().hex[:12]
+            self._append({"sweep": self.sweep_id})
+        elif self.entries:
+            logging.info(
+                f"[core.journal] Resuming sweep {self.sweep_id}: {len(self.done())} done, "
+                f"{len(self.in_flight())} in flight."
+            )
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(
+                data
+            ):  # Crashed in the middle of a write: drop the partial line
+                logging.warning(
+                    f"[core.journal] Truncated record at the end of {self.path} is dropped."
+                )
+                f.truncate(end)
+        for line in data[:end].decode().splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logging.warning(
+                    f"[core.journal] Corrupted record of {self.path} is ignored: {line[:80]}"
+                )
+                continue
+            if "sweep" in record:
+                self.sweep_id = record["sweep"]
+            elif record.get("event") == "finished":
+                self.finished = True
+            elif "image" in record:
+                self.entries.setdefault(record["image"], {}).update(record)
+
+    def _append(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, image: str, state: str, **fields):
+        """
+        @brief Durably record a state of an image (written and fsync'ed before returning).
+
+        @param image    Image reference.
+        @param state    One of STATES.
+        @param fields   Data of the state (e.g. cid, profile).
+        """
+        if state not in STATES:
+            raise ValueError(f"Unknown state: {state}")
+        record = {"t": round(time(), 3), "image": image, "state": state, **fields}
+        with self._lock:
+            self._append(record)
+            self.entries.setdefault(image, {}).update(record)
+
+    def finish(self):
+        """
+        @brief Mark the sweep as complete (the next run on this file starts a new sweep).
+        """
+        with self._lock:
+            self._append({"t": round(time(), 3), "event": "finished"})
+            self.finished = True
+
+    def state(self, image: str) -> Optional[str]:
+        return self.entries.get(image, {}).get("state")
+
+    def profile(self, image: str) -> Optional[Dict[str, Any]]:
+        """
+        @return Profile record collected for the image, or None.
+        """
+        return self.entries.get(image, {}).get("profile")
+
+    def done(self) -> List[str]:
+        """
+        @return Images whose profile has been collected.
+        """
+        return [image for image, entry in self.entries.items() if "profile" in entry]
+
+    def in_flight(self) -> List[str]:
+        """
+        @return Images whose container may still exist.
+        """
+        return [
+            image
+            for image, entry in self.entries.items()
+            if entry.get("state") not in (None, "cleaned")
+        ]
+
+    def labels(self, image: str) -> Dict[str, str]:
+        """
+        @return Docker labels of the container of an image in this sweep.
+        """
+        return {SWEEP_LABEL: self.sweep_id, IMAGE_LABEL: image}
+
+    def reap(self, client) -> List[str]:
+        """
+        @brief Remove the containers left by a crashed run of this sweep.
+
+        @param  client  Docker API client (core.container.get_client()).
+        @return Removed container ids.
+        """
+        in_flight = self.in_flight()
+        cids = {
+            self.entries[image]["cid"]: image
+            for image in in_flight
+            if "cid" in self.entries[image]
+        }
+        try:
+            for container in client.containers(
+                all=True, filters={"label": f"{SWEEP_LABEL}={self.sweep_id}"}
+            ):
+                cids.setdefault(
+                    container["Id"], (container.get("Labels") or {}).get(IMAGE_LABEL)
+                )
+        except Exception as e:
+            logging.warning(
+                f"[core.journal] Unable to list containers of sweep {self.sweep_id}: {e}"
+            )
+
+        reaped = []
+        for cid, image in cids.items():
+            try:
+                client.remove_container(cid, force=True)
+                reaped.append(cid)
+            except Exception:  # Already removed
+                pass
+            if image is not None and self.state(image) != "cleaned":
+                self.record(image, "cleaned", reaped=True)
+        if reaped:
+            logging.warning(
+                f"[core.journal] Reaped {len(reaped)} orphaned containers of sweep {self.sweep_id}."
+            )
+        return reaped
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from core.fake import FakeDockerClient
+
+    path = os.path.join(tempfile.mkdtemp(), "journal.jsonl")
+    client = FakeDockerClient()
+
+    journal = Journal(path)
+    done_cid = client.create_container("a:1", labels=journal.labels("a:1"))["Id"]
+    journal.record("a:1", "created", cid=done_cid)
+    journal.record("a:1", "collected", profile={"syscalls": [0, 1], "capabilities": []})
+    client.remove_container(done_cid, force=True)
+    journal.record("a:1", "cleaned")
+    cid = client.create_container("b:1", labels=journal.labels("b:1"))["Id"]
+    journal.record("b:1", "created", cid=cid)
+    journal.record("b:1", "started")
+    client.create_container(
+        "c:1", labels=journal.labels("c:1")
+    )  # Crashed before recording it
+    journal._file.write(
+        '{"t": 1, "image": "b:1", "sta'
+    )  # Crash in the middle of a write
+    journal._file.close()
+
+    journal = Journal(path)
+    if journal.done() == ["a:1"] and journal.in_flight() == ["b:1"]:
+        print("✅ Journal replayed (truncated line ignored)")
+    else:
+        print(f"❌ Replay: done={journal.done()}, in flight={journal.in_flight()}")
+    reaped = journal.reap(client)
+    if len(reaped) == 2 and cid in reaped and not client.containers(all=True):
+        print("✅ Orphaned containers reaped (journal ids and sweep label)")
+    else:
+        print(f"❌ Reaped {reaped}, left {client.containers(all=True)}")
+    journal.close()
+    journal = Journal(path)
+    if journal.state("b:1") == "cleaned" and journal.profile("a:1")["syscalls"] == [
+        0,
+        1,
+    ]:
+        print("✅ Completed profile kept, in-flight image marked cleaned")
+    else:
+        print("❌ States after reaping")
+
+    sweep_id = journal.sweep_id
+    journal.finish()
+    journal.close()
+    journal = Journal(path)
+    if journal.sweep_id != sweep_id and not journal.entries:
+        print("✅ Finished sweep rotated, new sweep started")
+    else:
+        print("❌ Finished sweep resumed")
+    journal.close()
+
+    print("\n== Test passed ==")
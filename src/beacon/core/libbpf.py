@@ -0,0 +1,352 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file libbpf.py
+@brief  Load prebuilt CO-RE objects (inst.bpf.o) with libbpf through ctypes.
+@author Haney Kang
+
+@details
+LibbpfBPF is a drop-in replacement of RobustBPF for the parts BeaCon uses: tables
+by name (`bpf["event"]`, with BCC's Key/Leaf/items/getitem/setitem/delitem
+interface), prog_stats() and cleanup(). Nothing is compiled at startup, only
+relocated, so neither clang nor kernel headers are needed on the host.
+
+Programs with a BTF attachment (tp_btf, fentry) are preferred. If the kernel
+rejects them, the object is loaded again with their fallbacks (tracepoint, kprobe).
+detach_probes() and attach_probes() destroy and recreate the links only: programs
+and maps stay loaded.
+"""
+
+import os
+import errno
+import logging
+import ctypes as ct
+import ctypes.util
+from typing import Dict, List, Tuple
+
+from monitoring.ebpf.structs import tables as table_layouts
+
+## Program pairs of inst.bpf.c: (BTF attachment, fallback)
+PROGRAM_PAIRS = [
+    ("sys_enter_btf", "sys_enter_tp"),
+    ("cap_capable_fentry", "cap_capable_kprobe"),
+    ("cap_capable_fexit", "cap_capable_kretprobe"),  # -DBEACON_DENY
+]
+
+BPF_MAP_TYPE_HASH = 1
+BPF_MAP_TYPE_ARRAY = 2
+BPF_MAP_TYPE_PERCPU_HASH = 5
+BPF_MAP_TYPE_PERCPU_ARRAY = 6
+BPF_ANY = 0
+
+_lib = None
+
+
+def get_lib() -> ct.CDLL:
+    """
+    @brief Returns libbpf (>= 1.0), with the signatures used here.
+
+    @throws OSError if libbpf is not installed.
+    """
+    global _lib
+    if _lib is not None:
+        return _lib
+    lib = ct.CDLL(ctypes.util.find_library("bpf") or "libbpf.so.1", use_errno=True)
+    p, c_int, c_uint = ct.c_void_p, ct.c_int, ct.c_uint
+    signatures = {
+        "bpf_object__open_file": (p, [ct.c_char_p, p]),
+        "bpf_object__load": (c_int, [p]),
+        "bpf_object__close": (None, [p]),
+        "bpf_object__next_program": (p, [p, p]),
+        "bpf_object__find_map_by_name": (p, [p, ct.c_char_p]),
+        "bpf_program__name": (ct.c_char_p, [p]),
+        "bpf_program__set_autoload": (c_int, [p, ct.c_bool]),
+        "bpf_program__autoload": (ct.c_bool, [p]),
+        "bpf_program__attach": (p, [p]),
+        "bpf_program__fd": (c_int, [p]),
+        "bpf_link__destroy": (c_int, [p]),
+        "bpf_map__fd": (c_int, [p]),
+        "bpf_map__type": (c_int, [p]),
+        "bpf_map__key_size": (c_uint, [p]),
+        "bpf_map__value_size": (c_uint, [p]),
+        "bpf_map__max_entries": (c_uint, [p]),
+        "bpf_map_lookup_elem": (c_int, [c_int, p, p]),
+        "bpf_map_update_elem": (c_int, [c_int, p, p, ct.c_ulonglong]),
+        "bpf_map_delete_elem": (c_int, [c_int, p]),
+        "bpf_map_get_next_key": (c_int, [c_int, p, p]),
+        "libbpf_num_possible_cpus": (c_int, []),
+    }
+    for name, (restype, argtypes) in signatures.items():
+        func = getattr(lib, name)
+        func.restype = restype
+        func.argtypes = argtypes
+    _lib = lib
+    return lib
+
+
+def _check(ret: int, what: str) -> int:
+    if ret < 0:
+        raise OSError(-ret, f"{what}: {os.strerror(-ret)}")
+    return ret
+
+
+class LibbpfTable:
+    """
+    @class LibbpfTable
+    @brief A map of a loaded object, with the interface of BCC's tables.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fd: int,
+        map_type: int,
+        key_type,
+        leaf_type,
+        max_entries: int,
+        ncpu: int,
+    ):
+        self.name = name
+        self.fd = fd
+        self.map_type = map_type
+        self.max_entries = max_entries
+        self.percpu = map_type in (BPF_MAP_TYPE_PERCPU_HASH, BPF_MAP_TYPE_PERCPU_ARRAY)
+        self.array = map_type in (BPF_MAP_TYPE_ARRAY, BPF_MAP_TYPE_PERCPU_ARRAY)
+        self.Key = key_type
+        self.sLeaf = leaf_type
+        self.Leaf = leaf_type * ncpu if self.percpu else leaf_type
+        self._lib = get_lib()
+
+    def _key(self, key):
+        return self.Key(key) if isinstance(key, int) else key
+
+    def __getitem__(self, key):
+        key = self._key(key)
+        leaf = self.Leaf()
+        ret = self._lib.bpf_map_lookup_elem(self.fd, ct.byref(key), ct.byref(leaf))
+        if ret < 0:
+            raise KeyError(key)
+        return leaf
+
+    def __setitem__(self, key, value):
+        key = self._key(key)
+        if self.percpu and not isinstance(value, self.Leaf):
+            leaf = self.Leaf()
+            for cpu, v in enumerate(value):
+                leaf[cpu] = v
+            value = leaf
+        _check(
+            self._lib.bpf_map_update_elem(
+                self.fd, ct.byref(key), ct.byref(value), BPF_ANY
+            ),
+            f"update of {self.name}",
+        )
+
+    def __delitem__(self, key):
+        key = self._key(key)
+        if self.array:  # Array elements cannot be deleted, they are zeroed like in BCC
+            self[key] = self.Leaf()
+            return
+        ret = self._lib.bpf_map_delete_elem(self.fd, ct.byref(key))
+        if ret == -errno.ENOENT:
+            raise KeyError(key)
+        _check(ret, f"delete from {self.name}")
+
+    def __contains__(self, key) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self) -> List:
+        if self.array:
+            return [self.Key(i) for i in range(self.max_entries)]
+        keys = []
+        key, next_key = None, self.Key()
+        while (
+            self._lib.bpf_map_get_next_key(
+                self.fd, None if key is None else ct.byref(key), ct.byref(next_key)
+            )
+            == 0
+        ):
+            keys.append(next_key)
+            key, next_key = next_key, self.Key()
+        return keys
+
+    def items(self) -> List[Tuple]:
+        items = []
+        for key in self.keys():
+            try:
+                items.append((key, self[key]))
+            except KeyError:  # Deleted meanwhile
+                pass
+        return items
+
+    def clear(self):
+        for key in self.keys():
+            try:
+                del self[key]
+            except KeyError:
+                pass
+
+
+def build_command(obj_file: str) -> str:
+    """
+    @brief make command building `obj_file` (monitoring/ebpf/Makefile builds combined modes,
+           e.g. inst-count+deny.bpf.o, only when listed in VARIANTS).
+    """
+    command = f"make -C {os.path.dirname(obj_file) or '.'}"
+    name = os.path.basename(obj_file)
+    if name.startswith("inst-") and name.endswith(".bpf.o"):
+        command += f" VARIANTS={name[len('inst-'):-len('.bpf.o')]}"
+    return command
+
+
+class LibbpfBPF:
+    """
+    @class LibbpfBPF
+    @brief Opens, loads and attaches a CO-RE object, with RobustBPF's interface.
+    """
+
+    def __init__(
+        self, obj_file: str, prefer_btf: bool = True, cgroup_key: bool = False
+    ):
+        """
+        @param obj_file     Object built by monitoring/ebpf/Makefile.
+        @param prefer_btf   Try tp_btf/fentry programs first (fallbacks if they fail).
+        @param cgroup_key   The object was built with BEACON_CGROUP_KEY (u64 keys).
+
+        @throws FileNotFoundError if the object has not been built.
+        @throws OSError if it cannot be loaded or attached.
+        """
+        if not os.path.exists(obj_file):
+            raise FileNotFoundError(
+                f"{obj_file} is missing, build it with `{build_command(obj_file)}`"
+            )
+        self.obj_file = obj_file
+        self._lib = get_lib()
+        self._obj = None
+        self._links: List[int] = []
+        self._layouts = table_layouts(cgroup_key)
+        self.tables: Dict[str, LibbpfTable] = {}
+
+        attempts = [True, False] if prefer_btf else [False]
+        for btf in attempts:
+            try:
+                self._load(btf)
+                self.btf = btf
+                break
+            except OSError as e:
+                self.cleanup()
+                if not btf:
+                    raise
+                logging.warning(
+                    f"[core.libbpf] BTF attachments unavailable ({e}), using fallbacks."
+                )
+        logging.info(
+            f"[core.libbpf] {os.path.basename(obj_file)} loaded ({'btf' if self.btf else 'fallback'})."
+        )
+
+    def _programs(self) -> List[Tuple[str, int]]:
+        progs, prog = [], None
+        while True:
+            prog = self._lib.bpf_object__next_program(self._obj, prog)
+            if not prog:
+                return progs
+            progs.append((self._lib.bpf_program__name(prog).decode(), prog))
+
+    def _load(self, btf: bool):
+        obj = self._lib.bpf_object__open_file(self.obj_file.encode(), None)
+        if not obj:
+            _check(-ct.get_errno(), f"open {self.obj_file}")
+        self._obj = obj
+
+        skipped = {pair[1] if btf else pair[0] for pair in PROGRAM_PAIRS}
+        for name, prog in self._programs():
+            self._lib.bpf_program__set_autoload(prog, name not in skipped)
+        _check(self._lib.bpf_object__load(obj), f"load {self.obj_file}")
+        self.attach_probes()
+
+        ncpu = _check(self._lib.libbpf_num_possible_cpus(), "possible CPUs")
+        for name, (key_type, leaf_type, _, _) in self._layouts.items():
+            bpf_map = self._lib.bpf_object__find_map_by_name(obj, name.encode())
+            if not bpf_map:
+                continue  # Optional mode not built in
+            key_size = self._lib.bpf_map__key_size(bpf_map)
+            value_size = self._lib.bpf_map__value_size(bpf_map)
+            if (key_size, value_size) != (ct.sizeof(key_type), ct.sizeof(leaf_type)):
+                raise OSError(
+                    errno.EINVAL,
+                    f"Layout of {name} differs from monitoring/ebpf/structs.py",
+                )
+            self.tables[name] = LibbpfTable(
+                name,
+                self._lib.bpf_map__fd(bpf_map),
+                self._lib.bpf_map__type(bpf_map),
+                key_type,
+                leaf_type,
+                self._lib.bpf_map__max_entries(bpf_map),
+                ncpu,
+            )
+
+    def __getitem__(self, name: str) -> LibbpfTable:
+        return self.tables[name]
+
+    @property
+    def probes_attached(self) -> bool:
+        return bool(self._links)
+
+    def attach_probes(self):
+        """
+        @brief Attaches every loaded program (no-op if they are attached).
+        """
+        if self._links:
+            return
+        for name, prog in self._programs():
+            if not self._lib.bpf_program__autoload(prog):
+                continue
+            link = self._lib.bpf_program__attach(prog)
+            if not link:
+                self.detach_probes()
+                _check(-ct.get_errno() or -errno.EINVAL, f"attach {name}")
+            self._links.append(link)
+
+    def detach_probes(self):
+        """
+        @brief Destroys the links of the programs. Programs and maps stay loaded.
+        """
+        for link in self._links:
+            self._lib.bpf_link__destroy(link)
+        self._links = []
+
+    def prog_stats(self) -> Dict[str, Tuple[int, int]]:
+        """
+        @brief Reads run statistics of the attached programs from their fdinfo.
+
+        @return {program name: (run_cnt, run_time_ns)}
+        """
+        stats = {}
+        for name, prog in self._programs():
+            if not self._lib.bpf_program__autoload(prog):
+                continue
+            info = {}
+            with open(f"/proc/self/fdinfo/{self._lib.bpf_program__fd(prog)}") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    info[key.strip()] = value.strip()
+            stats[name] = (int(info.get("run_cnt", 0)), int(info.get("run_time_ns", 0)))
+        return stats
+
+    def cleanup(self):
+        """
+        @brief Detaches every program and closes the object (maps are freed with it).
+        """
+        self.detach_probes()
+        if self._obj:
+            self._lib.bpf_object__close(self._obj)
+            self._obj = None
+        self.tables = {}
@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file metrics.py
+@brief  Runtime metrics of BeaCon (probe overhead and pipeline latency).
+@author Haney Kang
+
+@details
+A process-wide registry (`metrics`) of counters, gauges and timing summaries.
+It can be rendered as OpenMetrics text, written to a file, served over HTTP
+(`/metrics`) and summarized in the logs at the end of a run.
+"""
+
+import os
+import logging
+from time import perf_counter
+from threading import Lock, Thread
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt(name: str, labels: Labels, suffix: str = "") -> str:
+    if not labels:
+        return f"{name}{suffix}"
+    body = ",".join(f'{k}="{v}"' for k, v in labels)
+    return f"{name}{suffix}{{{body}}}"
+
+
+class Metrics:
+    """
+    @class Metrics
+    @brief Thread-safe registry of counters, gauges and timing summaries.
+    """
+
+    def __init__(self, prefix: str = "beacon"):
+        self.prefix = prefix
+        self._lock = Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._gauges: Dict[Tuple[str, Labels], float] = {}
+        self._summaries: Dict[Tuple[str, Labels], list] = {}  # [count, sum, max]
+
+    def _name(self, name: str, kind: str, doc: str) -> str:
+        full = f"{self.prefix}_{name}"
+        self._help.setdefault(full, (kind, doc))
+        return full
+
+    def inc(self, name: str, value: float = 1, doc: str = "", **labels):
+        """@brief Add `value` to a counter."""
+        key = (self._name(name, "counter", doc), _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(
+        self, name: str, value: float, doc: str = "", kind: str = "gauge", **labels
+    ):
+        """@brief Set a gauge (or an externally accumulated counter when kind="counter")."""
+        key = (self._name(name, kind, doc), _labels(labels))
+        with self._lock:
+            if kind == "counter":
+                self._counters[key] = value
+            else:
+                self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, doc: str = "", **labels):
+        """@brief Record one duration in a summary."""
+        key = (self._name(name, "summary", doc), _labels(labels))
+        with self._lock:
+            summary = self._summaries.setdefault(key, [0, 0.0, 0.0])
+            summary[0] += 1
+            summary[1] += seconds
+            summary[2] = max(summary[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, doc: str = "", **labels):
+        """@brief Time the body of a `with` statement into a summary."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start, doc, **labels)
+
+    def timed(self, name: str, doc: str = "", **labels):
+        """@brief Decorator timing every call of a function into a summary."""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, doc, **labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def counter(self, name: str, **labels) -> float:
+        """@return Value of a counter, 0 if it was never incremented."""
+        with self._lock:
+            return self._counters.get((f"{self.prefix}_{name}", _labels(labels)), 0)
+
+    def timing(self, name: str, **labels) -> Tuple[int, float, float]:
+        """@return (count, sum, max) seconds of a summary, zeros if nothing was observed."""
+        with self._lock:
+            count, total, peak = self._summaries.get(
+                (f"{self.prefix}_{name}", _labels(labels)), (0, 0.0, 0.0)
+            )
+        return count, total, peak
+
+    def render(self) -> str:
+        """
+        @brief Render all metrics in the OpenMetrics text format.
+        """
+        lines = []
+        with self._lock:
+            families: Dict[str, list] = {}
+            for (name, labels), value in self._counters.items():
+                families.setdefault(name, []).append(
+                    f"{_fmt(name, labels, '_total')} {value}"
+                )
+            for (name, labels), value in self._gauges.items():
+                families.setdefault(name, []).append(f"{_fmt(name, labels)} {value}")
+            for (name, labels), (count, total, _) in self._summaries.items():
+                families.setdefault(name, []).append(
+                    f"{_fmt(name, labels, '_count')} {count}"
+                )
+                families[name].append(f"{_fmt(name, labels, '_sum')} {total}")
+            for name in sorted(families):
+                kind, doc = self._help[name]
+                lines.append(f"# TYPE {name} {kind}")
+                if doc:
+                    lines.append(f"# HELP {name} {doc}")
+                lines.extend(sorted(families[name]))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        @brief Write the OpenMetrics text atomically (e.g., for node_exporter's textfile collector).
+        """
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port: int, addr: str = "127.0.0.1"):
+        """
+        @brief Serve `/metrics` from a daemon thread.
+
+        @return The HTTP server (call shutdown() to stop it).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type",
+                    "application/openmetrics-text; version=1.0.0; charset=utf-8",
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def summary(self) -> str:
+        """
+        @brief Human readable per-run summary.
+        """
+        lines = ["[core.metrics] Run summary:"]
+        with self._lock:
+            for (name, labels), (count, total, peak) in sorted(self._summaries.items()):
+                lines.append(
+                    f"\t{_fmt(name, labels)}: n={count} mean={total / count * 1000:.3f}ms max={peak * 1000:.3f}ms"
+                )
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"\t{_fmt(name, labels)}: {value:g}")
+            for (name, labels), value in sorted(self._gauges.items()):
+                lines.append(f"\t{_fmt(name, labels)}: {value:g}")
+        return "\n".join(lines)
+
+    def log_summary(self):
+        logging.info(self.summary())
+
+    def reset(self):
+        """@brief Drop all recorded values (e.g., between runs)."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+metrics = Metrics()
+
+
+def collect_bpf(bpf, maps: Optional[Dict[str, int]] = None):
+    """
+    @brief Record run statistics of each probe and the occupancy of maps.
+
+    @param bpf  RobustBPF (prog_stats() needs kernel.bpf_stats_enabled=1).
+    @param maps {map name: capacity} to report.
+    """
+    for probe, (run_cnt, run_time_ns) in bpf.prog_stats().items():
+        metrics.set(
+            "probe_runs",
+            run_cnt,
+            "Invocations of a BPF probe",
+            kind="counter",
+            probe=probe,
+        )
+        metrics.set(
+            "probe_run_time_seconds",
+            run_time_ns / 1e9,
+            "Time spent in a BPF probe",
+            kind="counter",
+            probe=probe,
+        )
+    for name, capacity in (maps or {}).items():
+        metrics.set("map_entries", len(bpf[name]), "Entries of a BPF map", map=name)
+        metrics.set("map_capacity", capacity, "Max entries of a BPF map", map=name)
+
+
+if __name__ == "__main__":
+    from time import sleep
+
+    print("== Testing metrics ==")
+    with metrics.timer("test_seconds", "Test timer", step="a"):
+        sleep(0.01)
+    metrics.inc("test_events", 3, "Test counter")
+    metrics.set("test_entries", 7)
+    text = metrics.render()
+    print(text)
+    assert 'beacon_test_seconds_count{step="a"} 1' in text
+    assert "beacon_test_events_total 3" in text
+    assert text.endswith("# EOF\n")
+    print(metrics.summary())
+    print("== Test passed ==")
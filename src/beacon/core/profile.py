@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file profile.py
+@brief  Syscall and capability sets of a container as fixed-width integer bitsets.
+@author Haney Kang
+
+@details
+A Profile holds two Python integers whose bit `n` is set when syscall (or capability)
+`n` has been observed, i.e. the bitmaps of struct sys_and_cap_t read as little-endian
+integers. Set algebra and counting are word-level integer operations, so comparing or
+merging profiles never materializes index lists.
+
+    a = Profile.from_json(json.load(open("result/nginx:latest.json")))
+    b = Profile.from_struct(per_cpu_value)
+    print((a - b).syscalls(), a.jaccard(b))
+
+Profiles convert losslessly from and to the raw BPF value (from_struct/to_struct)
+and JSON (from_json/to_json, which also reads the syscall lists of `result/`).
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+from event_registry import bitmap_to_numbers
+
+SYS_BITS = 32 * 24  # sys_and_cap_t.sys
+CAP_BITS = 32 * 2  # sys_and_cap_t.cap
+SYS_MASK = (1 << SYS_BITS) - 1
+CAP_MASK = (1 << CAP_BITS) - 1
+
+
+def popcount(bits: int) -> int:
+    """
+    @brief Number of set bits of a non-negative integer.
+    """
+    return bin(bits).count("1")
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """
+    @brief Indexes of the set bits, in increasing order.
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def to_bits(nums: Iterable[int], width: int) -> int:
+    """
+    @brief Encode indexes into an integer bitset.
+
+    @throws IndexError if an index does not fit in `width` bits.
+    """
+    bits = 0
+    for num in nums:
+        if not 0 <= num < width:
+            raise IndexError(f"Index {num} out of range 0..{width - 1}")
+        bits |= 1 << num
+    return bits
+
+
+class Profile:
+    """
+    @class Profile
+    @brief Observed syscalls and capabilities of a container (or an executable).
+    """
+
+    __slots__ = ("sys", "cap")
+
+    def __init__(self, sys: int = 0, cap: int = 0):
+        """
+        @param sys  Syscall bitset (bit n = syscall n), truncated to SYS_BITS.
+        @param cap  Capability bitset, truncated to CAP_BITS.
+        """
+        self.sys = sys & SYS_MASK
+        self.cap = cap & CAP_MASK
+
+    @classmethod
+    def from_struct(cls, *values) -> "Profile":
+        """
+        @brief Read BPF values (struct sys_and_cap_t, attrib_t), OR-ing several (per-CPU) ones.
+        """
+        sys = cap = 0
+        for value in values:
+            sys |= int.from_bytes(bytes(value.sys), "little")
+            cap |= int.from_bytes(bytes(value.cap), "little")
+        return cls(sys, cap)
+
+    def to_struct(self):
+        """
+        @brief Encode as struct sys_and_cap_t (seccomp_flag left unset).
+        """
+        from monitoring.ebpf.structs import SysAndCap
+
+        value = SysAndCap()
+        value.sys[:] = [
+            (self.sys >> (32 * i)) & 0xFFFFFFFF for i in range(len(value.sys))
+        ]
+        value.cap[:] = [
+            (self.cap >> (32 * i)) & 0xFFFFFFFF for i in range(len(value.cap))
+        ]
+        return value
+
+    @classmethod
+    def from_lists(
+        cls, syscalls: Iterable[int] = (), capabilities: Iterable[int] = ()
+    ) -> "Profile":
+        """
+        @throws IndexError if a number does not fit in the bitmaps of inst.c.
+        """
+        return cls(to_bits(syscalls, SYS_BITS), to_bits(capabilities, CAP_BITS))
+
+    @classmethod
+    def from_json(cls, obj: Union[List[int], Dict[str, Any]]) -> "Profile":
+        """
+        @brief Read to_json() output, or a plain list of syscall numbers (`result/<image>.json`).
+
+        @throws ValueError if `obj` is a dict without "syscalls" (not a profile).
+        """
+        if isinstance(obj, list):
+            return cls.from_lists(obj)
+        if "syscalls" not in obj:
+            raise ValueError(f"Not a profile: keys {sorted(obj)[:5]}")
+        return cls.from_lists(obj["syscalls"], obj.get("capabilities", ()))
+
+    def to_json(self) -> Dict[str, List[int]]:
+        """
+        @return {"syscalls": [numbers], "capabilities": [numbers]}
+        """
+        return {"syscalls": self.syscalls(), "capabilities": self.capabilities()}
+
+    def syscalls(self) -> List[int]:
+        return bitmap_to_numbers([self.sys], SYS_BITS)
+
+    def capabilities(self) -> List[int]:
+        return bitmap_to_numbers([self.cap], CAP_BITS)
+
+    def iter_syscalls(self) -> Iterator[int]:
+        return iter_bits(self.sys)
+
+    def iter_capabilities(self) -> Iterator[int]:
+        return iter_bits(self.cap)
+
+    def has_syscall(self, num: int) -> bool:
+        return num >= 0 and bool(self.sys >> num & 1)
+
+    def has_capability(self, num: int) -> bool:
+        return num >= 0 and bool(self.cap >> num & 1)
+
+    def sys_count(self) -> int:
+        return popcount(self.sys)
+
+    def cap_count(self) -> int:
+        return popcount(self.cap)
+
+    def jaccard(self, other: "Profile") -> float:
+        """
+        @brief |A ∩ B| / |A ∪ B| over syscalls and capabilities (1.0 for two empty profiles).
+        """
+        union = len(self | other)
+        return len(self & other) / union if union else 1.0
+
+    def __len__(self) -> int:
+        return popcount(self.sys) + popcount(self.cap)
+
+    def __bool__(self) -> bool:
+        return bool(self.sys or self.cap)
+
+    def __or__(self, other: "Profile") -> "Profile":
+        return Profile(self.sys | other.sys, self.cap | other.cap)
+
+    def __and__(self, other: "Profile") -> "Profile":
+        return Profile(self.sys & other.sys, self.cap & other.cap)
+
+    def __sub__(self, other: "Profile") -> "Profile":
+        return Profile(self.sys & ~other.sys, self.cap & ~other.cap)
+
+    def __xor__(self, other: "Profile") -> "Profile":
+        return Profile(self.sys ^ other.sys, self.cap ^ other.cap)
+
+    def __le__(self, other: "Profile") -> bool:
+        return not (self - other)
+
+    def __ge__(self, other: "Profile") -> bool:
+        return not (other - self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Profile):
+            return NotImplemented
+        return self.sys == other.sys and self.cap == other.cap
+
+    def __hash__(self) -> int:
+        return hash((self.sys, self.cap))
+
+    def __repr__(self) -> str:
+        return f"Profile({self.sys_count()} syscalls, {self.cap_count()} capabilities)"
+
+
+def union(profiles: Iterable[Profile]) -> Profile:
+    """
+    @brief Union of any number of profiles.
+    """
+    sys = cap = 0
+    for profile in profiles:
+        sys |= profile.sys
+        cap |= profile.cap
+    return Profile(sys, cap)
+
+
+if __name__ == "__main__":
+    import json
+    import random
+
+    rnd = random.Random(0)
+    for _ in range(100):
+        syscalls = sorted(rnd.sample(range(SYS_BITS), rnd.randint(0, 200)))
+        caps = sorted(rnd.sample(range(CAP_BITS), rnd.randint(0, 10)))
+        profile = Profile.from_lists(syscalls, caps)
+        assert (
+            profile.syscalls() == syscalls and list(profile.iter_syscalls()) == syscalls
+        )
+        assert (
+            profile.capabilities() == caps and list(profile.iter_capabilities()) == caps
+        )
+        assert Profile.from_json(json.loads(json.dumps(profile.to_json()))) == profile
+        assert Profile.from_struct(profile.to_struct()) == profile
+        assert len(profile) == len(syscalls) + len(caps)
+    print("✅ Lossless list, JSON and struct conversions")
+
+    a = Profile.from_lists([0, 1, 2, 767], [3])
+    b = Profile.from_lists([2, 3, 767], [3, 40])
+    assert (a | b).syscalls() == [0, 1, 2, 3, 767] and (a | b).capabilities() == [3, 40]
+    assert (a & b).syscalls() == [2, 767] and (a - b).syscalls() == [0, 1]
+    assert (a ^ b).syscalls() == [0, 1, 3] and (a ^ b).capabilities() == [40]
+    assert a.jaccard(b) == 3 / 7 and Profile().jaccard(Profile()) == 1.0
+    assert a & b <= a and union([a, b]) == a | b
+    assert a.has_syscall(767) and not a.has_syscall(3) and not a.has_syscall(-1)
+    print("✅ Set algebra and Jaccard")
+
+    try:
+        Profile.from_lists([SYS_BITS])
+        print("❌ Out-of-range syscall accepted")
+    except IndexError:
+        print("✅ Out-of-range syscall rejected")
+
+    print("\n== Test passed ==")
@@ -1,5 +1,5 @@
 #!/usr/bin/python3
-# Last modified at Nov 01, 2025
+# Last modified at Oct 19, 2026
 
 """@file wrapper.py
 @brief      Wrapper module for running bash commands
@@ -9,9 +9,50 @@
 import os
 import logging
 import json
+import platform
 import subprocess
+import ctypes as ct
+from time import sleep
 from typing import List, Dict, Optional
 
+from core.metrics import metrics
+
+BPF_STATS_SYSCTL = "/proc/sys/kernel/bpf_stats_enabled"
+CGROUP_ROOT = "/sys/fs/cgroup"  # Mount point of the unified (v2) hierarchy
+SYS_MEMBARRIER = {"x86_64": 324, "aarch64": 283}
+MEMBARRIER_CMD_GLOBAL = 1
+
+
+def set_bpf_stats(enabled: bool) -> bool:
+    """
+    @brief Enables or disables run time accounting of every BPF program (kernel.bpf_stats_enabled).
+
+    @param  enabled Value to set.
+    @return bool    Previous value.
+    """
+    with open(BPF_STATS_SYSCTL, "r+") as f:
+        previous = f.read().strip() == "1"
+        f.seek(0)
+        f.write("1" if enabled else "0")
+    return previous
+
+
+def synchronize_rcu(fallback: float = 0.05):
+    """
+    @brief Wait until the BPF programs running at the time of the call have returned.
+
+    BPF programs run in RCU read-side critical sections, and membarrier(MEMBARRIER_CMD_GLOBAL)
+    returns after an RCU grace period. Kernels without it (or with nohz_full CPUs) get a
+    `fallback` sleep instead, far longer than any program run.
+    """
+    nr = SYS_MEMBARRIER.get(platform.machine())
+    if (
+        nr is not None
+        and ct.CDLL(None, use_errno=True).syscall(nr, MEMBARRIER_CMD_GLOBAL, 0) == 0
+    ):
+        return
+    sleep(fallback)
+
 
 # @deprecated
 def run_cmd(comm: List[str], timeout: Optional[int] = None) -> int:
@@ -52,6 +93,7 @@ def run_cmd(comm: List[str], timeout: Optional[int] = None) -> int:
     return proc.returncode
 
 
+@metrics.timed("lsns_seconds", "Run time of lsns")
 def lsns(pid: int) -> Optional[Dict[str, str]]:
     """
     @brief Run `lsns` on a specific PID to retrieve namespace information.
@@ -85,6 +127,48 @@ def lsns(pid: int) -> Optional[Dict[str, str]]:
         return None
 
 
+def cgroup_path(pid: int, root: str = CGROUP_ROOT) -> Optional[str]:
+    """
+    @brief Resolve the cgroup v2 directory of a process (its "0::" line of /proc/<pid>/cgroup).
+
+    @param      pid     Process ID to inspect.
+    @param      root    Mount point of cgroup2 (/sys/fs/cgroup/unified on hybrid hosts).
+    @return     str     Directory of the cgroup, or None if the process is gone or not in a v2 cgroup.
+    """
+    try:
+        with open(f"/proc/{pid}/cgroup") as f:
+            for line in f:
+                hierarchy, _, path = line.rstrip("\n").split(":", 2)
+                if hierarchy == "0":
+                    return os.path.join(root, path.lstrip("/"))
+    except (OSError, ValueError) as e:
+        logging.warning(f"[core.wrapper] No cgroup found for pid={pid}: {e}")
+        return None
+    logging.warning(f"[core.wrapper] pid={pid} is not in a cgroup v2 hierarchy.")
+    return None
+
+
+@metrics.timed("cgroup_id_seconds", "Resolution of a cgroup id")
+def cgroup_id(pid: int, root: str = CGROUP_ROOT) -> Optional[int]:
+    """
+    @brief Resolve the cgroup v2 id of a process, as bpf_get_current_cgroup_id() returns it.
+
+    The id is the inode number of the process's cgroup directory in the unified hierarchy.
+
+    @param      pid     Process ID to inspect.
+    @param      root    Mount point of cgroup2 (/sys/fs/cgroup/unified on hybrid hosts).
+    @return     int     Cgroup id, or None if the process is gone or not in a v2 cgroup.
+    """
+    path = cgroup_path(pid, root)
+    if path is None:
+        return None
+    try:
+        return os.stat(path).st_ino
+    except OSError as e:
+        logging.warning(f"[core.wrapper] No cgroup found for pid={pid}: {e}")
+        return None
+
+
 if __name__ == "__main__":
     from pprint import pprint
 
@@ -100,6 +184,13 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"❌ Exception occurred: {e}")
 
+    print("\n== Testing cgroup_id() on current process ==")
+    cgid = cgroup_id(os.getpid())
+    if cgid is not None:
+        print(f"✅ Cgroup id of PID {os.getpid()}: {cgid}")
+    else:
+        print("❌ No cgroup v2 id (cgroup v1 host?)")
+
     print("\n== Testing lsns() on invalid PID ==")
     try:
         invalid_pid = 999999  # assuming this PID doesn't exist
@@ -1,55 +1,76 @@
 #!/usr/bin/python3
-# Last Modified at Nov 25, 2025
+# Last Modified at Oct 19, 2026
 
 import os
 import json
-from event_nametable import syscalls
-
-from pprint import pprint
+from core.container import result_name
+from core.profile import Profile
+from event_registry import get_registry
 
 """ Code for compare LLM result and BeaCon's result """
 
-with open("stable_args.json") as f:
-    container_args = json.load(f)
-
-containers = list(
-    map(lambda k: k.split(":"), list(container_args.keys()))
-)  # List[List[name, tag], ...]
-
 LLM_path = "../../../prompt2seccomp/result/syscalls/"
 dyn_path = "./result/"
 
-line = (
-    ","
-    + ",".join(list(map(lambda x: str(x), list(syscalls.keys()))))
-    + ",TP,FP,FN,TN\n"
-)
-
-line_no = 2
-for name, tag in containers:
-    with open(f"{LLM_path}{name}__trial1") as f:
-        llm_body = json.load(f)  # List of syscall names
-    with open(f"{dyn_path}{name}:{tag}.json") as f:
-        dyn_body = json.load(f)  # List of numbers
-
-    line += f"{name}:{tag},"
-    for num, sys in syscalls.items():
-        if sys in llm_body:  # In LLM query
-            if num in dyn_body:  # # In dyn => TP
-                line += "TP,"
-            else:  # Not in dyn => FP
-                line += "FP,"
-        else:  # Not in LLM query
-            if num in dyn_body:  # # In dyn => FN
-                line += "FN,"
-            else:  # Not in dyn => TN
-                line += "TN,"
-    line += f"=COUNTIF(B{line_no}:MJ{line_no},MK1),"
-    line += f"=COUNTIF(B{line_no}:MJ{line_no},ML1),"
-    line += f"=COUNTIF(B{line_no}:MJ{line_no},MM1),"
-    line += f"=COUNTIF(B{line_no}:MJ{line_no},MN1),"
-    line += "\n"
-    line_no += 1
-
-with open("analysis.csv", "w") as f:
-    f.write(line)
+
+def column(idx: int) -> str:
+    """Spreadsheet column name of a 1-based index (1 -> A, 27 -> AA)."""
+    name = ""
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        name = chr(ord("A") + rem) + name
+    return name
+
+
+def compare(args_file: str = "stable_args.json", output: str = "analysis.csv"):
+    """
+    @brief Tabulate TP/FP/FN/TN of the LLM syscall lists against BeaCon's results.
+
+    @param args_file    JSON file whose keys are the compared images.
+    @param output       CSV file to write.
+    """
+    registry = get_registry("x86_64")
+    syscalls = registry.syscalls()
+
+    with open(args_file) as f:
+        container_args = json.load(f)
+
+    containers = list(
+        map(lambda k: k.split(":"), list(container_args.keys()))
+    )  # List[List[name, tag], ...]
+
+    line = (
+        ","
+        + ",".join(list(map(lambda x: str(x), list(syscalls.keys()))))
+        + ",TP,FP,FN,TN\n"
+    )
+    last = column(len(syscalls) + 1)  # Last column of syscalls
+    heads = [f"{column(len(syscalls) + 2 + i)}1" for i in range(4)]  # TP, FP, FN, TN
+
+    line_no = 2
+    for name, tag in containers:
+        with open(f"{LLM_path}{name}__trial1") as f:
+            llm = Profile.from_lists(
+                registry.names_to_numbers(json.load(f))
+            )  # Syscall names
+        with open(f"{dyn_path}{result_name(f'{name}:{tag}')}.json") as f:
+            dyn = Profile.from_json(json.load(f))  # List of numbers
+
+        # Bit n of each set tells the outcome of syscall n
+        outcomes = {"TP": llm & dyn, "FP": llm - dyn, "FN": dyn - llm}
+        line += f"{name}:{tag},"
+        for num in syscalls:
+            line += (
+                next((k for k, v in outcomes.items() if v.has_syscall(num)), "TN") + ","
+            )
+        for head in heads:
+            line += f"=COUNTIF(B{line_no}:{last}{line_no},{head}),"
+        line += "\n"
+        line_no += 1
+
+    with open(output, "w") as f:
+        f.write(line)
+
+
+if __name__ == "__main__":
+    compare()
@@ -1,5 +1,5 @@
 #!/usr/bin/python3
-# Last Modified at Nov 24, 2025
+# Last Modified at Oct 19, 2026
 
 """@file agent.py
 @brief Execute Emulating Agent
@@ -11,10 +11,10 @@
 
 import threading
 import time
-from typing import List
+from functools import lru_cache
+from typing import Any, Dict, List
 
 from emulating.types import ContainerSpec
-from monitoring.agent import Monitoring
 
 # from monitoring.types import Event_t
 
@@ -26,12 +26,17 @@ from pprint import pprint
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STABLE_JSON = os.path.join(BASE_DIR, "stable_args.json")
 
-with open(STABLE_JSON) as f:
-    stable_args = json.load(f)
+
+@lru_cache(maxsize=None)
+def load_stable_args() -> Dict[str, Dict[str, Any]]:
+    """Read `stable_args.json` once, on first use."""
+    with open(STABLE_JSON) as f:
+        return json.load(f)
 
 
 class KwargsGenerator:
     def __init__(self, image_name: str, mutation_level):
+        stable_args = load_stable_args()
         if image_name not in stable_args:
             print(
                 f"Unable to retrieve base args for container image {image_name}. Execution w/o base args"
@@ -0,0 +1,457 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file init.py
+@brief Service initialization of profile spec containers (templates, readiness, init steps)
+@author Haney Kang
+
+@details
+Stateful services (e.g. Couchbase) must be configured before a workload can use
+them. An InitSpec (emulating.spec) describes it, and an Initializer runs it in the
+thread of its container, so containers of a spec are initialized concurrently:
+
+  1. prepare(): templates are rendered with string.Template before the container
+     is created, and bind-mounted. `${IP_<PEER>}` and `${PORT_<PEER>}` are the
+     address of another container of the spec (PEER is its image name in upper
+     case, e.g. IP_COUCHBASE), and rendering waits until that container is ready.
+  2. run(): `ready` checks are polled with exponential backoff, `steps` run in
+     order (HTTP requests, or host scripts with IP and PORT in their environment),
+     then `ready_after` checks are polled.
+
+The monitoring window of the container starts only once run() returns.
+"""
+
+import os
+import re
+import shutil
+import base64
+import logging
+import tempfile
+import subprocess
+import http.client
+import urllib.parse
+from string import Template
+from threading import Condition
+from time import perf_counter, sleep, time
+from typing import Any, Dict, Iterable, Optional, Set
+
+from core.metrics import metrics
+from emulating.spec import HttpStep, InitSpec, ReadyCheck, ScriptStep
+from emulating.workload import wait_port
+
+PEER_TIMEOUT = 300  # Seconds to wait for the containers a template refers to
+_PEER_VAR = re.compile(r"\$\{?(IP|PORT)_([A-Z0-9_]+)\}?")
+
+
+def peer_name(ref: str) -> str:
+    """
+    @brief Name of a container in template variables: "couchbase:7.2" -> "COUCHBASE".
+    """
+    return re.sub(r"[^A-Za-z0-9]", "_", ref.rsplit(":", 1)[0]).upper()
+
+
+class Peers:
+    """
+    @class Peers
+    @brief Addresses of the containers of one run, published once they are ready.
+    """
+
+    def __init__(self, refs: Iterable[str]):
+        self.names: Set[str] = {peer_name(ref) for ref in refs}
+        self._cond = Condition()
+        self._variables: Dict[str, str] = {}
+        self._done: Dict[str, bool] = {}  # {name: ready}
+
+    def publish(self, ref: str, ip: str, port: Optional[int]):
+        """
+        @brief Make IP_<NAME> and PORT_<NAME> of a ready container available.
+        """
+        name = peer_name(ref)
+        with self._cond:
+            self._variables[f"IP_{name}"] = ip
+            if port is not None:
+                self._variables[f"PORT_{name}"] = str(port)
+            self._done[name] = True
+            self._cond.notify_all()
+
+    def fail(self, ref: str):
+        """
+        @brief Unblock the containers waiting for `ref`, if it has not been published.
+        """
+        name = peer_name(ref)
+        with self._cond:
+            self._done.setdefault(name, False)
+            self._cond.notify_all()
+
+    def variables(
+        self, names: Iterable[str] = (), timeout: float = PEER_TIMEOUT
+    ) -> Dict[str, str]:
+        """
+        @brief Wait until the given containers are ready and return every published variable.
+
+        @param  names   Peer names (peer_name()) which must be ready.
+        @throws RuntimeError if one of them is not part of the run, failed, or timed out.
+        """
+        names = set(names)
+        unknown = names - self.names
+        if unknown:
+            raise RuntimeError(
+                f"Templates refer to containers not in the spec: {sorted(unknown)}"
+            )
+        with self._cond:
+            if not self._cond.wait_for(lambda: names <= set(self._done), timeout):
+                raise RuntimeError(
+                    f"Timed out waiting for {sorted(names - set(self._done))}"
+                )
+            failed = [name for name in names if not self._done[name]]
+            if failed:
+                raise RuntimeError(
+                    f"Containers failed before being ready: {sorted(failed)}"
+                )
+            return dict(self._variables)
+
+
+def _request(
+    method: str,
+    ip: str,
+    port: int,
+    path: str,
+    auth: Optional[str] = None,
+    data: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    @return HTTP status of one request.
+    @throws OSError, http.client.HTTPException on connection failures.
+    """
+    headers = {}
+    body = None
+    if auth:
+        headers["Authorization"] = "Basic " + base64.b64encode(auth.encode()).decode()
+    if data:
+        body = urllib.parse.urlencode(data)
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+    conn = http.client.HTTPConnection(ip, port, timeout=5)
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        return resp.status
+    finally:
+        conn.close()
+
+
+def wait_ready(check: ReadyCheck, ip: str, port: Optional[int]) -> bool:
+    """
+    @brief Poll a readiness check with exponential backoff.
+
+    @param  check   Readiness check.
+    @param  ip      Address of the container.
+    @param  port    Default port when the check does not set one.
+    @return True if the check passed within its timeout.
+    """
+    port = check.port or port
+    if port is None:
+        logging.warning("[emulating.init] Readiness check without port is skipped.")
+        return True
+    if check.kind == "tcp":
+        return wait_port(ip, port, check.timeout_sec)
+
+    deadline = time() + check.timeout_sec
+    delay = 0.05
+    while True:
+        try:
+            if _request("GET", ip, port, check.path, check.auth) in check.status:
+                return True
+        except (OSError, http.client.HTTPException):
+            pass
+        if time() + delay > deadline:
+            return False
+        sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+
+def run_step(step, ip: str, port: Optional[int], env: Dict[str, str]):
+    """
+    @brief Run one init step.
+
+    @param  step    HttpStep or ScriptStep.
+    @param  env     Template variables (IP, PORT, peers), exported to scripts.
+    @throws RuntimeError if the step fails.
+    """
+    if isinstance(step, ScriptStep):
+        try:
+            subprocess.run(
+                ["sh", step.path],
+                env={**os.environ, **env},
+                timeout=step.timeout_sec,
+                check=True,
+                capture_output=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(
+                f"{step.path} exited with {e.returncode}: {e.stderr.decode()[-200:]}"
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise RuntimeError(f"{step.path} failed: {e}")
+        return
+
+    assert isinstance(step, HttpStep)
+    port = step.port or port
+    if port is None:
+        raise RuntimeError(f"No port for {step.method} {step.path}")
+    data = {k: Template(v).safe_substitute(env) for k, v in step.data.items()}
+    delay, status = 0.5, None
+    for attempt in range(step.attempts):
+        try:
+            status = _request(step.method, ip, port, step.path, step.auth, data)
+            if status in step.status:
+                return
+        except (OSError, http.client.HTTPException) as e:
+            status = str(e)
+        if attempt + 1 < step.attempts:
+            sleep(delay)
+            delay = min(delay * 2, 5.0)
+    raise RuntimeError(
+        f"{step.method} {step.path} failed after {step.attempts} attempts: {status}"
+    )
+
+
+class Initializer:
+    """
+    @class Initializer
+    @brief Runs the InitSpec of one container, in its own thread.
+    """
+
+    def __init__(self, ref: str, spec: InitSpec, peers: Optional[Peers] = None):
+        """
+        @param ref      Image reference of the container.
+        @param spec     Initialization to run.
+        @param peers    Addresses of the other containers of the run (templates need it).
+        """
+        self.ref = ref
+        self.spec = spec
+        self.peers = peers
+        self._tmp: Optional[str] = None
+
+    def _peer_variables(self, texts: Iterable[str]) -> Dict[str, str]:
+        names = {m.group(2) for text in texts for m in _PEER_VAR.finditer(text)}
+        if self.peers is None:
+            if names:
+                raise RuntimeError(
+                    f"{self.ref}: templates refer to other containers outside of a spec run"
+                )
+            return {}
+        return self.peers.variables(names)
+
+    def prepare(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        @brief Render the templates and add them to the create kwargs as read-only bind mounts.
+
+        Blocks until the containers the templates refer to are ready.
+
+        @return New create kwargs.
+        @throws RuntimeError if a template cannot be rendered.
+        """
+        if not self.spec.templates:
+            return kwargs
+        texts = []
+        for template in self.spec.templates:
+            with open(template.src) as f:
+                texts.append(f.read())
+        variables = self._peer_variables(texts)
+
+        self._tmp = tempfile.mkdtemp(prefix="beacon-init-")
+        binds = []
+        for i, (template, text) in enumerate(zip(self.spec.templates, texts)):
+            path = os.path.join(self._tmp, f"{i}-{os.path.basename(template.src)}")
+            with open(path, "w") as f:
+                f.write(Template(text).safe_substitute(variables))
+            binds.append(f"{path}:{template.target}:ro")
+
+        kwargs = dict(kwargs)
+        host_config = dict(kwargs.get("host_config") or {})
+        host_config["Binds"] = list(host_config.get("Binds") or []) + binds
+        kwargs["host_config"] = host_config
+        return kwargs
+
+    def run(self, ip: str, port: Optional[int]):
+        """
+        @brief Wait for readiness, run the steps, wait for readiness after them.
+
+        @param  ip      Address of the started container.
+        @param  port    Its service port (default port of checks and steps).
+        @throws RuntimeError on a failed check or step.
+        """
+        init_time = perf_counter()
+        env = {"IP": ip}
+        if port is not None:
+            env["PORT"] = str(port)
+        if self.peers is not None:
+            env.update(self.peers.variables())  # Containers ready so far
+
+        self._check("ready", self.spec.ready, ip, port)
+        for step in self.spec.steps:
+            run_step(step, ip, port, env)
+        self._check("ready_after", self.spec.ready_after, ip, port)
+        metrics.observe(
+            "init_seconds",
+            perf_counter() - init_time,
+            "Service initialization",
+            image=self.ref,
+        )
+        logging.info(
+            f"[emulating.init] {self.ref} initialized in {perf_counter() - init_time:.2f}s."
+        )
+
+    def _check(self, stage: str, checks, ip: str, port: Optional[int]):
+        for check in checks:
+            if not wait_ready(check, ip, port):
+                target = check.path if check.kind == "http" else check.port or port
+                raise RuntimeError(
+                    f"{self.ref}: {stage} check ({check.kind} {target}) timed out"
+                )
+
+    def cleanup(self):
+        """
+        @brief Remove the rendered templates.
+        """
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+
+
+if __name__ == "__main__":
+    import json
+    from threading import Thread
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from core.fake import install
+    from emulating.runner import run_container
+    from emulating.spec import ContainerEntry
+    from monitoring.agent import MonitoringSession
+
+    state = {"setup": False, "probes": 0}
+
+    class Service(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["probes"] += 1
+            ok = state["probes"] > 3 if self.path == "/" else state["setup"]
+            self.send_response(200 if ok else 503)
+            self.end_headers()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            state["setup"] = True
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Service)
+    port = server.server_address[1]
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    tmp = tempfile.mkdtemp()
+    with open(os.path.join(tmp, "proxy.cfg"), "w") as f:
+        f.write("server ${IP_SVC}:${PORT_SVC}\n# ${unrelated}\n")
+    with open(os.path.join(tmp, "init.sh"), "w") as f:
+        f.write(f'echo "$IP:$PORT" > {tmp}/script.out\n')
+
+    entries = [
+        ContainerEntry.model_validate(
+            {
+                "image": "svc",
+                "options": {"publish": [f"{port}:{port}"]},
+                "init": {
+                    "ready": [{"kind": "http"}],
+                    "steps": [
+                        {"kind": "http", "path": "/setup", "data": {"ip": "${IP}"}},
+                        {"kind": "script", "path": os.path.join(tmp, "init.sh")},
+                    ],
+                    "ready_after": [{"kind": "http", "path": "/state"}],
+                },
+                "duration_sec": 1,
+            }
+        ),
+        ContainerEntry.model_validate(
+            {
+                "image": "proxy",
+                "init": {
+                    "templates": [
+                        {
+                            "src": os.path.join(tmp, "proxy.cfg"),
+                            "target": "/etc/proxy.cfg",
+                        }
+                    ]
+                },
+                "duration_sec": 1,
+            }
+        ),
+    ]
+
+    bpf = install()
+    session = MonitoringSession(bpf=bpf)
+    peers = Peers(entry.ref for entry in entries)
+    events = []
+    rendered = {}
+
+    import emulating.init as module  # The runner uses the module, not __main__
+
+    original = module.Initializer.prepare
+
+    def prepare(self, kwargs):
+        kwargs = original(self, kwargs)
+        for bind in kwargs.get("host_config", {}).get("Binds", []):
+            with open(bind.split(":")[0]) as f:
+                rendered[self.ref] = f.read()
+        return kwargs
+
+    module.Initializer.prepare = prepare
+
+    def run(entry):
+        return run_container(
+            session,
+            entry.ref,
+            entry.options.create_kwargs(),
+            duration=entry.duration_sec,
+            on_status=lambda status: events.append((entry.ref, status)),
+            init=entry.init,
+            peers=peers,
+        )
+
+    with ThreadPoolExecutor(len(entries)) as pool:
+        results = list(pool.map(run, entries))
+
+    if all(ev is not None for ev, _ in results):
+        print("✅ Both containers profiled")
+    else:
+        print("❌ A container has not been profiled")
+    if state["setup"] and events.index(("svc:latest", "ready")) < events.index(
+        ("proxy:latest", "started")
+    ):
+        print("✅ Template of proxy waited for svc to be initialized")
+    else:
+        print("❌ Ordering:", events)
+    if rendered.get("proxy:latest") == f"server 127.0.0.1:{port}\n# ${{unrelated}}\n":
+        print("✅ Template rendered with the address of svc")
+    else:
+        print("❌ Rendered:", json.dumps(rendered))
+    with open(os.path.join(tmp, "script.out")) as f:
+        if f.read().strip() == f"127.0.0.1:{port}":
+            print("✅ Script step got IP and PORT")
+        else:
+            print("❌ Script step environment")
+
+    failing = Peers(["a:1", "b:1"])
+    failing.fail("a:1")
+    try:
+        failing.variables(["A"])
+        print("❌ Failed peer not reported")
+    except RuntimeError:
+        print("✅ Failed peer unblocks its dependents")
+
+    server.shutdown()
+    shutil.rmtree(tmp)
+    print("\n== Test passed ==")
@@ -0,0 +1,259 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file runner.py
+@brief Execute a profile spec: every container concurrently under one eBPF session
+@author Haney Kang
+
+@details
+Each container is created and started in its own thread. Its workloads start once
+the container is ready (started, its service port and the port of each workload open,
+and its service initialized, see emulating.init), its monitoring window lasts `duration_sec` from readiness, and
+its result is written as soon as the window closes, independently of the other
+containers. With a core.governor.Governor, containers start only as far as the load
+of the host allows.
+"""
+
+import os
+import json
+import logging
+from time import sleep, time
+from threading import Thread
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from core.container import Container, result_name
+from core.governor import Governor, Slot
+from core.metrics import metrics
+from emulating.init import Initializer, Peers
+from emulating.spec import ContainerEntry, InitSpec, ProfileSpec, Workload
+from emulating.workload import run_workload, wait_port, workload_port
+from monitoring.agent import MonitoringSession
+from monitoring.ebpf.types import Event_t, Timeline
+
+READY_TIMEOUT = 60  # Seconds to wait for a container to start and open its port
+
+
+def _service_port(kwargs: Dict[str, Any]) -> Optional[int]:
+    """First exposed container port of create kwargs (`ports` is a list of ints or (port, proto))."""
+    for port in kwargs.get("ports") or []:
+        return int(
+            port[0] if isinstance(port, (list, tuple)) else str(port).partition("/")[0]
+        )
+    return None
+
+
+def _wait_ports(ref: str, ip: str, port: Optional[int], workloads: Sequence[Workload]):
+    """Wait for the service port and the port of every workload (unpublished ones included)."""
+    ports = [port] if port is not None else []
+    ports += [workload_port(wl, port) for wl in workloads]
+    deadline = time() + READY_TIMEOUT
+    for p in dict.fromkeys(ports):
+        if not wait_port(ip, p, max(0.0, deadline - time())):
+            logging.warning(f"[emulating.runner] {ref}: port {p} is not open.")
+
+
+def run_container(
+    session: MonitoringSession,
+    ref: str,
+    kwargs: Dict[str, Any],
+    workloads: Sequence[Workload] = (),
+    duration: float = 60,
+    period: Optional[float] = None,
+    on_status: Optional[Callable[[str], None]] = None,
+    init: Optional[InitSpec] = None,
+    peers: Optional[Peers] = None,
+    slot: Optional[Slot] = None,
+) -> Tuple[Optional[Event_t], Optional[Timeline]]:
+    """
+    @brief Profile one container: start it, drive its workloads for `duration` from readiness, read it.
+
+    @param  session     Loaded session, shared with other containers.
+    @param  ref         Image reference.
+    @param  kwargs      Create kwargs (`ports` selects the service port which must open).
+    @param  workloads   Workloads driven against their own port, or the service port.
+    @param  duration    Monitoring window in seconds.
+    @param  period      Also record a Timeline, sampled every `period` seconds.
+    @param  on_status   Called with "started", "ready", "monitoring" and "collected".
+    @param  init        Service initialization run before the monitoring window.
+    @param  peers       Addresses of the containers run alongside (published once ready).
+    @param  slot        Governor slot the container runs in (its CPUs and cgroup accounting).
+    @return (Event_t or None, Timeline or None)
+    @throws RuntimeError if templates of `init` cannot be rendered.
+    """
+    notify = on_status or (lambda status: None)
+    initializer = Initializer(ref, init, peers) if init is not None else None
+    container = None
+    window = False
+    try:
+        if initializer is not None:
+            kwargs = initializer.prepare(kwargs)
+        if slot is not None:
+            kwargs = slot.apply(kwargs)
+        session.open_window()  # Probes of an on-demand session run from before the start
+        window = True
+        container = Container(img=ref, **kwargs)
+        container.start()
+        if container.get_pid() <= 0:
+            logging.error(f"[emulating.runner] {ref} did not start.")
+            return None, None
+        if slot is not None:
+            slot.attach(ref, container.get_pid())
+        notify("started")
+
+        ip = container.ip()
+        port = _service_port(kwargs)
+        if ip is not None:
+            _wait_ports(ref, ip, port, workloads)
+        if initializer is not None:
+            if ip is None:
+                logging.error(
+                    f"[emulating.runner] {ref} has no address, it cannot be initialized."
+                )
+                return None, None
+            try:
+                initializer.run(ip, port)
+            except RuntimeError as e:
+                logging.error(f"[emulating.runner] Initialization failed: {e}")
+                return None, None
+        if peers is not None and ip is not None:
+            peers.publish(ref, ip, port)
+        notify("ready")
+
+        deadline = time() + duration
+        if ip is not None:
+            for wl in workloads:
+                Thread(
+                    target=_drive, args=(ref, wl, ip, port, deadline), daemon=True
+                ).start()
+        elif workloads:
+            logging.warning(
+                f"[emulating.runner] {ref} has no address, workloads skipped."
+            )
+
+        notify("monitoring")
+        timeline = None
+        if period is None:
+            sleep(max(0.0, deadline - time()))
+        else:
+            timeline = session.track(container, period, deadline)
+        ev = session.snapshot(container)
+        session.forget(container)
+        notify("collected")
+        return ev, timeline
+    finally:
+        if window:
+            session.close_window()
+        if peers is not None:
+            peers.fail(ref)  # No-op once published
+        if initializer is not None:
+            initializer.cleanup()
+        if container is not None:
+            container.clean()
+
+
+def _drive(ref: str, wl: Workload, ip: str, port: Optional[int], deadline: float):
+    stats = run_workload(wl, ip, port, deadline)
+    logging.info(f"[emulating.runner] {ref} {wl.kind} workload: {stats}")
+
+
+class BatchRunner:
+    """@class BatchRunner
+    @brief Runs all containers of a ProfileSpec and writes `result/<image>:<tag>.json`.
+    """
+
+    def __init__(
+        self,
+        spec: ProfileSpec,
+        result_dir: str = "result",
+        count: bool = False,
+        metrics_file: Optional[str] = None,
+        period: Optional[float] = None,
+        governor: Optional[Governor] = None,
+    ):
+        """
+        @param spec         Validated spec (emulating.spec.load_spec()).
+        @param result_dir   Directory of the results.
+        @param count        Also count calls of each syscall.
+        @param metrics_file Write runtime metrics (OpenMetrics text) here, with probe statistics.
+        @param period       Also write `<image>:<tag>.timeline.json`, sampled every `period` seconds.
+        @param governor     Started governor bounding the containers run at once. Containers
+                            waiting for a slot delay the initialization of their peers.
+        """
+        self.spec = spec
+        self.result_dir = result_dir
+        self.count = count
+        self.metrics_file = metrics_file
+        self.period = period
+        self.governor = governor
+
+    def run(self) -> Dict[str, Optional[Event_t]]:
+        """
+        @brief Run every container of the spec and wait for all of them.
+
+        @return {"image:tag": Event_t or None}
+        """
+        os.makedirs(self.result_dir, exist_ok=True)
+        session = MonitoringSession(self.count, stats=self.metrics_file is not None)
+        peers = Peers(entry.ref for entry in self.spec.containers)
+        results: Dict[str, Optional[Event_t]] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.spec.containers)) as pool:
+                futures = {
+                    pool.submit(self._run_one, session, entry, peers): entry
+                    for entry in self.spec.containers
+                }
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    try:
+                        results[entry.ref] = future.result()
+                    except Exception as e:
+                        logging.error(f"[emulating.runner] {entry.ref} failed: {e}")
+                        results[entry.ref] = None
+        finally:
+            session.cleanup()
+            metrics.log_summary()
+            if self.metrics_file:
+                metrics.write(self.metrics_file)
+        return results
+
+    def _run_one(
+        self, session: MonitoringSession, entry: ContainerEntry, peers: Peers
+    ) -> Optional[Event_t]:
+        with (
+            self.governor.slot() if self.governor is not None else nullcontext()
+        ) as slot:
+            ev, timeline = run_container(
+                session,
+                entry.ref,
+                entry.options.create_kwargs(),
+                entry.workloads,
+                entry.duration_sec,
+                self.period,
+                init=entry.init,
+                peers=peers,
+                slot=slot,
+            )
+        if timeline is not None:
+            with open(
+                os.path.join(
+                    self.result_dir, f"{result_name(entry.ref)}.timeline.json"
+                ),
+                "w",
+            ) as f:
+                json.dump(timeline.to_json(), f)
+        self._write(entry, ev)
+        return ev
+
+    def _write(self, entry: ContainerEntry, ev: Optional[Event_t]):
+        if ev is None:
+            print(f"No data: {entry.ref}")
+            return
+        with open(
+            os.path.join(self.result_dir, f"{result_name(entry.ref)}.json"), "w"
+        ) as f:
+            json.dump(ev.syscalls(), f, indent=4)
+        logging.info(
+            f"[emulating.runner] {entry.ref}: {len(ev.syscalls())} syscalls written."
+        )
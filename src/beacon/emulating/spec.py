@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file spec.py
+@brief Validated profile specification (see data/samples/profile_exmaple.json)
+@author Haney Kang
+
+@details
+A spec lists containers to profile together. Each container has an image, a tag,
+Docker options, how its service is initialized (emulating.init), the workloads
+driven against it once it is ready, and the length of its monitoring window.
+"""
+
+import os
+import json
+from typing import Any, Dict, List, Optional, Union
+
+import yaml
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing_extensions import Annotated, Literal
+
+from core.container import IMAGE_NAME, IMAGE_TAG
+
+
+class HttpWorkload(BaseModel):
+    """HTTP requests spread over `concurrency` connections, cycling through `pattern`."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: Literal["http"]
+    concurrency: int = Field(1, ge=1)
+    requests: int = Field(1, ge=1)
+    pattern: List[Dict[str, str]] = Field(default_factory=lambda: [{"GET": "/"}])
+    port: Optional[int] = None  # Container port, first published port by default
+
+
+class RedisWorkload(BaseModel):
+    """SET/GET commands sent in batches of `pipeline`."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: Literal["redis"]
+    read: int = Field(0, ge=0)
+    write: int = Field(0, ge=0)
+    pipeline: int = Field(1, ge=1)
+    port: int = 6379
+
+
+Workload = Annotated[Union[HttpWorkload, RedisWorkload], Field(discriminator="kind")]
+
+
+class ReadyCheck(BaseModel):
+    """Readiness probe polled with exponential backoff: a TCP connect, or an HTTP status."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: Literal["tcp", "http"] = "tcp"
+    port: Optional[int] = None  # Container port, first published port by default
+    path: str = "/"
+    auth: Optional[str] = None  # "user:password" (HTTP basic)
+    status: List[int] = Field(default_factory=lambda: [200])
+    timeout_sec: float = Field(60, gt=0)
+
+
+class HttpStep(BaseModel):
+    """HTTP request (form-encoded `data`) retried with backoff until it returns an expected status."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: Literal["http"]
+    method: str = "POST"
+    path: str
+    port: Optional[int] = None
+    auth: Optional[str] = None
+    data: Dict[str, str] = Field(default_factory=dict)
+    status: List[int] = Field(default_factory=lambda: [200])
+    attempts: int = Field(5, ge=1)
+
+
+class ScriptStep(BaseModel):
+    """Host script run with IP, PORT and the peer variables in its environment."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    kind: Literal["script"]
+    path: str  # e.g. container_init/couchbase.sh
+    timeout_sec: float = Field(60, gt=0)
+
+
+InitStep = Annotated[Union[HttpStep, ScriptStep], Field(discriminator="kind")]
+
+
+class TemplateFile(BaseModel):
+    """Config rendered before the container is created (`${IP_<PEER>}`...) and bind-mounted."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    src: str  # Host file, e.g. container_init/haproxy.cfg
+    target: str  # Path inside the container
+
+
+class InitSpec(BaseModel):
+    """
+    Initialization of a stateful service, between its start and its monitoring window:
+    `templates` are rendered with the addresses of other containers of the spec, then
+    `ready` is polled, `steps` run in order, and `ready_after` is polled.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    templates: List[TemplateFile] = Field(default_factory=list)
+    ready: List[ReadyCheck] = Field(default_factory=list)
+    steps: List[InitStep] = Field(default_factory=list)
+    ready_after: List[ReadyCheck] = Field(default_factory=list)
+
+
+class ContainerOptions(BaseModel):
+    """Subset of `docker run` options."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    network: Optional[str] = None
+    init: Optional[bool] = None
+    publish: List[str] = Field(default_factory=list)  # "[ip:]host:container[/proto]"
+    environment: List[str] = Field(default_factory=list)
+    command: Optional[List[str]] = None
+    interactive: Optional[bool] = None  # -i
+    tty: Optional[bool] = None  # -t
+
+    @field_validator("publish")
+    @classmethod
+    def _check_publish(cls, publish: List[str]) -> List[str]:
+        for mapping in publish:
+            ports, _, proto = mapping.partition("/")
+            parts = ports.split(":")
+            if len(parts) not in (2, 3) or not all(p.isdigit() for p in parts[-2:]):
+                raise ValueError(f"Invalid port mapping: {mapping}")
+            if proto not in ("", "tcp", "udp", "sctp"):
+                raise ValueError(f"Invalid protocol of port mapping: {mapping}")
+        return publish
+
+    def container_ports(self) -> List[int]:
+        """
+        @return Published container ports, in the order of `publish`.
+        """
+        return [
+            int(mapping.partition("/")[0].split(":")[-1]) for mapping in self.publish
+        ]
+
+    def create_kwargs(self) -> Dict[str, Any]:
+        """
+        @brief Convert options into `Container`/`create_container` kwargs.
+        """
+        kwargs: Dict[str, Any] = {}
+        host_config: Dict[str, Any] = {}
+        if self.network is not None:
+            host_config["NetworkMode"] = self.network
+        if self.init is not None:
+            host_config["Init"] = self.init
+        if self.publish:
+            ports, bindings = [], {}
+            for mapping in self.publish:
+                port_part, _, proto = mapping.partition("/")
+                proto = proto or "tcp"
+                *host_ip, host_port, container_port = port_part.split(":")
+                ports.append((int(container_port), proto))
+                bindings.setdefault(f"{container_port}/{proto}", []).append(
+                    {"HostIp": host_ip[0] if host_ip else "", "HostPort": host_port}
+                )
+            kwargs["ports"] = ports
+            host_config["PortBindings"] = bindings
+        if self.environment:
+            kwargs["environment"] = self.environment
+        if self.command is not None:
+            kwargs["command"] = self.command
+        if self.interactive is not None:
+            kwargs["stdin_open"] = self.interactive
+        if self.tty is not None:
+            kwargs["tty"] = self.tty
+        if host_config:
+            kwargs["host_config"] = host_config
+        return kwargs
+
+
+class ContainerEntry(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    image: str
+    tag: str = "latest"
+    options: ContainerOptions = Field(default_factory=ContainerOptions)
+    workloads: List[Workload] = Field(default_factory=list)
+    init: Optional[InitSpec] = None
+    duration_sec: int = Field(60, gt=0)
+
+    @field_validator("image")
+    @classmethod
+    def _check_image(cls, image: str) -> str:
+        if not IMAGE_NAME.fullmatch(image):
+            raise ValueError(f"Invalid image name: {image!r}")
+        return image
+
+    @field_validator("tag")
+    @classmethod
+    def _check_tag(cls, tag: str) -> str:
+        if not IMAGE_TAG.fullmatch(tag):
+            raise ValueError(f"Invalid tag: {tag!r}")
+        return tag
+
+    @property
+    def ref(self) -> str:
+        return f"{self.image}:{self.tag}"
+
+
+class ProfileSpec(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    containers: List[ContainerEntry] = Field(min_length=1)
+
+
+def load_spec(path: str) -> ProfileSpec:
+    """
+    @brief Load and validate a profile spec from JSON or YAML.
+
+    @param  path    Spec file (.json, .yaml or .yml).
+    @return ProfileSpec
+    @throws pydantic.ValidationError on invalid content.
+    """
+    with open(path) as f:
+        if os.path.splitext(path)[1] in (".yaml", ".yml"):
+            body = yaml.safe_load(f)
+        else:
+            body = json.load(f)
+    return ProfileSpec.model_validate(body)
@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file workload.py
+@brief Workload drivers for profile specs (HTTP and Redis)
+@author Haney Kang
+
+@details
+Drivers use only the standard library. Each one retries its first connection with
+backoff (for at most CONNECT_TIMEOUT), stops at its request budget or at the deadline,
+whichever comes first, and reports how many operations succeeded.
+"""
+
+import socket
+import logging
+import http.client
+from time import sleep, time
+from threading import Lock, Thread
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from emulating.spec import HttpWorkload, RedisWorkload
+
+T = TypeVar("T")
+
+
+CONNECT_TIMEOUT = 30.0  # Seconds a driver retries its first connection for
+
+
+def _retry(connect: Callable[[], T], timeout: float) -> T:
+    """
+    @brief Call `connect` until it succeeds, with exponential backoff.
+
+    @param  connect Opens a connection, raises OSError on failure.
+    @param  timeout Seconds to give up after.
+    @throws OSError of the last attempt once `timeout` is over.
+    """
+    deadline = time() + timeout
+    delay = 0.05
+    while True:
+        try:
+            return connect()
+        except OSError:
+            if time() + delay > deadline:
+                raise
+            sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+
+def wait_port(ip: str, port: int, timeout: float = 30.0) -> bool:
+    """
+    @brief Wait until a TCP port accepts connections, with exponential backoff.
+
+    @param  ip      Address of the container.
+    @param  port    TCP port.
+    @param  timeout Seconds to give up after.
+    @return True if the port is open.
+    """
+    try:
+        _retry(
+            lambda: socket.create_connection((ip, port), timeout=1.0), timeout
+        ).close()
+        return True
+    except OSError:
+        return False
+
+
+def workload_port(wl, port: Optional[int]) -> int:
+    """
+    @brief Port a workload is driven against.
+
+    @param  wl      HttpWorkload or RedisWorkload.
+    @param  port    First published port of the container, if any.
+    """
+    if isinstance(wl, RedisWorkload):
+        return wl.port
+    return wl.port or port or 80
+
+
+def run_http(wl: HttpWorkload, ip: str, port: int, deadline: float) -> Dict[str, int]:
+    """
+    @brief Send `wl.requests` requests over `wl.concurrency` keep-alive connections.
+
+    @return {"ok": <2xx/3xx responses>, "error": <failed requests>}
+    """
+    stats = {"ok": 0, "error": 0}
+    lock = Lock()
+    share = [
+        wl.requests // wl.concurrency + (i < wl.requests % wl.concurrency)
+        for i in range(wl.concurrency)
+    ]
+    requests = [
+        (method, path) for entry in wl.pattern for method, path in entry.items()
+    ]
+
+    def worker(budget: int):
+        conn = http.client.HTTPConnection(ip, port, timeout=5)
+        try:
+            _retry(conn.connect, min(CONNECT_TIMEOUT, deadline - time()))
+        except OSError as e:
+            logging.warning(
+                f"[emulating.workload] HTTP workload on {ip}:{port} cannot connect: {e}"
+            )
+            with lock:
+                stats["error"] += budget
+            return
+        for i in range(budget):
+            if time() >= deadline:
+                break
+            method, path = requests[i % len(requests)]
+            try:
+                conn.request(method, path)
+                resp = conn.getresponse()
+                resp.read()
+                with lock:
+                    stats["ok" if resp.status < 400 else "error"] += 1
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    stats["error"] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(ip, port, timeout=5)
+        conn.close()
+
+    threads = [
+        Thread(target=worker, args=(budget,), daemon=True) for budget in share if budget
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(max(0.0, deadline - time()))
+    return stats
+
+
+def _resp(*args: str) -> bytes:
+    return f"*{len(args)}\r\n".encode() + b"".join(
+        f"${len(arg.encode())}\r\n{arg}\r\n".encode() for arg in args
+    )
+
+
+def _read_reply(f) -> Optional[bytes]:
+    line = f.readline()
+    if not line:
+        raise ConnectionError("Redis connection closed")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"$":
+        size = int(body)
+        return None if size < 0 else f.read(size + 2)[:-2]
+    if kind == b"-":
+        raise RuntimeError(body.decode())
+    return body
+
+
+def run_redis(wl: RedisWorkload, ip: str, port: int, deadline: float) -> Dict[str, int]:
+    """
+    @brief Send `wl.write` SETs then `wl.read` GETs, `wl.pipeline` commands per round trip.
+
+    @return {"ok": <successful commands>, "error": <failed commands>}
+    """
+    stats = {"ok": 0, "error": 0}
+    commands: List[bytes] = [
+        _resp("SET", f"beacon:{i}", str(i)) for i in range(wl.write)
+    ]
+    commands += [_resp("GET", f"beacon:{i % max(wl.write, 1)}") for i in range(wl.read)]
+    try:
+        timeout = min(CONNECT_TIMEOUT, deadline - time())
+        with _retry(
+            lambda: socket.create_connection((ip, port), timeout=5), timeout
+        ) as sock:
+            f = sock.makefile("rb")
+            for i in range(0, len(commands), wl.pipeline):
+                if time() >= deadline:
+                    break
+                batch = commands[i : i + wl.pipeline]
+                sock.sendall(b"".join(batch))
+                for _ in batch:
+                    try:
+                        _read_reply(f)
+                        stats["ok"] += 1
+                    except RuntimeError:
+                        stats["error"] += 1
+    except (OSError, ConnectionError) as e:
+        logging.warning(
+            f"[emulating.workload] Redis workload on {ip}:{port} stopped: {e}"
+        )
+        stats["error"] += len(commands) - stats["ok"] - stats["error"]
+    return stats
+
+
+def run_workload(wl, ip: str, port: Optional[int], deadline: float) -> Dict[str, int]:
+    """
+    @brief Dispatch a workload to its driver.
+
+    @param  wl          HttpWorkload or RedisWorkload.
+    @param  ip          Address of the container.
+    @param  port        Default port when the workload does not set one.
+    @param  deadline    Absolute time (time.time()) to stop at.
+    """
+    if isinstance(wl, HttpWorkload):
+        return run_http(wl, ip, workload_port(wl, port), deadline)
+    if isinstance(wl, RedisWorkload):
+        return run_redis(wl, ip, workload_port(wl, port), deadline)
+    raise TypeError(f"Unknown workload: {wl}")
@@ -0,0 +1,254 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file event_registry.py
+@brief  Indexed syscall and capability registry for each architecture.
+@author Haney Kang
+
+@details
+Number -> name lookups index the tuples of `event_tables` (generated from kernel
+headers by tool/gen_registry.py), and name -> number lookups use dictionaries.
+Bulk conversions decode bitmaps a byte at a time through a precomputed table, so a
+whole set of profiles is converted in a single pass without per-bit loops.
+"""
+
+import platform
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from event_tables import SYSCALLS, CAPABILITIES
+
+ARCHES = tuple(SYSCALLS.keys())
+## platform.machine() -> arch of ARCHES
+MACHINES = {
+    "amd64": "x86_64",
+    "arm64": "aarch64",
+    "i486": "i386",
+    "i586": "i386",
+    "i686": "i386",
+}
+
+## BYTE_BITS[v] = offsets of the set bits of byte v
+BYTE_BITS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(bit for bit in range(8) if v & (1 << bit)) for v in range(256)
+)
+
+
+def bitmap_to_numbers(words: Sequence[int], width: int = 32) -> List[int]:
+    """
+    @brief Decode a bitmap (array of `width`-bit words, LSB first) into set bit indexes.
+
+    @param  words   Bitmap words (e.g., `sys_and_cap_t.sys`).
+    @param  width   Bit size of a word.
+    @return Sorted list of set bit indexes.
+    """
+    nums = []
+    base = 0
+    for word in words:
+        offset = base
+        while word:
+            byte = word & 0xFF
+            if byte:
+                nums.extend(offset + bit for bit in BYTE_BITS[byte])
+            word >>= 8
+            offset += 8
+        base += width
+    return nums
+
+
+def numbers_to_bitmap(nums: Iterable[int], nwords: int, width: int = 32) -> List[int]:
+    """
+    @brief Encode bit indexes into a bitmap of `nwords` words.
+
+    @throws IndexError if an index does not fit in the bitmap.
+    """
+    words = [0] * nwords
+    for num in nums:
+        words[num // width] |= 1 << (num % width)
+    return words
+
+
+class Registry:
+    """
+    @class Registry
+    @brief Syscall and capability tables of one architecture.
+    """
+
+    def __init__(self, arch: str):
+        """
+        @param arch One of ARCHES.
+        """
+        if arch not in SYSCALLS:
+            raise KeyError(f"Unknown architecture: {arch}")
+        self.arch = arch
+        self.sys_names: Tuple[Optional[str], ...] = SYSCALLS[arch]
+        self.sys_numbers: Dict[str, int] = {
+            name: num for num, name in enumerate(self.sys_names) if name
+        }
+        self.cap_names: Tuple[Optional[str], ...] = CAPABILITIES
+        self.cap_numbers: Dict[str, int] = {
+            name: num for num, name in enumerate(self.cap_names) if name
+        }
+
+    def syscall_name(self, num: int) -> Optional[str]:
+        """
+        @return Name of syscall `num`, None if unknown.
+        """
+        return self.sys_names[num] if 0 <= num < len(self.sys_names) else None
+
+    def syscall_number(self, name: str) -> Optional[int]:
+        """
+        @return Number of syscall `name`, None if unknown.
+        """
+        return self.sys_numbers.get(name)
+
+    def cap_name(self, num: int) -> Optional[str]:
+        """
+        @return Name of capability `num` (e.g., "CAP_CHOWN"), None if unknown.
+        """
+        return self.cap_names[num] if 0 <= num < len(self.cap_names) else None
+
+    def cap_number(self, name: str) -> Optional[int]:
+        """
+        @return Number of capability `name` ("CAP_" prefix optional), None if unknown.
+        """
+        return self.cap_numbers.get(name if name.startswith("CAP_") else f"CAP_{name}")
+
+    def syscalls(self) -> Dict[int, str]:
+        """
+        @return {number: name} of every known syscall.
+        """
+        return {num: name for num, name in enumerate(self.sys_names) if name}
+
+    def capabilities(self) -> Dict[int, str]:
+        """
+        @return {number: name} of every known capability.
+        """
+        return {num: name for num, name in enumerate(self.cap_names) if name}
+
+    def numbers_to_names(self, nums: Iterable[int], table: str = "sys") -> List[str]:
+        """
+        @brief Convert numbers into names, unknown numbers are dropped.
+
+        @param table "sys" or "cap".
+        """
+        names = self.sys_names if table == "sys" else self.cap_names
+        size = len(names)
+        return [names[num] for num in nums if 0 <= num < size and names[num]]
+
+    def names_to_numbers(self, names: Iterable[str], table: str = "sys") -> List[int]:
+        """
+        @brief Convert names into numbers, unknown names are dropped.
+
+        @param table "sys" or "cap".
+        """
+        numbers = self.sys_numbers if table == "sys" else self.cap_numbers
+        return [numbers[name] for name in names if name in numbers]
+
+    def bitmap_to_names(
+        self, words: Sequence[int], table: str = "sys", width: int = 32
+    ) -> List[str]:
+        """
+        @brief Decode a bitmap directly into names.
+        """
+        return self.numbers_to_names(bitmap_to_numbers(words, width), table)
+
+    def names_to_bitmap(
+        self, names: Iterable[str], nwords: int, table: str = "sys", width: int = 32
+    ) -> List[int]:
+        """
+        @brief Encode names into a bitmap of `nwords` words.
+        """
+        return numbers_to_bitmap(self.names_to_numbers(names, table), nwords, width)
+
+    def bulk_bitmap_to_names(
+        self, bitmaps: Iterable[Sequence[int]], table: str = "sys", width: int = 32
+    ) -> List[List[str]]:
+        """
+        @brief Decode many bitmaps into name lists in one pass.
+        """
+        names = self.sys_names if table == "sys" else self.cap_names
+        size = len(names)
+        return [
+            [
+                names[num]
+                for num in bitmap_to_numbers(words, width)
+                if num < size and names[num]
+            ]
+            for words in bitmaps
+        ]
+
+    def bulk_names_to_numbers(
+        self, name_lists: Iterable[Iterable[str]], table: str = "sys"
+    ) -> List[List[int]]:
+        """
+        @brief Convert many name lists into number lists in one pass.
+        """
+        numbers = self.sys_numbers if table == "sys" else self.cap_numbers
+        return [
+            [numbers[name] for name in names if name in numbers] for names in name_lists
+        ]
+
+    def bulk_numbers_to_names(
+        self, num_lists: Iterable[Iterable[int]], table: str = "sys"
+    ) -> List[List[str]]:
+        """
+        @brief Convert many number lists into name lists in one pass.
+        """
+        names = self.sys_names if table == "sys" else self.cap_names
+        size = len(names)
+        return [
+            [names[num] for num in nums if 0 <= num < size and names[num]]
+            for nums in num_lists
+        ]
+
+
+_registries: Dict[str, Registry] = {}
+
+
+def get_registry(arch: str = "x86_64") -> Registry:
+    """
+    @brief Returns the (cached) registry of an architecture.
+
+    @param arch One of ARCHES.
+    """
+    if arch not in _registries:
+        _registries[arch] = Registry(arch)
+    return _registries[arch]
+
+
+def host_arch() -> str:
+    """
+    @brief Arch of ARCHES whose syscall numbers the probes record on this host.
+
+    @throws ValueError if the host architecture has no table.
+    """
+    machine = platform.machine().lower()
+    arch = MACHINES.get(machine, machine)
+    if arch not in ARCHES:
+        raise ValueError(f"No syscall table for {machine}")
+    return arch
+
+
+if __name__ == "__main__":
+    print("== Testing event_registry ==")
+    for arch in ARCHES:
+        reg = get_registry(arch)
+        assert reg.syscall_name(reg.syscall_number("execve")) == "execve"
+        print(
+            f"✅ {arch}: execve = {reg.syscall_number('execve')}, {len(reg.sys_numbers)} syscalls"
+        )
+
+    reg = get_registry()
+    words = numbers_to_bitmap([0, 1, 59, 435], 24)
+    assert bitmap_to_numbers(words) == [0, 1, 59, 435]
+    assert reg.bitmap_to_names(words) == ["read", "write", "execve", "clone3"]
+    assert (
+        reg.names_to_bitmap(["read", "write", "execve", "clone3", "nonexistent"], 24)
+        == words
+    )
+    assert reg.cap_number("SYS_ADMIN") == reg.cap_number("CAP_SYS_ADMIN") == 21
+    assert reg.bulk_bitmap_to_names([words, [0] * 24]) == [
+        ["read", "write", "execve", "clone3"],
+        [],
+    ]
+    print("== Test passed ==")
@@ -1,5 +1,5 @@
 #!/usr/bin/python3
-# Last Modified at Nov 23, 2025
+# Last Modified at Oct 19, 2026
 
 """@file agent.py
 @brief  Execute monitoring agent
@@ -11,15 +11,537 @@
 
 import os
 import logging
+import ctypes as ct
 from time import sleep, time
 from queue import Queue
-from threading import Thread
+from threading import Lock, Thread
+from contextlib import contextmanager
 
-from core.BPF import RobustBPF
 from core.container import Container
-from .ebpf.types import cast_data, Namespace_t, Event_t
+from core.metrics import metrics, collect_bpf
+from core.profile import Profile
+from core.wrapper import synchronize_rcu
+from event_registry import get_registry, host_arch
+from .ebpf.types import (
+    cast_data,
+    container_key,
+    raw_key,
+    read_key,
+    Namespace_t,
+    Event_t,
+    Timeline,
+)
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SYS_GETPPID = get_registry(host_arch()).syscall_number("getppid")  # Canary of verify
+INST_SRC = os.path.join(BASE_DIR, "ebpf", "inst.c")
+BACKENDS = ("bcc", "libbpf")
+MAPS = {  # Capacities declared in inst.c
+    "event": 16384,
+    "sys_count": 65536,
+    "sys_args": 65536,
+    "sys_attrib": 16384,
+    "denials": 16384,
+    "epoch_a": 16384,
+    "epoch_b": 16384,
+}
+EPOCH_MAPS = ("epoch_a", "epoch_b")  # Maps of even and odd epochs (-DBEACON_EPOCH)
+
+## Arguments captured in argument mode: {syscall: argument indexes}. Only scalar arguments
+## are meaningful (seccomp cannot dereference pointers).
+ARG_SPEC: Dict[str, Tuple[int, ...]] = {
+    "socket": (0, 1, 2),  # family, type, protocol
+    "ioctl": (1,),  # request
+    "clone": (0,),  # flags
+    "prctl": (0,),  # option
+    "fcntl": (1,),  # cmd
+    "setsockopt": (1, 2),  # level, optname
+    "getsockopt": (1, 2),
+    "personality": (0,),  # persona
+}
+
+
+def inst_object(
+    count: bool = False,
+    args: bool = False,
+    attrib: bool = False,
+    cgroup_key: bool = False,
+    deny: bool = False,
+    epoch: bool = False,
+) -> str:
+    """
+    @brief Path of the CO-RE object built with the given modes (see monitoring/ebpf/Makefile).
+    """
+    modes = [
+        mode
+        for mode, enabled in (
+            ("count", count),
+            ("args", args),
+            ("attrib", attrib),
+            ("cgroup_key", cgroup_key),
+            ("deny", deny),
+            ("epoch", epoch),
+        )
+        if enabled
+    ]
+    suffix = "-" + "+".join(modes) if modes else ""
+    return os.path.join(BASE_DIR, "ebpf", f"inst{suffix}.bpf.o")
+
+
+def arg_masks(spec: Dict[Union[str, int], Sequence[int]]) -> Dict[int, int]:
+    """
+    @brief Convert {syscall name or number: argument indexes} into {number: arg_mask value}.
+
+    @throws ValueError on an unknown syscall or an index out of 0..5.
+    """
+    registry = get_registry("x86_64")
+    masks = {}
+    for sys, indexes in spec.items():
+        nr = sys if isinstance(sys, int) else registry.syscall_number(sys)
+        if nr is None:
+            raise ValueError(f"Unknown syscall: {sys}")
+        if not indexes or any(not 0 <= i < 6 for i in indexes):
+            raise ValueError(f"Invalid argument indexes of {sys}: {indexes}")
+        masks[nr] = sum(1 << i for i in set(indexes))
+    return masks
+
+
+class MonitoringSession:
+    """@class MonitoringSession
+    @brief One loaded eBPF program, shared by any number of monitored containers.
+
+    Loading (compiling) inst.c is the expensive part of monitoring, so runs that profile
+    several containers at once share one session and read each container's entry from it.
+
+    An on-demand session keeps its programs and maps loaded but its probes detached while
+    no monitoring window is open, so an idle host does not pay for them: the first
+    window() attaches them, the last one to close detaches them.
+    """
+
+    def __init__(
+        self,
+        count: bool = False,
+        stats: bool = False,
+        bpf=None,
+        args: Optional[Dict[Union[str, int], Sequence[int]]] = None,
+        attrib: bool = False,
+        backend: Optional[str] = None,
+        cgroup_key: bool = False,
+        deny: bool = False,
+        ondemand: bool = False,
+        verify: bool = False,
+        epoch: bool = False,
+    ):
+        """
+        @param count    Also count calls of each syscall (Event_t.histogram()).
+        @param stats    Account probe run time (kernel.bpf_stats_enabled) into core.metrics.
+        @param bpf      Already loaded program (e.g. core.fake.FakeBPF). inst.c is loaded if None.
+        @param args     Capture distinct arguments (Event_t.arguments()): {syscall: indexes},
+                        e.g. ARG_SPEC.
+        @param attrib   Also break usage down by executable (Event_t.binaries()).
+        @param backend  "bcc" compiles inst.c, "libbpf" loads the prebuilt CO-RE object
+                        (inst_object(), no compiler or kernel headers needed).
+                        $BEACON_BACKEND, or "bcc", if None.
+        @param cgroup_key   Key the maps by cgroup id (8 bytes) instead of the namespace tuple
+                        (28 bytes). Containers are then identified without lsns, but
+                        processes sharing a cgroup are not told apart.
+                        Must match `bpf` if one is given.
+        @param deny     Also record failed syscalls and capability checks (Event_t.denials()),
+                        to validate a policy applied to the container.
+        @param ondemand Attach the probes only while a window() is open.
+        @param verify   Check with a canary syscall that the probes record events right
+                        after each attachment and right before each detachment.
+        @param epoch    Also record each window in double-buffered maps (window_profile()),
+                        read without racing the probes and reset without deleting entries.
+        """
+        masks = arg_masks(args) if args else {}
+        backend = backend or os.environ.get("BEACON_BACKEND", "bcc")
+        ## Program the probes are loaded from (part of the key of cached profiles)
+        self.backend = backend
+        self.program_file = (
+            inst_object(count, bool(masks), attrib, cgroup_key, deny, epoch)
+            if backend == "libbpf"
+            else INST_SRC
+        )
+        if bpf is None:
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown backend: {backend}")
+            assert os.geteuid() == 0  # Should be root for correct monitoring
+            with metrics.timer(
+                "bpf_load_seconds",
+                "Loading and attachment of the probes",
+                backend=backend,
+            ):
+                if backend == "libbpf":
+                    from core.libbpf import LibbpfBPF
+
+                    bpf = LibbpfBPF(self.program_file, cgroup_key=cgroup_key)
+                else:
+                    from core.BPF import RobustBPF
+
+                    cflags = ["-DBEACON_COUNT"] if count else []
+                    if masks:
+                        cflags.append("-DBEACON_ARGS")
+                    if attrib:
+                        cflags.append("-DBEACON_ATTRIB")
+                    if cgroup_key:
+                        cflags.append("-DBEACON_CGROUP_KEY")
+                    if deny:
+                        cflags.append("-DBEACON_DENY")
+                    if epoch:
+                        cflags.append("-DBEACON_EPOCH")
+                    bpf = RobustBPF(src_file=INST_SRC.encode(), cflags=cflags)
+        else:
+            stats = False  # bpf_stats_enabled accounts kernel programs only
+        self.bpf = bpf
+        self.count = count
+        self.args = bool(masks)
+        self.attrib = attrib
+        self.cgroup_key = cgroup_key
+        self.deny = deny
+        self.epoch = epoch
+        if masks:
+            table = self.bpf["arg_mask"]
+            for nr, mask in masks.items():
+                table[table.Key(nr)] = table.Leaf(mask)
+        self.stats = stats
+        self._map_name = "event"
+        self._lock = Lock()
+        self._stats_prev = self._set_stats(True) if stats else None
+        self._init_time = time()
+        self.ondemand = ondemand
+        self.verify = verify
+        self._windows = 0
+        self._window_lock = Lock()
+        self._own_key: Optional[Union[Namespace_t, int]] = None
+        self._epoch = 0  # Index of the epoch map the probes write to
+        self._epoch_lock = Lock()
+        self._pending: Dict[Union[Namespace_t, int], Profile] = (
+            {}
+        )  # Drained, not yet requested
+        if epoch:
+            self._init_epochs()
+        if ondemand:
+            self.bpf.detach_probes()
+
+    def _init_epochs(self):
+        try:
+            slots = self.bpf["epochs"]
+        except KeyError:  # Filled at load time (libbpf) or not needed (core.fake)
+            slots = None
+        if slots is not None:  # BCC creates an empty map of maps
+            for i, name in enumerate(EPOCH_MAPS):
+                slots[ct.c_int(i)] = ct.c_int(self.bpf[name].map_fd)
+        index = self.bpf["epoch_idx"]
+        index[index.Key(0)] = index.Leaf(self._epoch)
+
+    @contextmanager
+    def window(self):
+        """
+        @brief Monitoring window: probes are attached while at least one window is open.
+
+        Open it before the container starts and close it after its last read, so that
+        no event of the container falls outside the attached period.
+
+        @throws RuntimeError if `verify` and the attached probes record nothing.
+        """
+        self.open_window()
+        try:
+            yield self
+        finally:
+            self.close_window()
+
+    def open_window(self):
+        with self._window_lock:
+            self._windows += 1
+            if not self.ondemand or self._windows > 1:
+                return
+            try:
+                with metrics.timer(
+                    "probe_attach_seconds",
+                    "Attachment of the probes (on-demand session)",
+                ):
+                    self.bpf.attach_probes()
+                if self.verify and not self._canary():
+                    raise RuntimeError("Probes are attached but record no event")
+            except Exception:
+                self._windows -= 1
+                self.bpf.detach_probes()
+                raise
+
+    def close_window(self):
+        with self._window_lock:
+            self._windows -= 1
+            if not self.ondemand or self._windows > 0:
+                return
+            if (
+                self.verify and not self._canary()
+            ):  # Events before this point may have been lost
+                metrics.inc(
+                    "probe_canary_failures",
+                    doc="Windows whose probes recorded no canary",
+                )
+                logging.error(
+                    "[monitoring.agent] Probes stopped recording before the end of the window."
+                )
+            with metrics.timer(
+                "probe_detach_seconds", "Detachment of the probes (on-demand session)"
+            ):
+                self.bpf.detach_probes()
+
+    def _canary(self) -> bool:
+        """
+        @brief Issue a syscall under a temporary entry of this process and check it is recorded.
+        """
+        from core.wrapper import cgroup_id, lsns
+
+        if self._own_key is None:
+            if self.cgroup_key:
+                self._own_key = cgroup_id(os.getpid())
+            else:
+                namespace = lsns(os.getpid()) or {}
+                self._own_key = Namespace_t(
+                    **{name: int(namespace[name]) for name in Namespace_t._fields}
+                )
+        table = self.bpf[self._map_name]
+        key = raw_key(table, self._own_key)
+        if (
+            key in table
+        ):  # Another process of the host namespaces is being profiled: leave it
+            return True
+        leaves = [table.sLeaf() for _ in range(len(table.Leaf()))]
+        for leaf in leaves:
+            leaf.seccomp_flag = True  # Entries of unconfined processes are not recorded
+        table[key] = leaves
+        try:
+            os.getppid()  # getppid is never cached by libc
+            profile = read_key(table, key)
+            return profile is not None and profile.has_syscall(SYS_GETPPID)
+        finally:
+            with self._lock:
+                self._forget(self._own_key)
+
+    def collect(self):
+        """
+        @brief Record probe statistics and map occupancy into core.metrics.
+        """
+        enabled = {
+            "sys_count": self.count,
+            "sys_args": self.args,
+            "sys_attrib": self.attrib,
+            "denials": self.deny,
+            "epoch_a": self.epoch,
+            "epoch_b": self.epoch,
+        }
+        maps = {name: size for name, size in MAPS.items() if enabled.get(name, True)}
+        with self._lock:
+            collect_bpf(self.bpf, maps)
+            if self.stats:
+                elapsed = time() - self._init_time
+                for probe, (run_cnt, _) in self.bpf.prog_stats().items():
+                    metrics.set(
+                        "probe_events_per_second",
+                        run_cnt / elapsed,
+                        "Probe invocation rate",
+                        probe=probe,
+                    )
+
+    def _key(
+        self, container: Container, resolve: bool = True
+    ) -> Optional[Union[Namespace_t, int]]:
+        """
+        @brief Key of a container in the maps: its cgroup id or its namespace tuple.
+
+        @param resolve  Resolve the key if not known yet (otherwise None is returned).
+        """
+        if self.cgroup_key:
+            return container.cgroup_id() if resolve else container.cgroup
+        namespace = container.namespace() if resolve else container.ns
+        return None if namespace is None else Namespace_t(**namespace)
+
+    def snapshot(self, container: Container) -> Optional[Event_t]:
+        """
+        @brief Read the current profile of a container.
+
+        @param  container   Target container (provides namespace or cgroup info).
+        @return Event_t, or None if the container is not running or has no entry.
+        @throws RuntimeError if the key of a running container is unavailable.
+        """
+        if not container.alive():
+            return None
 
-from typing import Optional
+        key = self._key(container)
+        if key is None:
+            raise RuntimeError("Container is not working")
+        with self._lock:
+            with metrics.timer(
+                "decode_seconds", "Decoding of the event map (cast_data)"
+            ):
+                counts = self.bpf["sys_count"] if self.count else None
+                sys_args = self.bpf["sys_args"] if self.args else None
+                sys_attrib = self.bpf["sys_attrib"] if self.attrib else None
+                denials = self.bpf["denials"] if self.deny else None
+                table = cast_data(
+                    self.bpf[self._map_name], counts, sys_args, sys_attrib, denials
+                )
+            arg_drops = sum(self.bpf["arg_drops"][0]) if self.args else 0
+            attrib_drops = sum(self.bpf["attrib_drops"][0]) if self.attrib else 0
+        ev = table.get(key)
+        if ev is not None and arg_drops:
+            logging.warning(
+                f"[monitoring.agent] Argument set is full, {arg_drops} tuples were dropped."
+            )
+            ev.args_complete = False
+        if ev is not None and attrib_drops:
+            logging.warning(
+                f"[monitoring.agent] Attribution map is full, {attrib_drops} events were dropped."
+            )
+            ev.binaries_complete = False
+        return ev
+
+    def track(self, container: Container, period: float, deadline: float) -> Timeline:
+        """
+        @brief Sample the container every `period` seconds until `deadline`, keeping deltas only.
+
+        Only the container's key is looked up at each period, so the read cost does not
+        depend on the number of monitored containers.
+
+        @param  container   Target container (must be started).
+        @param  period      Sampling period in seconds (sub-second is fine).
+        @param  deadline    Absolute time (time.time()) to stop at.
+        @return Timeline of newly observed syscalls and capabilities.
+        """
+        timeline = Timeline()
+        container_id = self._key(container)
+        if container_id is None:
+            return timeline
+        table = self.bpf[self._map_name]
+        key = raw_key(table, container_id)
+
+        def sample() -> Optional[Profile]:
+            if self.epoch:  # Consistent across CPUs: the epoch map is no longer written
+                return timeline.profile | self._window(container_id)
+            with metrics.timer("read_key_seconds", "Lookup of one container's entry"):
+                return read_key(table, key)
+
+        init_time = time()
+        next_time = init_time
+        while True:
+            profile = sample()
+            if profile is not None:
+                timeline.update(time() - init_time, profile)
+            next_time += period
+            if next_time >= deadline:
+                break
+            sleep(max(0.0, next_time - time()))
+        sleep(max(0.0, deadline - time()))
+        profile = sample()
+        if profile is not None:
+            timeline.update(time() - init_time, profile)
+        return timeline
+
+    def window_profile(self, container: Container) -> Profile:
+        """
+        @brief Profile of a container since its previous window_profile() call (or since
+               the session was loaded), read from the epoch maps.
+
+        Successive calls give back-to-back windows: each one is a consistent view across
+        CPUs, and starting a new window deletes no entry.
+
+        @throws RuntimeError if the session has no epoch maps or the key is unavailable.
+        """
+        if not self.epoch:
+            raise RuntimeError("Windows need a session loaded with epoch=True")
+        key = self._key(container)
+        if key is None:
+            raise RuntimeError("Container is not working")
+        return self._window(key)
+
+    def _window(self, container_id: Union[Namespace_t, int]) -> Profile:
+        self._drain()
+        with self._epoch_lock:
+            return self._pending.pop(container_id, Profile())
+
+    def _drain(self):
+        """
+        @brief Flip the epoch, then read and clear the map of the closed one.
+
+        Windows of the other containers are kept in _pending until they are requested.
+        """
+        with self._epoch_lock:
+            closed = self._epoch
+            self._epoch ^= 1
+            index = self.bpf["epoch_idx"]
+            index[index.Key(0)] = index.Leaf(self._epoch)
+            with metrics.timer(
+                "epoch_grace_seconds", "Wait for the probes writing to a closed epoch"
+            ):
+                synchronize_rcu()
+            table = self.bpf[EPOCH_MAPS[closed]]
+            with metrics.timer(
+                "epoch_drain_seconds", "Read and reset of a closed epoch map"
+            ):
+                for key, per_cpu in table.items():
+                    container_id = container_key(key)
+                    profile = Profile.from_struct(*per_cpu)
+                    self._pending[container_id] = (
+                        self._pending.get(container_id, Profile()) | profile
+                    )
+                table.clear()
+
+    def forget(self, container: Container):
+        """
+        @brief Delete the entries of a container, so that long-lived sessions do not fill the maps.
+
+        @param container    Profiled container (its key must have been resolved).
+        """
+        container_id = self._key(container, resolve=False)
+        if container_id is None:
+            return
+        with self._lock:
+            self._forget(container_id)
+
+    def _forget(self, container_id: Union[Namespace_t, int]):
+        tables = [self._map_name] + (list(EPOCH_MAPS) if self.epoch else [])
+        for name in tables:
+            table = self.bpf[name]
+            try:
+                del table[raw_key(table, container_id)]
+            except KeyError:
+                pass
+        if self.epoch:
+            with self._epoch_lock:
+                self._pending.pop(container_id, None)
+        for name, enabled in (
+            ("sys_count", self.count),
+            ("sys_args", self.args),
+            ("sys_attrib", self.attrib),
+            ("denials", self.deny),
+        ):
+            if not enabled:
+                continue
+            entries = self.bpf[name]
+            for entry_key in [
+                k for k, _ in entries.items() if container_key(k.ns) == container_id
+            ]:
+                del entries[entry_key]
+
+    def cleanup(self):
+        """
+        @brief Detach probes and release the program.
+        """
+        if self.stats:
+            self.collect()
+            self._set_stats(self._stats_prev)
+        self.bpf.cleanup()
+
+    @staticmethod
+    def _set_stats(enabled: bool) -> bool:
+        from core.wrapper import set_bpf_stats
+
+        return set_bpf_stats(enabled)
 
 
 class Monitoring(Thread):
@@ -33,26 +555,62 @@ class Monitoring(Thread):
     @note Requires root privileges because BPF attach and kprobe/tracepoint operations need CAP_BPF/CAP_SYS_ADMIN.
     """
 
-    def __init__(self, duration: int, input_queue: Queue, output_queue: Queue):
+    def __init__(
+        self,
+        duration: int,
+        input_queue: Queue,
+        output_queue: Queue,
+        count: bool = False,
+        session: Optional[MonitoringSession] = None,
+        period: Optional[float] = None,
+        args: Optional[Dict[Union[str, int], Sequence[int]]] = None,
+        attrib: bool = False,
+        cgroup_key: bool = False,
+        deny: bool = False,
+        epoch: bool = False,
+    ):
         """
         @param duration     Sampling window in seconds (time to wait before reading the map).
         @param input_queue  Queue where MonitoringAgent posts the target Container.
         @param output_queue Queue where this thread publishes the parsed snapshot (or None).
+        @param count        Also count calls of each syscall (Event_t.histogram()).
+        @param session      Shared session to read from. A private one is loaded if None.
+        @param period       If set, also record a Timeline sampled every `period` seconds.
+        @param args         Capture distinct arguments of these syscalls (see MonitoringSession).
+        @param attrib       Also break usage down by executable.
+        @param cgroup_key   Key the maps by cgroup id (see MonitoringSession).
+        @param deny         Also record failed syscalls and capability checks.
+        @param epoch        Sample the timeline from the epoch maps (see MonitoringSession).
         """
-        assert os.geteuid() == 0  # Should be root for correct monitoring
         super().__init__()
-        self.bpf = RobustBPF(src_file=b"monitoring/ebpf/inst.c")
+        if session is None:
+            session = MonitoringSession(
+                count,
+                args=args,
+                attrib=attrib,
+                cgroup_key=cgroup_key,
+                deny=deny,
+                epoch=epoch,
+            )
+        self.session = session
+        self.bpf = self.session.bpf
         self.duration = duration
         self.input_queue = input_queue
         self.output_queue = output_queue
-        self._map_name = "event"
+        self.period = period
+        self.timeline: Optional[Timeline] = None
 
     def run(self):
         """
         @brief Thread main: wait for a Container, sample for `duration`, read BPF map, publish result.
         """
-        sleep(self.duration)
-        container: Container = self.input_queue.get()
+        if self.period is None:
+            sleep(self.duration)
+            container: Container = self.input_queue.get()
+        else:
+            deadline = time() + self.duration
+            container = self.input_queue.get()
+            self.timeline = self.session.track(container, self.period, deadline)
         self.read_data(container)
 
     def read_data(self, container: Container):
@@ -61,16 +619,8 @@ class Monitoring(Thread):
 
         @param container  Target container (provides pid/cgroup info).
         """
-        if not container.alive():
-            self.output_queue.put(None)
-            return
-
-        namespace = container.namespace()
-        if namespace is None:
-            raise RuntimeError("Container is not working")
-        table = cast_data(self.bpf[self._map_name])
-        ev = table.get(Namespace_t(**namespace))
-
+        with metrics.timer("read_data_seconds", "Monitoring.read_data"):
+            ev = self.session.snapshot(container)
         self.output_queue.put(ev)
 
 
@@ -82,15 +632,43 @@ class MonitoringAgent:
     You MUST create a new instance per container run.
     """
 
-    def __init__(self, duration: int):
+    def __init__(
+        self,
+        duration: int,
+        count: bool = False,
+        period: Optional[float] = None,
+        args: Optional[Dict[Union[str, int], Sequence[int]]] = None,
+        attrib: bool = False,
+        cgroup_key: bool = False,
+        deny: bool = False,
+        epoch: bool = False,
+    ):
         """
         @param duration Sampling window in seconds.
+        @param count    Also count calls of each syscall (Event_t.histogram()).
+        @param period   If set, also record a Timeline sampled every `period` seconds.
+        @param args     Capture distinct arguments of these syscalls (Event_t.arguments()).
+        @param attrib   Also break usage down by executable (Event_t.binaries()).
+        @param cgroup_key   Key the maps by cgroup id (see MonitoringSession).
+        @param deny     Also record failed syscalls and capability checks (Event_t.denials()).
+        @param epoch    Sample the timeline from the epoch maps (see MonitoringSession).
 
         @note Re-entrant safe: multiple __init__ calls after first are ignored.
         """
         self.input_queue: Queue = Queue()
         self.output_queue: Queue = Queue()
-        self.thread = Monitoring(duration, self.input_queue, self.output_queue)
+        self.thread = Monitoring(
+            duration,
+            self.input_queue,
+            self.output_queue,
+            count,
+            period=period,
+            args=args,
+            attrib=attrib,
+            cgroup_key=cgroup_key,
+            deny=deny,
+            epoch=epoch,
+        )
         self.duration = duration
         self._init_time = None
         self._notified = False
@@ -136,8 +714,13 @@ class MonitoringAgent:
         logging.info(
             f"[monitoring.agent] Monitoring duration: {time() - self._init_time:.3f}s"
         )
+        metrics.log_summary()
         return self.output_queue.get()
 
+    def get_timeline(self) -> Optional[Timeline]:
+        """@brief Timeline of the run (periodic mode only), available after get_result_monitoring()."""
+        return self.thread.timeline
+
 
 if __name__ == "__main__":
     logging.basicConfig(filename="log", level=logging.INFO)
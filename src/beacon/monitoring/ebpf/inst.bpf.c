@@ -0,0 +1,477 @@
+// Last Modified at Oct 19, 2026
+
+// CO-RE build of inst.c for the libbpf backend (core/libbpf.py).
+// Maps, keys and values are identical to inst.c, so both backends are decoded by
+// monitoring/ebpf/types.py. Kernel structures come from vmlinux.h (BTF) and are
+// relocated at load time: no kernel headers and no compiler are needed on the host.
+// Optional modes (BEACON_COUNT, BEACON_ARGS, BEACON_ATTRIB, BEACON_CGROUP_KEY,
+// BEACON_DENY, BEACON_EPOCH) are chosen at build time, see Makefile.
+//
+// sys_enter and cap_capable exist twice: a BTF program (tp_btf, fentry) and a
+// fallback (tracepoint, kprobe) for kernels without BTF trampolines. The loader
+// keeps one program of each pair.
+
+#include "vmlinux.h"
+#include <bpf/bpf_core_read.h>
+#include <bpf/bpf_helpers.h>
+#include <bpf/bpf_tracing.h>
+
+#define SECCOMP_SET_MODE_FILTER 1
+#define PR_SET_SECCOMP 22
+#define EPERM 1
+#define EACCES 13
+#define EEXIST 17
+#define ENOSYS 38
+#define TASK_COMM_LEN 16
+
+char LICENSE[] SEC("license") = "GPL";
+
+struct namespace_t {
+  u32 cgroup;
+  u32 user;
+  u32 uts;
+  u32 ipc;
+  u32 mnt;
+  u32 pid;
+  u32 net;
+};
+
+#ifdef BEACON_CGROUP_KEY
+// Optional (-DBEACON_CGROUP_KEY): maps are keyed by the cgroup v2 id of the task
+// instead of its namespace inodes: one helper call instead of seven pointer chains
+// per event, and an 8-byte key instead of 28 bytes. Python resolves the id of a
+// container from its cgroup path (Container.cgroup_id()).
+typedef u64 beacon_key_t;
+#else
+typedef struct namespace_t beacon_key_t;
+#endif
+
+
+struct sys_and_cap_t {
+  bool seccomp_flag;
+  bool padding[7];
+  u32 sys[24];
+  u32 cap[2];
+};
+
+struct {
+  __uint(type, BPF_MAP_TYPE_PERCPU_HASH);
+  __uint(max_entries, 16384);
+  __type(key, beacon_key_t);
+  __type(value, struct sys_and_cap_t);
+} event SEC(".maps");
+
+#ifdef BEACON_COUNT
+struct sys_count_key_t {
+  beacon_key_t ns;
+  u32 nr;
+};
+
+struct {
+  __uint(type, BPF_MAP_TYPE_PERCPU_HASH);
+  __uint(max_entries, 65536);
+  __type(key, struct sys_count_key_t);
+  __type(value, u64);
+} sys_count SEC(".maps");
+#endif
+
+#ifdef BEACON_ARGS
+#ifndef BEACON_ARGS_ENTRIES
+#define BEACON_ARGS_ENTRIES 65536
+#endif
+
+struct arg_key_t {
+  beacon_key_t ns;
+  u32 nr;
+  u32 mask;
+  u32 padding;
+  u64 args[6];
+};
+
+struct {
+  __uint(type, BPF_MAP_TYPE_ARRAY);
+  __uint(max_entries, 768);
+  __type(key, u32);
+  __type(value, u32);
+} arg_mask SEC(".maps");
+
+struct {
+  __uint(type, BPF_MAP_TYPE_HASH);
+  __uint(max_entries, BEACON_ARGS_ENTRIES);
+  __type(key, struct arg_key_t);
+  __type(value, u8);
+} sys_args SEC(".maps");
+
+struct {
+  __uint(type, BPF_MAP_TYPE_PERCPU_ARRAY);
+  __uint(max_entries, 1);
+  __type(key, u32);
+  __type(value, u64);
+} arg_drops SEC(".maps");
+#endif
+
+#ifdef BEACON_ATTRIB
+#ifndef BEACON_ATTRIB_ENTRIES
+#define BEACON_ATTRIB_ENTRIES 16384
+#endif
+
+struct attrib_key_t {
+  beacon_key_t ns;
+  char comm[TASK_COMM_LEN];
+};
+
+struct attrib_t {
+  u32 sys[24];
+  u32 cap[2];
+};
+
+struct {
+  __uint(type, BPF_MAP_TYPE_PERCPU_HASH);
+  __uint(max_entries, BEACON_ATTRIB_ENTRIES);
+  __type(key, struct attrib_key_t);
+  __type(value, struct attrib_t);
+} sys_attrib SEC(".maps");
+
+struct {
+  __uint(type, BPF_MAP_TYPE_PERCPU_ARRAY);
+  __uint(max_entries, 1);
+  __type(key, u32);
+  __type(value, u64);
+} attrib_drops SEC(".maps");
+#endif
+
+#ifdef BEACON_DENY
+struct deny_key_t {
+  beacon_key_t ns;
+  u32 nr;  // Syscall number, or capability number if cap
+  u16 cap; // 1 for a failed capability check
+  u16 err; // Errno
+};
+
+struct {
+  __uint(type, BPF_MAP_TYPE_PERCPU_HASH);
+  __uint(max_entries, 16384);
+  __type(key, struct deny_key_t);
+  __type(value, u64);
+} denials SEC(".maps");
+
+struct {
+  __uint(type, BPF_MAP_TYPE_HASH);
+  __uint(max_entries, 10240);
+  __type(key, u64);
+  __type(value, int);
+} cap_checks SEC(".maps"); // Capability being checked by each thread (kretprobe fallback)
+#endif
+
+#ifdef BEACON_EPOCH
+struct epoch_t {
+  u32 sys[24];
+  u32 cap[2];
+};
+
+struct epoch_map {
+  __uint(type, BPF_MAP_TYPE_PERCPU_HASH);
+  __uint(max_entries, 16384);
+  __type(key, beacon_key_t);
+  __type(value, struct epoch_t);
+} epoch_a SEC(".maps"), epoch_b SEC(".maps");
+
+struct {
+  __uint(type, BPF_MAP_TYPE_ARRAY_OF_MAPS);
+  __uint(max_entries, 2);
+  __type(key, u32);
+  __array(values, struct epoch_map);
+} epochs SEC(".maps") = {
+    .values = {&epoch_a, &epoch_b}, // Filled by libbpf at load time
+};
+
+struct {
+  __uint(type, BPF_MAP_TYPE_ARRAY);
+  __uint(max_entries, 1);
+  __type(key, u32);
+  __type(value, u32);
+} epoch_idx SEC(".maps");
+#endif
+
+static __always_inline void count_drop(void *drops) {
+  u32 zero_idx = 0;
+  u64 *value = bpf_map_lookup_elem(drops, &zero_idx);
+  if (value)
+    (*value)++;
+}
+
+static __always_inline struct namespace_t get_ns(void) {
+  struct namespace_t ns;
+  struct task_struct *task = (struct task_struct *)bpf_get_current_task();
+  struct nsproxy *nsproxy = BPF_CORE_READ(task, nsproxy);
+  ns.cgroup = BPF_CORE_READ(nsproxy, cgroup_ns, ns.inum);
+  ns.user = BPF_CORE_READ(nsproxy, cgroup_ns, user_ns, ns.inum);
+  ns.uts = BPF_CORE_READ(nsproxy, uts_ns, ns.inum);
+  ns.ipc = BPF_CORE_READ(nsproxy, ipc_ns, ns.inum);
+  ns.mnt = BPF_CORE_READ(nsproxy, mnt_ns, ns.inum);
+  ns.pid = BPF_CORE_READ(nsproxy, pid_ns_for_children, ns.inum);
+  ns.net = BPF_CORE_READ(nsproxy, net_ns, ns.inum);
+  return ns;
+}
+
+static __always_inline beacon_key_t get_key(void) {
+#ifdef BEACON_CGROUP_KEY
+  return bpf_get_current_cgroup_id();
+#else
+  return get_ns();
+#endif
+}
+
+static __always_inline struct sys_and_cap_t *get_or_init(beacon_key_t *ns) {
+  struct sys_and_cap_t *sys_and_cap = bpf_map_lookup_elem(&event, ns);
+  if (sys_and_cap)
+    return sys_and_cap;
+  struct sys_and_cap_t zero = {};
+  bpf_map_update_elem(&event, ns, &zero, BPF_NOEXIST);
+  return bpf_map_lookup_elem(&event, ns);
+}
+
+#ifdef BEACON_ATTRIB
+static __always_inline struct attrib_t *get_attrib(beacon_key_t *ns) {
+  struct attrib_key_t key;
+  __builtin_memset(&key, 0, sizeof(key));
+  key.ns = *ns;
+  bpf_get_current_comm(&key.comm, sizeof(key.comm));
+  struct attrib_t *attrib = bpf_map_lookup_elem(&sys_attrib, &key);
+  if (attrib)
+    return attrib;
+  struct attrib_t zero = {};
+  bpf_map_update_elem(&sys_attrib, &key, &zero, BPF_NOEXIST);
+  attrib = bpf_map_lookup_elem(&sys_attrib, &key);
+  if (!attrib)
+    count_drop(&attrib_drops);
+  return attrib;
+}
+#endif
+
+#ifdef BEACON_EPOCH
+static __always_inline struct epoch_t *get_epoch(beacon_key_t *ns) {
+  u32 zero_idx = 0;
+  u32 *idx = bpf_map_lookup_elem(&epoch_idx, &zero_idx);
+  if (!idx)
+    return NULL;
+  u32 slot = *idx & 1;
+  void *inner = bpf_map_lookup_elem(&epochs, &slot);
+  if (!inner)
+    return NULL;
+  struct epoch_t *epoch = bpf_map_lookup_elem(inner, ns);
+  if (epoch)
+    return epoch;
+  struct epoch_t zero = {};
+  bpf_map_update_elem(inner, ns, &zero, BPF_NOEXIST);
+  return bpf_map_lookup_elem(inner, ns);
+}
+#endif
+
+#ifdef BEACON_DENY
+static __always_inline void count_denial(beacon_key_t *ns, u32 nr, u16 cap, u16 err) {
+  struct deny_key_t key;
+  __builtin_memset(&key, 0, sizeof(key)); // Padding is part of the hashed key
+  key.ns = *ns;
+  key.nr = nr;
+  key.cap = cap;
+  key.err = err;
+  u64 *count = bpf_map_lookup_elem(&denials, &key);
+  if (!count) {
+    u64 zero = 0;
+    bpf_map_update_elem(&denials, &key, &zero, BPF_NOEXIST);
+    count = bpf_map_lookup_elem(&denials, &key);
+  }
+  if (count)
+    (*count)++;
+}
+
+static __always_inline int on_cap_denied(int cap, int ret) {
+  if (ret == 0 || cap < 0 || cap >= 64)
+    return 0;
+  beacon_key_t ns = get_key();
+  if (!bpf_map_lookup_elem(&event, &ns))
+    return 0;
+  count_denial(&ns, cap, 1, -ret);
+  return 0;
+}
+#endif
+
+static __always_inline int on_sys_enter(long id, const u64 *argv) {
+  beacon_key_t ns = get_key();
+  struct sys_and_cap_t *sys_and_cap = bpf_map_lookup_elem(&event, &ns);
+  if (!sys_and_cap || !sys_and_cap->seccomp_flag)
+    return 0;
+
+  u32 quot = id >> 5;
+  if (id < 0 || quot >= 24)
+    return 0;
+  sys_and_cap->sys[quot] |= 1 << (id % 32);
+#ifdef BEACON_EPOCH
+  struct epoch_t *epoch = get_epoch(&ns);
+  if (epoch)
+    epoch->sys[quot] |= 1 << (id % 32);
+#endif
+
+#ifdef BEACON_COUNT
+  struct sys_count_key_t count_key;
+  __builtin_memset(&count_key, 0, sizeof(count_key)); // Padding is hashed (cgroup key)
+  count_key.ns = ns;
+  count_key.nr = id;
+  u64 *count = bpf_map_lookup_elem(&sys_count, &count_key);
+  if (!count) {
+    u64 zero = 0;
+    bpf_map_update_elem(&sys_count, &count_key, &zero, BPF_NOEXIST);
+    count = bpf_map_lookup_elem(&sys_count, &count_key);
+  }
+  if (count)
+    (*count)++;
+#endif
+#ifdef BEACON_ARGS
+  u32 nr = id;
+  u32 *mask = bpf_map_lookup_elem(&arg_mask, &nr);
+  if (mask && *mask) {
+    struct arg_key_t arg_key;
+    __builtin_memset(&arg_key, 0, sizeof(arg_key)); // Padding is part of the hashed key
+    arg_key.ns = ns;
+    arg_key.nr = nr;
+    arg_key.mask = *mask;
+#pragma unroll
+    for (int i = 0; i < 6; i++) {
+      if (*mask & (1 << i))
+        arg_key.args[i] = argv[i];
+    }
+    u8 one = 1;
+    int ret = bpf_map_update_elem(&sys_args, &arg_key, &one, BPF_NOEXIST);
+    if (ret < 0 && ret != -EEXIST)
+      count_drop(&arg_drops);
+  }
+#endif
+#ifdef BEACON_ATTRIB
+  struct attrib_t *attrib = get_attrib(&ns);
+  if (attrib)
+    attrib->sys[quot] |= 1 << (id % 32);
+#endif
+  return 0;
+}
+
+static __always_inline int on_cap_capable(int cap) {
+  beacon_key_t ns = get_key();
+  struct sys_and_cap_t *sys_and_cap = bpf_map_lookup_elem(&event, &ns);
+  if (!sys_and_cap)
+    return 0;
+  if (cap < 0 || cap >= 64)
+    return 0;
+
+  u32 idx = cap >> 5;
+  u32 bit = 1u << (cap & 31);
+  sys_and_cap->cap[idx] |= bit;
+#ifdef BEACON_EPOCH
+  struct epoch_t *epoch = get_epoch(&ns);
+  if (epoch)
+    epoch->cap[idx] |= bit;
+#endif
+#ifdef BEACON_ATTRIB
+  struct attrib_t *attrib = get_attrib(&ns);
+  if (attrib)
+    attrib->cap[idx] |= bit;
+#endif
+  return 0;
+}
+
+// Tracking of a namespace starts when runc installs the seccomp filter of the container.
+SEC("tracepoint/syscalls/sys_enter_seccomp")
+int sys_enter_seccomp(struct trace_event_raw_sys_enter *ctx) {
+  beacon_key_t ns = get_key();
+  struct sys_and_cap_t *sys_and_cap = get_or_init(&ns);
+  if (!sys_and_cap)
+    return 0;
+  if (ctx->args[0] != SECCOMP_SET_MODE_FILTER || !ctx->args[2])
+    return 0;
+  sys_and_cap->seccomp_flag = true;
+  return 0;
+}
+
+SEC("tracepoint/syscalls/sys_enter_prctl")
+int sys_enter_prctl(struct trace_event_raw_sys_enter *ctx) {
+  beacon_key_t ns = get_key();
+  struct sys_and_cap_t *sys_and_cap = bpf_map_lookup_elem(&event, &ns);
+  if (!sys_and_cap)
+    return 0;
+  if (ctx->args[0] != PR_SET_SECCOMP)
+    return 0;
+  sys_and_cap->seccomp_flag = true;
+  return 0;
+}
+
+SEC("tp_btf/sys_enter")
+int BPF_PROG(sys_enter_btf, struct pt_regs *regs, long id) {
+  u64 argv[6] = {};
+#ifdef BEACON_ARGS
+  argv[0] = PT_REGS_PARM1_CORE_SYSCALL(regs);
+  argv[1] = PT_REGS_PARM2_CORE_SYSCALL(regs);
+  argv[2] = PT_REGS_PARM3_CORE_SYSCALL(regs);
+  argv[3] = PT_REGS_PARM4_CORE_SYSCALL(regs);
+  argv[4] = PT_REGS_PARM5_CORE_SYSCALL(regs);
+  argv[5] = PT_REGS_PARM6_CORE_SYSCALL(regs);
+#endif
+  return on_sys_enter(id, argv);
+}
+
+SEC("tracepoint/raw_syscalls/sys_enter")
+int sys_enter_tp(struct trace_event_raw_sys_enter *ctx) {
+  u64 argv[6] = {};
+#ifdef BEACON_ARGS
+#pragma unroll
+  for (int i = 0; i < 6; i++)
+    argv[i] = ctx->args[i];
+#endif
+  return on_sys_enter(ctx->id, argv);
+}
+
+SEC("fentry/cap_capable")
+int BPF_PROG(cap_capable_fentry, const struct cred *cred, struct user_namespace *targ_ns, int cap) {
+  return on_cap_capable(cap);
+}
+
+SEC("kprobe/cap_capable")
+int BPF_KPROBE(cap_capable_kprobe, const struct cred *cred, struct user_namespace *targ_ns, int cap) {
+#ifdef BEACON_DENY
+  u64 tid = bpf_get_current_pid_tgid();
+  bpf_map_update_elem(&cap_checks, &tid, &cap, BPF_ANY);
+#endif
+  return on_cap_capable(cap);
+}
+
+#ifdef BEACON_DENY
+// A syscall denied by seccomp never reaches sys_enter, but its sys_exit carries the
+// errno of the filter.
+SEC("tracepoint/raw_syscalls/sys_exit")
+int sys_exit_tp(struct trace_event_raw_sys_exit *ctx) {
+  long ret = ctx->ret;
+  if (ret != -EPERM && ret != -EACCES && ret != -ENOSYS)
+    return 0;
+  beacon_key_t ns = get_key();
+  if (!bpf_map_lookup_elem(&event, &ns))
+    return 0; // Not a container
+  count_denial(&ns, ctx->id, 0, -ret);
+  return 0;
+}
+
+SEC("fexit/cap_capable")
+int BPF_PROG(cap_capable_fexit, const struct cred *cred, struct user_namespace *targ_ns, int cap,
+             unsigned int opts, int ret) {
+  return on_cap_denied(cap, ret);
+}
+
+SEC("kretprobe/cap_capable")
+int BPF_KRETPROBE(cap_capable_kretprobe, int ret) {
+  u64 tid = bpf_get_current_pid_tgid();
+  int *cap = bpf_map_lookup_elem(&cap_checks, &tid);
+  if (!cap)
+    return 0;
+  int nr = *cap;
+  bpf_map_delete_elem(&cap_checks, &tid);
+  return on_cap_denied(nr, ret);
+}
+#endif
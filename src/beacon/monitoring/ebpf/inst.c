@@ -1,7 +1,8 @@
-// Last Modified at Nov 23, 2025
+// Last Modified at Oct 19, 2026
 
 #include <linux/capability.h>
 #include <linux/cred.h>
+#include <linux/errno.h>
 #include <linux/filter.h>
 #include <linux/ipc_namespace.h>
 #include <linux/pid_namespace.h>
@@ -37,6 +38,17 @@ struct namespace_t {
   u32 net;
 };
 
+#ifdef BEACON_CGROUP_KEY
+// Optional (-DBEACON_CGROUP_KEY): maps are keyed by the cgroup v2 id of the task
+// instead of its namespace inodes: one helper call instead of seven pointer chains
+// per event, and an 8-byte key instead of 28 bytes. Python resolves the id of a
+// container from its cgroup path (Container.cgroup_id()).
+typedef u64 beacon_key_t;
+#else
+typedef struct namespace_t beacon_key_t;
+#endif
+
+
 struct sys_and_cap_t {
   bool seccomp_flag;
   bool padding[7];
@@ -44,7 +56,141 @@ struct sys_and_cap_t {
   u32 cap[2];
 };
 
-BPF_PERCPU_HASH(event, struct namespace_t, struct sys_and_cap_t, 16384);
+BPF_PERCPU_HASH(event, beacon_key_t, struct sys_and_cap_t, 16384);
+
+#ifdef BEACON_COUNT
+// Optional (-DBEACON_COUNT): per-CPU number of calls of each syscall per namespace.
+// Per-CPU values need no atomic operation; they are merged on read (cast_data).
+struct sys_count_key_t {
+  beacon_key_t ns;
+  u32 nr;
+};
+
+BPF_PERCPU_HASH(sys_count, struct sys_count_key_t, u64, 65536);
+#endif
+
+#ifdef BEACON_ARGS
+// Optional (-DBEACON_ARGS): distinct argument tuples of selected syscalls per namespace.
+// arg_mask[nr] selects the captured arguments (bit i = args[i]) and is filled from Python.
+// The whole tuple is the key of a shared hash set, so each distinct tuple is stored once;
+// once the set is full, new tuples are counted in arg_drops instead.
+
+#ifndef BEACON_ARGS_ENTRIES
+#define BEACON_ARGS_ENTRIES 65536
+#endif
+
+struct arg_key_t {
+  beacon_key_t ns;
+  u32 nr;
+  u32 mask;
+  u32 padding;
+  u64 args[6];
+};
+
+BPF_ARRAY(arg_mask, u32, 768);
+BPF_HASH(sys_args, struct arg_key_t, u8, BEACON_ARGS_ENTRIES);
+BPF_PERCPU_ARRAY(arg_drops, u64, 1);
+#endif
+
+#ifdef BEACON_ATTRIB
+// Optional (-DBEACON_ATTRIB): usage of each executable (task comm, i.e. the first 15
+// bytes of the executed file name) within a tracked namespace, in a bounded map.
+// Executables beyond the capacity are counted in attrib_drops.
+#ifndef BEACON_ATTRIB_ENTRIES
+#define BEACON_ATTRIB_ENTRIES 16384
+#endif
+
+struct attrib_key_t {
+  beacon_key_t ns;
+  char comm[TASK_COMM_LEN];
+};
+
+struct attrib_t {
+  u32 sys[24];
+  u32 cap[2];
+};
+
+BPF_PERCPU_HASH(sys_attrib, struct attrib_key_t, struct attrib_t, BEACON_ATTRIB_ENTRIES);
+BPF_PERCPU_ARRAY(attrib_drops, u64, 1);
+
+static __always_inline struct attrib_t *get_attrib(beacon_key_t *ns) {
+  struct attrib_key_t key;
+  __builtin_memset(&key, 0, sizeof(key));
+  key.ns = *ns;
+  bpf_get_current_comm(&key.comm, sizeof(key.comm));
+  struct attrib_t zero = {};
+  struct attrib_t *attrib = sys_attrib.lookup_or_try_init(&key, &zero);
+  if (!attrib) {
+    u32 zero_idx = 0;
+    u64 *drops = attrib_drops.lookup(&zero_idx);
+    if (drops)
+      (*drops)++;
+  }
+  return attrib;
+}
+#endif
+
+#ifdef BEACON_DENY
+// Optional (-DBEACON_DENY): failed syscalls and capability checks per namespace, to
+// validate a policy applied to the container (policy/validate.py). A syscall denied by
+// seccomp never reaches sys_enter, but its sys_exit carries the errno of the filter.
+struct deny_key_t {
+  beacon_key_t ns;
+  u32 nr;  // Syscall number, or capability number if cap
+  u16 cap; // 1 for a failed capability check
+  u16 err; // Errno
+};
+
+BPF_PERCPU_HASH(denials, struct deny_key_t, u64, 16384);
+BPF_HASH(cap_checks, u64, int, 10240); // Capability being checked by each thread
+
+static __always_inline void count_denial(beacon_key_t *ns, u32 nr, u16 cap, u16 err) {
+  struct deny_key_t key;
+  __builtin_memset(&key, 0, sizeof(key)); // Padding is part of the hashed key
+  key.ns = *ns;
+  key.nr = nr;
+  key.cap = cap;
+  key.err = err;
+  u64 zero = 0;
+  u64 *count = denials.lookup_or_try_init(&key, &zero);
+  if (count)
+    (*count)++;
+}
+#endif
+
+#ifdef BEACON_EPOCH
+// Optional (-DBEACON_EPOCH): the bits of each event are also set in one of two per-CPU
+// maps, the one of the current epoch (epoch_idx). Python flips epoch_idx, waits for the
+// programs which read the previous index to return, then reads the other map at leisure
+// and clears it: a consistent view of one window, without pausing the probes. `event`
+// keeps the cumulative profile and decides which namespaces are tracked.
+struct epoch_t {
+  u32 sys[24];
+  u32 cap[2];
+};
+
+BPF_PERCPU_HASH(epoch_a, beacon_key_t, struct epoch_t, 16384);
+BPF_PERCPU_HASH(epoch_b, beacon_key_t, struct epoch_t, 16384);
+BPF_ARRAY_OF_MAPS(epochs, "epoch_a", 2); // [epoch_a, epoch_b], filled from Python
+BPF_ARRAY(epoch_idx, u32, 1);
+
+static __always_inline struct epoch_t *get_epoch(beacon_key_t *ns) {
+  u32 zero_idx = 0;
+  u32 *idx = epoch_idx.lookup(&zero_idx);
+  if (!idx)
+    return NULL;
+  u32 slot = *idx & 1;
+  void *inner = epochs.lookup(&slot);
+  if (!inner)
+    return NULL;
+  struct epoch_t *epoch = bpf_map_lookup_elem(inner, ns);
+  if (epoch)
+    return epoch;
+  struct epoch_t zero = {};
+  bpf_map_update_elem(inner, ns, &zero, BPF_NOEXIST);
+  return bpf_map_lookup_elem(inner, ns);
+}
+#endif
 
 static struct namespace_t get_ns() {
   struct namespace_t ns;
@@ -59,8 +205,16 @@ static struct namespace_t get_ns() {
   return ns;
 }
 
+static __always_inline beacon_key_t get_key() {
+#ifdef BEACON_CGROUP_KEY
+  return bpf_get_current_cgroup_id();
+#else
+  return get_ns();
+#endif
+}
+
 static __always_inline struct sys_and_cap_t *get_or_init() {
-  struct namespace_t ns = get_ns();
+  beacon_key_t ns = get_key();
   struct sys_and_cap_t *sys_and_cap = event.lookup(&ns);
   if (sys_and_cap)
     return sys_and_cap;
@@ -88,7 +242,7 @@ static __always_inline struct sys_and_cap_t *get_or_init() {
 ////////////////////////////////////////////////////////////////////////////////
 TRACEPOINT_PROBE(syscalls, sys_enter_seccomp) {
   struct sys_and_cap_t *sys_and_cap = get_or_init();
-  struct namespace_t ns = get_ns();
+  beacon_key_t ns = get_key();
   if (!sys_and_cap)
     return 0; // Cannot be happen, logic for the verifier
 
@@ -117,7 +271,7 @@ TRACEPOINT_PROBE(syscalls, sys_enter_seccomp) {
 //    size:8;    signed:0; //
 ////////////////////////////////////////////////////////////////////////////////
 TRACEPOINT_PROBE(syscalls, sys_enter_prctl) {
-  struct namespace_t ns = get_ns();
+  beacon_key_t ns = get_key();
   struct sys_and_cap_t *sys_and_cap = event.lookup(&ns);
   if (!sys_and_cap)
     return 0; // Not interested in this namespace
@@ -140,7 +294,7 @@ TRACEPOINT_PROBE(syscalls, sys_enter_prctl) {
 //    args[6];                            offset:16; size:48; signed:0; //
 ////////////////////////////////////////////////////////////////////////////////
 TRACEPOINT_PROBE(raw_syscalls, sys_enter) {
-  struct namespace_t ns = get_ns();
+  beacon_key_t ns = get_key();
   struct sys_and_cap_t *sys_and_cap = event.lookup(&ns);
   if (!sys_and_cap)
     return 0;
@@ -153,19 +307,67 @@ TRACEPOINT_PROBE(raw_syscalls, sys_enter) {
     //                return 0;
     sys_and_cap->sys[quot] |= 1 << (args->id % 32);
     event.update(&ns, sys_and_cap);
+#ifdef BEACON_EPOCH
+    struct epoch_t *epoch = get_epoch(&ns);
+    if (epoch)
+      epoch->sys[quot] |= 1 << (args->id % 32);
+#endif
+#ifdef BEACON_ATTRIB
+    struct attrib_t *attrib = get_attrib(&ns);
+    if (attrib)
+      attrib->sys[quot] |= 1 << (args->id % 32);
+#endif
+#ifdef BEACON_COUNT
+    struct sys_count_key_t count_key;
+    __builtin_memset(&count_key, 0, sizeof(count_key)); // Padding is hashed (cgroup key)
+    count_key.ns = ns;
+    count_key.nr = args->id;
+    u64 zero = 0;
+    u64 *count = sys_count.lookup_or_try_init(&count_key, &zero);
+    if (count)
+      (*count)++;
+#endif
+#ifdef BEACON_ARGS
+    u32 nr = args->id;
+    u32 *mask = arg_mask.lookup(&nr);
+    if (mask && *mask) {
+      struct arg_key_t arg_key;
+      __builtin_memset(&arg_key, 0, sizeof(arg_key)); // Padding is part of the hashed key
+      arg_key.ns = ns;
+      arg_key.nr = nr;
+      arg_key.mask = *mask;
+#pragma unroll
+      for (int i = 0; i < 6; i++) {
+        if (*mask & (1 << i))
+          arg_key.args[i] = args->args[i];
+      }
+      u8 one = 1;
+      int ret = sys_args.insert(&arg_key, &one); // BPF_NOEXIST: known tuples are left as is
+      if (ret < 0 && ret != -EEXIST) {
+        u32 zero_idx = 0;
+        u64 *drops = arg_drops.lookup(&zero_idx);
+        if (drops)
+          (*drops)++;
+      }
+    }
+#endif
   }
   return 0;
 }
 
 int kprobe__cap_capable(struct pt_regs *ctx, const struct cred *cred,
                         struct user_namespace *targ_ns, int cap, int cap_opt) {
-  struct namespace_t ns = get_ns();
+  beacon_key_t ns = get_key();
   struct sys_and_cap_t *sys_and_cap = event.lookup(&ns);
   if (!sys_and_cap)
     return 0;
 
   if (cap < 0 || cap >= 64)
     return 0;
+#ifdef BEACON_DENY
+  u64 tid = bpf_get_current_pid_tgid();
+  cap_checks.update(&tid, &cap);
+#endif
 
   u32 bit;
   u32 idx;
@@ -180,5 +382,43 @@ int kprobe__cap_capable(struct pt_regs *ctx, const struct cred *cred,
 
   sys_and_cap->cap[idx] |= bit;
   event.update(&ns, sys_and_cap);
+#ifdef BEACON_EPOCH
+  struct epoch_t *epoch = get_epoch(&ns);
+  if (epoch)
+    epoch->cap[idx] |= bit;
+#endif
+#ifdef BEACON_ATTRIB
+  struct attrib_t *attrib = get_attrib(&ns);
+  if (attrib)
+    attrib->cap[idx] |= bit;
+#endif
+  return 0;
+}
+
+#ifdef BEACON_DENY
+TRACEPOINT_PROBE(raw_syscalls, sys_exit) {
+  long ret = args->ret;
+  if (ret != -EPERM && ret != -EACCES && ret != -ENOSYS)
+    return 0;
+  beacon_key_t ns = get_key();
+  if (!event.lookup(&ns))
+    return 0; // Not a container
+  count_denial(&ns, args->id, 0, -ret);
+  return 0;
+}
+
+int kretprobe__cap_capable(struct pt_regs *ctx) {
+  u64 tid = bpf_get_current_pid_tgid();
+  int *cap = cap_checks.lookup(&tid);
+  if (!cap)
+    return 0;
+  u32 nr = *cap;
+  cap_checks.delete(&tid);
+  int ret = PT_REGS_RC(ctx);
+  if (ret == 0)
+    return 0;
+  beacon_key_t ns = get_key();
+  count_denial(&ns, nr, 1, -ret);
   return 0;
 }
+#endif
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file structs.py
+@brief  ctypes mirrors of the keys and values of inst.c / inst.bpf.c
+@author Haney Kang
+
+@details
+BCC generates these types from inst.c itself. Other backends (core.libbpf, core.fake)
+use the definitions below, which must be kept in sync with the C structures. The
+container key (beacon_key_t) is struct namespace_t, or the u64 cgroup id when inst
+is built with -DBEACON_CGROUP_KEY.
+"""
+
+import ctypes as ct
+
+NS_FIELDS = ("cgroup", "user", "uts", "ipc", "mnt", "pid", "net")
+TASK_COMM_LEN = 16
+
+
+class Namespace(ct.Structure):
+    """struct namespace_t"""
+
+    _fields_ = [(name, ct.c_uint) for name in NS_FIELDS]
+
+
+class SysAndCap(ct.Structure):
+    """struct sys_and_cap_t"""
+
+    _fields_ = [
+        ("seccomp_flag", ct.c_bool),
+        ("padding", ct.c_bool * 7),
+        ("sys", ct.c_uint * 24),
+        ("cap", ct.c_uint * 2),
+    ]
+
+
+class Attrib(ct.Structure):
+    """struct attrib_t"""
+
+    _fields_ = [("sys", ct.c_uint * 24), ("cap", ct.c_uint * 2)]
+
+
+class Epoch(ct.Structure):
+    """struct epoch_t"""
+
+    _fields_ = [("sys", ct.c_uint * 24), ("cap", ct.c_uint * 2)]
+
+
+def _layouts(key_type):
+    """Keys and values of every map, with `key_type` as the container key (beacon_key_t)."""
+
+    class SysCountKey(ct.Structure):
+        """struct sys_count_key_t"""
+
+        _fields_ = [("ns", key_type), ("nr", ct.c_uint)]
+
+    class ArgKey(ct.Structure):
+        """struct arg_key_t"""
+
+        _fields_ = [
+            ("ns", key_type),
+            ("nr", ct.c_uint),
+            ("mask", ct.c_uint),
+            ("padding", ct.c_uint),
+            ("args", ct.c_ulonglong * 6),
+        ]
+
+    class AttribKey(ct.Structure):
+        """struct attrib_key_t"""
+
+        _fields_ = [("ns", key_type), ("comm", ct.c_char * TASK_COMM_LEN)]
+
+    class DenyKey(ct.Structure):
+        """struct deny_key_t"""
+
+        _fields_ = [
+            ("ns", key_type),
+            ("nr", ct.c_uint),
+            ("cap", ct.c_ushort),
+            ("err", ct.c_ushort),
+        ]
+
+    ## {map name: (key type, value type, max entries, per-CPU)}
+    return {
+        "event": (key_type, SysAndCap, 16384, True),
+        "sys_count": (SysCountKey, ct.c_ulonglong, 65536, True),
+        "arg_mask": (ct.c_uint, ct.c_uint, 768, False),
+        "sys_args": (ArgKey, ct.c_ubyte, 65536, False),
+        "arg_drops": (ct.c_uint, ct.c_ulonglong, 1, True),
+        "sys_attrib": (AttribKey, Attrib, 16384, True),
+        "attrib_drops": (ct.c_uint, ct.c_ulonglong, 1, True),
+        "denials": (DenyKey, ct.c_ulonglong, 16384, True),
+        "epoch_a": (key_type, Epoch, 16384, True),
+        "epoch_b": (key_type, Epoch, 16384, True),
+        "epoch_idx": (ct.c_uint, ct.c_uint, 1, False),
+    }
+
+
+TABLES = _layouts(Namespace)  # Default: keyed by struct namespace_t
+CGROUP_TABLES = _layouts(
+    ct.c_ulonglong
+)  # -DBEACON_CGROUP_KEY: keyed by the u64 cgroup id
+
+SysCountKey = TABLES["sys_count"][0]
+ArgKey = TABLES["sys_args"][0]
+AttribKey = TABLES["sys_attrib"][0]
+
+
+def tables(cgroup_key: bool = False):
+    """
+    @return {map name: (key type, value type, max entries, per-CPU)} of a keying mode.
+    """
+    return CGROUP_TABLES if cgroup_key else TABLES
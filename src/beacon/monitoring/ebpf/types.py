@@ -1,14 +1,17 @@
 #!/usr/bin/python3
-# Last Modified at Nov, 23, 2025
+# Last Modified at Oct 19, 2026
 
 """@file types.py
 @brief  Define types and casting for eBPF c programs
 @author Haney Kang
 """
-from typing import Dict
+
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from typing import NamedTuple
 
+from core.profile import Profile
+
 
 class Namespace_t(NamedTuple):
     cgroup: int
@@ -20,34 +23,45 @@ class Namespace_t(NamedTuple):
     net: int
 
 
+## Captured arguments of one call: ((argument index, value), ...) in index order
+ArgTuple = Tuple[Tuple[int, int], ...]
+
+
 class Event_t:
     """@class Event_t
     @brief      Type defined class which contains event identifiers
                 from monitoring.
     """
 
-    def __init__(self, event):
+    def __init__(
+        self,
+        event,
+        histogram: Optional[Dict[int, int]] = None,
+        arguments: Optional[Dict[int, Set[ArgTuple]]] = None,
+        binaries: Optional[Dict[str, Profile]] = None,
+        denials: Optional[Dict[str, Dict[int, Dict[int, int]]]] = None,
+    ):
         """
         Set the value in Event_t class.
 
-        @param      event       Event data given from monitoring.
-        """
-        self.syslist = self.bit2idx(event.sys, 32)
-        self.caplist = self.bit2idx(event.cap, 32)
-
-    def bit2idx(self, bit_arr, bit_size):
+        @param      event       Event data given from monitoring (Profile, or a value
+                                shaped like struct sys_and_cap_t).
+        @param      histogram   {syscall number: count} (counting mode only).
+        @param      arguments   {syscall number: argument tuples} (argument mode only).
+        @param      binaries    {comm: Profile} (attribution mode only).
+        @param      denials     {"syscalls"|"capabilities": {number: {errno: count}}}
+                                (denial mode only).
         """
-        Convert bitmap to index list.
-
-        @param      bit_arr     Bit array for converting.
-        @param      bit_size    A unit size of bit array.
-        @return     idx_list    An index list of corresponding bitmap.
-        """
-        return list(
-            filter(
-                lambda bit_idx: bit_arr[(bit_idx // bit_size)] & 1 << bit_idx % 32,
-                range(bit_size * len(bit_arr)),
-            )
+        self.profile = (
+            event if isinstance(event, Profile) else Profile.from_struct(event)
+        )
+        self.sysfreq = histogram if histogram is not None else {}
+        self.sysargs = arguments if arguments is not None else {}
+        self.args_complete = True  # False if the argument set overflowed
+        self.per_binary = binaries if binaries is not None else {}
+        self.binaries_complete = True  # False if the attribution map overflowed
+        self.sysdenials = (
+            denials if denials is not None else {"syscalls": {}, "capabilities": {}}
         )
 
     def syscalls(self):
@@ -56,7 +70,7 @@ class Event_t:
 
         @return     idx_list    An index list of system call events.
         """
-        return self.syslist
+        return self.profile.syscalls()
 
     def capabilities(self):
         """
@@ -64,17 +78,202 @@ class Event_t:
 
         @return     idx_list    An index list of capabilities events.
         """
-        return self.caplist
+        return self.profile.capabilities()
+
+    def histogram(self):
+        """
+        Return number of calls of each system call.
+        Empty unless monitoring runs in counting mode (-DBEACON_COUNT).
+
+        @return     histogram   A dictionary of {syscall number: count}.
+        """
+        return self.sysfreq
+
+    def arguments(self):
+        """
+        Return distinct captured argument tuples of each system call.
+        Empty unless monitoring runs in argument mode (-DBEACON_ARGS), and
+        incomplete if args_complete is False.
+
+        @return     arguments   A dictionary of {syscall number: {((index, value), ...), ...}}.
+        """
+        return self.sysargs
+
+    def binaries(self):
+        """
+        Return the system calls and capabilities used by each executable (task comm).
+        Empty unless monitoring runs in attribution mode (-DBEACON_ATTRIB).
+
+        @return     binaries    A dictionary of {comm: {"syscalls": [...], "capabilities": [...]}}.
+        """
+        return {
+            comm: profile.to_json() for comm, profile in sorted(self.per_binary.items())
+        }
+
+    def denials(self):
+        """
+        Return the failed system calls and capability checks, with their errno.
+        Empty unless monitoring runs in denial mode (-DBEACON_DENY).
+
+        @return     denials     {"syscalls": {nr: {errno: count}}, "capabilities": {cap: {errno: count}}}
+        """
+        return self.sysdenials
+
+
+class Timeline:
+    """@class Timeline
+    @brief      Compact time series of one container: only newly observed
+                syscalls and capabilities are stored, with their timestamp.
+    """
+
+    def __init__(self):
+        self.profile = Profile()  # Cumulative profile
+        self.points: List[Tuple[float, Profile]] = []
+
+    def update(self, timestamp: float, profile: Profile) -> bool:
+        """
+        Add a snapshot, keeping only its difference with the previous one.
+
+        @param      timestamp   Seconds since the start of monitoring.
+        @param      profile     Cumulative profile at `timestamp`.
+        @return     bool        True if anything new has been observed.
+        """
+        new = profile - self.profile
+        if not new:
+            return False
+        self.profile |= new
+        self.points.append((timestamp, new))
+        return True
+
+    def syscalls(self):
+        return self.profile.syscalls()
+
+    def capabilities(self):
+        return self.profile.capabilities()
+
+    def to_json(self):
+        """
+        @return     [{"t": seconds, "sys": [new syscalls], "cap": [new capabilities]}, ...]
+        """
+        return [
+            {"t": round(t, 3), "sys": new.syscalls(), "cap": new.capabilities()}
+            for t, new in self.points
+        ]
+
+
+def read_key(data, key) -> Optional[Profile]:
+    """
+    Look up one key (instead of decoding the whole map) and OR its per-CPU bitmaps.
+
+    @param      data        Raw `event` table from eBPF
+    @param      key         Key of the table (e.g., data.Key(**namespace))
+    @return     Profile, None if the key is absent.
+    """
+    try:
+        per_cpu_events = data[key]
+    except KeyError:
+        return None
+    return Profile.from_struct(*per_cpu_events)
+
+
+def container_key(bcc_ns) -> Union[Namespace_t, int]:
+    """
+    Convert a raw container key: Namespace_t, or the cgroup id (-DBEACON_CGROUP_KEY).
+
+    @param      bcc_ns      struct namespace_t, or u64 (ctypes or int)
+    """
+    if not hasattr(bcc_ns, "_fields_"):
+        return int(getattr(bcc_ns, "value", bcc_ns))
+    return Namespace_t(**{name: getattr(bcc_ns, name) for name, _ in bcc_ns._fields_})
+
+
+def raw_key(table, key: Union[Namespace_t, int]):
+    """
+    Build the key of `table` for a container key (inverse of container_key()).
+    """
+    return table.Key(key) if isinstance(key, int) else table.Key(*key)
+
+
+def cast_counts(counts) -> Dict[Namespace_t, Dict[int, int]]:
+    """
+    Sum per-CPU counters of `sys_count` and return {bcc_ns: {syscall number: count}}.
+
+    @param      counts      Raw `sys_count` table from eBPF
+    """
+    result: Dict[Namespace_t, Dict[int, int]] = {}
+    for key, per_cpu_counts in counts.items():
+        hist = result.setdefault(container_key(key.ns), {})
+        hist[key.nr] = hist.get(key.nr, 0) + sum(per_cpu_counts)
+    return result
+
+
+def cast_args(sys_args) -> Dict[Namespace_t, Dict[int, Set[ArgTuple]]]:
+    """
+    Group the keys of `sys_args` and return {bcc_ns: {syscall number: argument tuples}}.
+
+    @param      sys_args    Raw `sys_args` table from eBPF
+    """
+    result: Dict[Namespace_t, Dict[int, Set[ArgTuple]]] = {}
+    for key, _ in sys_args.items():
+        values = tuple((i, key.args[i]) for i in range(6) if key.mask & (1 << i))
+        result.setdefault(container_key(key.ns), {}).setdefault(key.nr, set()).add(
+            values
+        )
+    return result
+
+
+def cast_attrib(sys_attrib) -> Dict[Namespace_t, Dict[str, Profile]]:
+    """
+    OR per-CPU values of `sys_attrib` and return {bcc_ns: {comm: Profile}}.
+
+    @param      sys_attrib  Raw `sys_attrib` table from eBPF
+    """
+    result: Dict[Namespace_t, Dict[str, Profile]] = {}
+    for key, per_cpu in sys_attrib.items():
+        comm = bytes(key.comm).split(b"\0", 1)[0].decode(errors="replace")
+        result.setdefault(container_key(key.ns), {})[comm] = Profile.from_struct(
+            *per_cpu
+        )
+    return result
+
+
+def cast_denials(denials) -> Dict[Namespace_t, Dict[str, Dict[int, Dict[int, int]]]]:
+    """
+    Sum per-CPU counters of `denials` and return
+    {bcc_ns: {"syscalls": {nr: {errno: count}}, "capabilities": {cap: {errno: count}}}}.
+
+    @param      denials     Raw `denials` table from eBPF
+    """
+    result: Dict[Namespace_t, Dict[str, Dict[int, Dict[int, int]]]] = {}
+    for key, per_cpu_counts in denials.items():
+        entry = result.setdefault(
+            container_key(key.ns), {"syscalls": {}, "capabilities": {}}
+        )
+        errnos = entry["capabilities" if key.cap else "syscalls"].setdefault(key.nr, {})
+        errnos[key.err] = errnos.get(key.err, 0) + sum(per_cpu_counts)
+    return result
 
 
-def cast_data(data) -> Dict[Namespace_t, Event_t]:
+def cast_data(
+    data, counts=None, sys_args=None, sys_attrib=None, denials=None
+) -> Dict[Namespace_t, Event_t]:
     """
-    Merge per-CPU values for each namespace key and return {bcc_ns: Event_t}.
+    Merge per-CPU values for each container key and return {bcc_ns: Event_t}.
+    Keys are Namespace_t, or cgroup ids if inst is built with -DBEACON_CGROUP_KEY.
     Assumes value layout matches struct sys_and_cap_t (sys[24], cap[2], seccomp_flag).
+    Per-CPU values are OR-ed as integer bitsets (core.profile).
 
     @param      data        Raw data from eBPF
+    @param      counts      Raw `sys_count` table from eBPF (counting mode only)
+    @param      sys_args    Raw `sys_args` table from eBPF (argument mode only)
+    @param      sys_attrib  Raw `sys_attrib` table from eBPF (attribution mode only)
+    @param      denials     Raw `denials` table from eBPF (denial mode only)
     """
     result = {}
+    histograms = cast_counts(counts) if counts is not None else {}
+    arguments = cast_args(sys_args) if sys_args is not None else {}
+    binaries = cast_attrib(sys_attrib) if sys_attrib is not None else {}
+    failures = cast_denials(denials) if denials is not None else {}
 
     for (
         bcc_ns,
@@ -82,15 +281,12 @@ def cast_data(data) -> Dict[Namespace_t, Event_t]:
     ) in data.items():  # per_cpu_events: list[ctypes-struct] per CPU
         if not per_cpu_events:
             continue
-        agg = per_cpu_events[0]
-        for s in per_cpu_events[1:]:
-            agg.seccomp_flag = agg.seccomp_flag or s.seccomp_flag
-            for i in range(24):
-                agg.sys[i] |= s.sys[i]
-            for i in range(2):
-                agg.cap[i] |= s.cap[i]
-        ns_key = Namespace_t(
-            **{name: getattr(bcc_ns, name) for name, _ in bcc_ns._fields_}
+        ns_key = container_key(bcc_ns)
+        result[ns_key] = Event_t(
+            Profile.from_struct(*per_cpu_events),
+            histograms.get(ns_key),
+            arguments.get(ns_key),
+            binaries.get(ns_key),
+            failures.get(ns_key),
         )
-        result[ns_key] = Event_t(agg)
     return result
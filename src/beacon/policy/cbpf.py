@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file cbpf.py
+@brief  Generate raw seccomp cBPF filters with a cost-aware comparison layout.
+@author Haney Kang
+
+@details
+A seccomp filter runs on every syscall of the container, so its cost is the number
+of instructions executed per syscall. Three layouts of the allow list are provided:
+ - "linear"    : one JEQ per allowed syscall, in the given order (libseccomp default).
+ - "bsearch"   : JGE tree over the allowed/denied ranges of syscall numbers.
+ - "frequency" : hottest syscalls first (linear), then a frequency-weighted JGE tree.
+
+`run()` interprets a filter to count executed instructions without loading it.
+"""
+
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+## Opcodes (linux/filter.h, linux/bpf_common.h)
+BPF_LD_W_ABS = 0x20
+BPF_JMP_JA = 0x05
+BPF_JMP_JEQ_K = 0x15
+BPF_JMP_JGT_K = 0x25
+BPF_JMP_JGE_K = 0x35
+BPF_RET_K = 0x06
+
+## Seccomp (linux/seccomp.h, linux/audit.h)
+SECCOMP_RET_KILL_PROCESS = 0x80000000
+SECCOMP_RET_ERRNO = 0x00050000
+SECCOMP_RET_ALLOW = 0x7FFF0000
+AUDIT_ARCH_X86_64 = 0xC000003E
+X32_SYSCALL_BIT = 0x40000000
+SECCOMP_DATA_NR = 0
+SECCOMP_DATA_ARCH = 4
+
+MAX_JUMP = 255  # jt/jf are u8
+MAX_HOT = 16  # Upper bound of linear prefix in "frequency" layout
+
+LAYOUTS = ("linear", "bsearch", "frequency")
+
+
+class Insn(NamedTuple):
+    """struct sock_filter"""
+
+    code: int
+    jt: int
+    jf: int
+    k: int
+
+
+def _ret(verdict: int) -> Insn:
+    return Insn(BPF_RET_K, 0, 0, verdict)
+
+
+def _linear(nums: Iterable[int], allow: int) -> List[Insn]:
+    """JEQ chain: a miss costs one instruction, a hit returns right after the JEQ."""
+    prog = []
+    for num in nums:
+        prog.append(Insn(BPF_JMP_JEQ_K, 0, 1, num))
+        prog.append(_ret(allow))
+    return prog
+
+
+def _segments(allowed: Iterable[int], allow: int, deny: int) -> List[Tuple[int, int]]:
+    """
+    Split [0, 2^32) into ranges of identical verdict.
+
+    @return [(start, verdict), ...] sorted by start, beginning at 0.
+    """
+    segs = [(0, deny)]
+    for num in sorted(set(allowed)):
+        if segs[-1] == (num, deny):  # Contiguous with the previous allowed range
+            segs.pop()
+        if not segs or segs[-1][1] != allow:
+            segs.append((num, allow))
+        segs.append((num + 1, deny))
+    return segs
+
+
+def _tree(segs: List[Tuple[int, int]], weights: List[float]) -> List[Insn]:
+    """
+    JGE tree over verdict ranges. Each node splits where the weight of both halves is
+    the closest, so that frequent ranges are found with fewer comparisons.
+
+    @param segs     Ranges from _segments().
+    @param weights  Weight of each range (uniform weights give a balanced tree).
+    """
+    if len(segs) == 1:
+        return [_ret(segs[0][1])]
+
+    total = sum(weights)
+    acc = 0.0
+    pivot, best = 1, None
+    for m in range(1, len(segs)):
+        acc += weights[m - 1]
+        diff = abs(total - 2 * acc)
+        if best is None or diff < best:
+            pivot, best = m, diff
+
+    left = _tree(segs[:pivot], weights[:pivot])
+    right = _tree(segs[pivot:], weights[pivot:])
+    if len(left) <= MAX_JUMP:
+        return [Insn(BPF_JMP_JGE_K, len(left), 0, segs[pivot][0])] + left + right
+    # Left subtree is too long for a u8 offset, jump over it with a JA trampoline
+    return (
+        [Insn(BPF_JMP_JGE_K, 0, 1, segs[pivot][0]), Insn(BPF_JMP_JA, 0, 0, len(left))]
+        + left
+        + right
+    )
+
+
+def _weights(segs: List[Tuple[int, int]], freq: Dict[int, float]) -> List[float]:
+    """Sum of frequencies falling into each range (+1 so that unseen ranges stay balanced)."""
+    bounds = [start for start, _ in segs[1:]] + [1 << 32]
+    weights = [1.0] * len(segs)
+    for num, count in freq.items():
+        lo, hi = 0, len(segs) - 1
+        while lo < hi:  # Find the range containing num
+            mid = (lo + hi) // 2
+            if num < bounds[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        weights[lo] += count
+    return weights
+
+
+def _prologue(deny: int) -> List[Insn]:
+    """Kill foreign architectures, deny x32 syscalls, and load the syscall number."""
+    return [
+        Insn(BPF_LD_W_ABS, 0, 0, SECCOMP_DATA_ARCH),
+        Insn(BPF_JMP_JEQ_K, 1, 0, AUDIT_ARCH_X86_64),
+        _ret(SECCOMP_RET_KILL_PROCESS),
+        Insn(BPF_LD_W_ABS, 0, 0, SECCOMP_DATA_NR),
+        Insn(BPF_JMP_JGE_K, 0, 1, X32_SYSCALL_BIT),
+        _ret(deny),
+    ]
+
+
+def build_filter(
+    allowed: Iterable[int],
+    layout: str = "bsearch",
+    freq: Optional[Dict[int, float]] = None,
+    errno: int = 1,
+) -> List[Insn]:
+    """
+    @brief Build a seccomp filter allowing `allowed` and returning `errno` otherwise.
+
+    @param  allowed Allowed syscall numbers (x86_64). For "linear" the order is kept.
+    @param  layout  One of LAYOUTS.
+    @param  freq    Observed {syscall number: count}, used by "frequency".
+    @param  errno   Errno of denied syscalls.
+    @return List of instructions (see assemble()).
+    """
+    allow = SECCOMP_RET_ALLOW
+    deny = SECCOMP_RET_ERRNO | (errno & 0xFFFF)
+    allowed = list(dict.fromkeys(allowed))
+    prog = _prologue(deny)
+
+    if layout == "linear":
+        return prog + _linear(allowed, allow) + [_ret(deny)]
+
+    segs = _segments(allowed, allow, deny)
+    if layout == "bsearch":
+        return prog + _tree(segs, [1.0] * len(segs))
+    if layout != "frequency":
+        raise ValueError(f"Unknown layout: {layout}")
+
+    allowed_set = set(allowed)
+    freq = {num: count for num, count in (freq or {}).items() if num in allowed_set}
+    hot = sorted(freq, key=lambda num: -freq[num])[:MAX_HOT]
+    # Try every length of the linear prefix and keep the cheapest filter
+    best_prog, best_cost = None, None
+    for n in range(len(hot) + 1):
+        rest = {num: count for num, count in freq.items() if num not in hot[:n]}
+        candidate = prog + _linear(hot[:n], allow) + _tree(segs, _weights(segs, rest))
+        cost = expected_cost(candidate, freq)
+        if best_cost is None or cost < best_cost:
+            best_prog, best_cost = candidate, cost
+    return best_prog
+
+
+def filter_from_event(ev, layout: str = "frequency", errno: int = 1) -> List[Insn]:
+    """
+    @brief Build a filter from a monitoring snapshot, using its histogram when available.
+
+    @param  ev      Event_t (syscalls() and histogram()), or a core.profile.Profile.
+    @param  layout  One of LAYOUTS.
+    @param  errno   Errno of denied syscalls.
+    """
+    histogram = ev.histogram() if hasattr(ev, "histogram") else None
+    return build_filter(ev.syscalls(), layout, histogram, errno)
+
+
+def assemble(prog: List[Insn]) -> bytes:
+    """
+    @brief Encode instructions as an array of `struct sock_filter` (for SECCOMP_SET_MODE_FILTER).
+    """
+    return b"".join(struct.pack("<HBBI", *insn) for insn in prog)
+
+
+def run(prog: List[Insn], nr: int, arch: int = AUDIT_ARCH_X86_64) -> Tuple[int, int]:
+    """
+    @brief Interpret the filter for one syscall.
+
+    @param  prog    Filter from build_filter().
+    @param  nr      Syscall number.
+    @param  arch    AUDIT_ARCH_* of the syscall.
+    @return (verdict, number of executed instructions)
+    """
+    data = {SECCOMP_DATA_NR: nr, SECCOMP_DATA_ARCH: arch}
+    acc, pc, steps = 0, 0, 0
+    while True:
+        code, jt, jf, k = prog[pc]
+        steps += 1
+        if code == BPF_RET_K:
+            return k, steps
+        if code == BPF_LD_W_ABS:
+            acc = data[k]
+            pc += 1
+        elif code == BPF_JMP_JA:
+            pc += 1 + k
+        elif code == BPF_JMP_JEQ_K:
+            pc += 1 + (jt if acc == k else jf)
+        elif code == BPF_JMP_JGT_K:
+            pc += 1 + (jt if acc > k else jf)
+        elif code == BPF_JMP_JGE_K:
+            pc += 1 + (jt if acc >= k else jf)
+        else:
+            raise ValueError(f"Unsupported opcode {code:#x}")
+
+
+def expected_cost(prog: List[Insn], freq: Dict[int, float]) -> float:
+    """
+    @brief Mean number of executed instructions per syscall under a syscall distribution.
+
+    @param  prog    Filter from build_filter().
+    @param  freq    {syscall number: count}
+    @return float   Weighted mean of instructions per syscall (0 for an empty distribution).
+    """
+    total = sum(freq.values())
+    if not total:
+        return 0.0
+    return sum(count * run(prog, num)[1] for num, count in freq.items()) / total
+
+
+if __name__ == "__main__":
+    print("== Testing cBPF layouts ==")
+    allowed = [0, 1, 2, 3, 9, 10, 11, 12, 60, 202, 231, 232, 257, 435]
+    freq = {0: 5000, 1: 4000, 232: 3000, 202: 800, 9: 20, 435: 1}
+    for layout in LAYOUTS:
+        prog = build_filter(allowed, layout, freq)
+        for num in range(500):
+            verdict, _ = run(prog, num)
+            assert (verdict == SECCOMP_RET_ALLOW) == (
+                num in allowed
+            ), f"{layout}: {num}"
+        assert run(prog, 0, arch=0)[0] == SECCOMP_RET_KILL_PROCESS
+        assert run(prog, X32_SYSCALL_BIT | 1)[0] != SECCOMP_RET_ALLOW
+        assert len(assemble(prog)) == 8 * len(prog)
+        print(
+            f"✅ {layout}: {len(prog)} insns, {expected_cost(prog, freq):.2f} insns/syscall"
+        )
+
+    # Long left subtrees need JA trampolines
+    prog = build_filter(range(0, 1000, 2), "bsearch")
+    for num in range(1100):
+        allowed = num % 2 == 0 and num < 1000
+        assert (run(prog, num)[0] == SECCOMP_RET_ALLOW) == allowed, f"bsearch: {num}"
+    print("== Test passed ==")
@@ -0,0 +1,222 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file seccomp.py
+@brief  Generate Docker/OCI seccomp profiles and capability lists from monitoring results.
+@author Haney Kang
+
+@details
+The observed syscalls become an allow list (everything else returns EPERM), and the
+observed capabilities are compared with Docker's default capability set to obtain
+`cap_add`/`cap_drop` lists. Syscalls whose arguments have been captured (argument
+mode) are allowed only with the observed argument values.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from core.profile import Profile
+from event_registry import get_registry
+
+EPERM = 1
+MAX_ARG_RULES = (
+    64  # A syscall with more distinct argument tuples is allowed unconditionally
+)
+
+## Capabilities granted by Docker when no --cap-add/--cap-drop is given.
+DOCKER_DEFAULT_CAPS = [
+    "CAP_CHOWN",
+    "CAP_DAC_OVERRIDE",
+    "CAP_FSETID",
+    "CAP_FOWNER",
+    "CAP_MKNOD",
+    "CAP_NET_RAW",
+    "CAP_SETGID",
+    "CAP_SETUID",
+    "CAP_SETFCAP",
+    "CAP_SETPCAP",
+    "CAP_NET_BIND_SERVICE",
+    "CAP_SYS_CHROOT",
+    "CAP_KILL",
+    "CAP_AUDIT_WRITE",
+]
+
+
+def syscall_names(nums: Iterable[int]) -> List[str]:
+    """
+    @brief Convert syscall numbers (x86_64) into names, ignoring unknown numbers.
+
+    @param  nums    Syscall numbers.
+    @return List of names ordered by number.
+    """
+    registry = get_registry("x86_64")
+    names = []
+    for num in sorted(set(nums)):
+        name = registry.syscall_name(num)
+        if name:
+            names.append(name)
+        else:
+            logging.warning(
+                f"[policy.seccomp] Unknown syscall number {num} is skipped."
+            )
+    return names
+
+
+def argument_rules(
+    name: str, tuples: Iterable[Tuple[Tuple[int, int], ...]]
+) -> List[Dict[str, Any]]:
+    """
+    @brief One allow rule per observed argument tuple (rules of a syscall are OR-ed by seccomp).
+
+    @param  name    Syscall name.
+    @param  tuples  Argument tuples ((index, value), ...) from Event_t.arguments().
+    """
+    return [
+        {
+            "names": [name],
+            "action": "SCMP_ACT_ALLOW",
+            "args": [
+                {"index": index, "value": value, "valueTwo": 0, "op": "SCMP_CMP_EQ"}
+                for index, value in values
+            ],
+        }
+        for values in sorted(tuples)
+    ]
+
+
+def seccomp_profile(
+    sys_nums: Union[Iterable[int], Profile],
+    fmt: str = "docker",
+    errno: int = EPERM,
+    args: Optional[Dict[int, Set[Tuple[Tuple[int, int], ...]]]] = None,
+) -> Dict[str, Any]:
+    """
+    @brief Build a seccomp profile allowing only the given syscalls.
+
+    @param  sys_nums    Observed syscall numbers, or a Profile.
+    @param  fmt         "docker" (`--security-opt seccomp=<file>`) or "oci" (`linux.seccomp` of config.json).
+    @param  errno       Errno returned for the other syscalls.
+    @param  args        Observed argument tuples of some syscalls (Event_t.arguments()).
+                        Those syscalls are allowed with these arguments only.
+    @return Profile as a JSON-serializable dictionary.
+    """
+    profile: Dict[str, Any] = {
+        "defaultAction": "SCMP_ACT_ERRNO",
+        "defaultErrnoRet": errno,
+    }
+    if fmt == "docker":
+        profile["archMap"] = [
+            {"architecture": "SCMP_ARCH_X86_64", "subArchitectures": []}
+        ]
+    elif fmt == "oci":
+        profile["architectures"] = ["SCMP_ARCH_X86_64"]
+    else:
+        raise ValueError(f"Unknown seccomp profile format: {fmt}")
+
+    sys_nums = set(
+        sys_nums.iter_syscalls() if isinstance(sys_nums, Profile) else sys_nums
+    )
+    conditional = {
+        nr: tuples
+        for nr, tuples in (args or {}).items()
+        if nr in sys_nums and 0 < len(tuples) <= MAX_ARG_RULES and all(tuples)
+    }
+    profile["syscalls"] = [
+        {
+            "names": syscall_names(sys_nums - set(conditional)),
+            "action": "SCMP_ACT_ALLOW",
+        }
+    ]
+    registry = get_registry("x86_64")
+    for nr in sorted(conditional):
+        name = registry.syscall_name(nr)
+        if name:
+            profile["syscalls"] += argument_rules(name, conditional[nr])
+    return profile
+
+
+def capability_policy(cap_nums: Iterable[int]) -> Dict[str, List[str]]:
+    """
+    @brief Derive capability changes against Docker's default set.
+
+    @param  cap_nums    Observed capability numbers.
+    @return {"cap_add": [...], "cap_drop": [...]}
+    """
+    observed = get_registry("x86_64").numbers_to_names(sorted(set(cap_nums)), "cap")
+    return {
+        "cap_add": [cap for cap in observed if cap not in DOCKER_DEFAULT_CAPS],
+        "cap_drop": [cap for cap in DOCKER_DEFAULT_CAPS if cap not in observed],
+    }
+
+
+def allowed_syscalls(profile: Dict[str, Any]) -> Set[int]:
+    """
+    @brief Syscall numbers allowed by a seccomp profile (inverse of seccomp_profile()).
+
+    @param  profile Docker or OCI seccomp profile. Syscalls allowed with some arguments
+                    only are included.
+    @return Allowed syscall numbers (x86_64), every known one if the default action allows.
+    """
+    registry = get_registry("x86_64")
+    if profile.get("defaultAction") == "SCMP_ACT_ALLOW":
+        return set(registry.syscalls())
+    allowed: Set[int] = set()
+    for rule in profile.get("syscalls", []):
+        if rule.get("action") == "SCMP_ACT_ALLOW":
+            allowed.update(registry.names_to_numbers(rule.get("names", [])))
+    return allowed
+
+
+def granted_capabilities(
+    cap_add: Iterable[str] = (), cap_drop: Iterable[str] = ()
+) -> Set[int]:
+    """
+    @brief Capability numbers of a container started with --cap-add/--cap-drop.
+
+    @param  cap_add     Added capabilities ("ALL" adds every capability, "CAP_" prefix optional).
+    @param  cap_drop    Dropped capabilities ("ALL" drops the default set).
+    """
+    registry = get_registry("x86_64")
+    cap_add, cap_drop = (
+        {
+            cap if cap.startswith("CAP_") or cap == "ALL" else f"CAP_{cap}"
+            for cap in caps
+        }
+        for caps in (cap_add, cap_drop)
+    )
+    granted = set() if "ALL" in cap_drop else set(DOCKER_DEFAULT_CAPS) - cap_drop
+    granted |= set(registry.capabilities().values()) if "ALL" in cap_add else cap_add
+    return set(registry.names_to_numbers(sorted(granted), "cap"))
+
+
+def policy_from_event(ev, fmt: str = "docker", errno: int = EPERM) -> Dict[str, Any]:
+    """
+    @brief Build the complete container policy from a monitoring snapshot.
+
+    @param  ev      Event_t, core.profile.Profile, or any object providing
+                    syscalls()/capabilities(). Captured arguments (Event_t) are used
+                    unless the argument set overflowed.
+    @param  fmt     Seccomp profile format, see seccomp_profile().
+    @param  errno   Errno returned for denied syscalls.
+    @return {"seccomp": {...}, "cap_add": [...], "cap_drop": [...]}
+    """
+    args = None
+    if getattr(ev, "args_complete", False):
+        args = ev.arguments()
+    policy = {"seccomp": seccomp_profile(ev.syscalls(), fmt, errno, args)}
+    policy.update(capability_policy(ev.capabilities()))
+    return policy
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <result/image.json> [docker|oci]")
+        exit(1)
+
+    with open(sys.argv[1]) as f:
+        observed = json.load(f)  # List of syscall numbers
+    fmt = sys.argv[2] if len(sys.argv) > 2 else "docker"
+    print(json.dumps(seccomp_profile(observed, fmt), indent=4))
@@ -0,0 +1,392 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file validate.py
+@brief  Check generated policies at runtime: relaunch each image confined by its policy.
+@author Haney Kang
+
+@details
+A syscall missed during profiling is absent from the allow list, so the confined
+service gets the errno of the seccomp filter where it used to succeed. Each image of
+a spec is started again with its policy (`--security-opt seccomp=...`, `--cap-add`,
+`--cap-drop`), initialized and driven by its workloads as during profiling, while inst
+runs in denial mode (-DBEACON_DENY): the sys_exit tracepoint counts calls failing with
+EPERM/EACCES/ENOSYS and a cap_capable return probe counts failed capability checks.
+
+Only failures the policy explains are reported: a syscall outside the allow list
+failing with the errno of the profile, or a check of a capability the container was
+not granted. EPERM returned by the service itself for an allowed syscall is ignored.
+
+All images are validated concurrently under one eBPF session, and each report is
+written to `<result_dir>/<image>.validation.json`. merge() feeds the missing syscalls
+back into `<result_dir>/<image>.json`, so that the next policy includes them.
+"""
+
+import os
+import json
+import logging
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional, Sequence
+
+from core.container import result_name
+from core.governor import Governor, Slot
+from core.profile import Profile
+from emulating.init import Peers
+from emulating.runner import run_container
+from emulating.spec import ContainerEntry, InitSpec, ProfileSpec, Workload
+from event_registry import get_registry
+from monitoring.agent import MonitoringSession
+from policy.seccomp import (
+    EPERM,
+    allowed_syscalls,
+    capability_policy,
+    granted_capabilities,
+    seccomp_profile,
+)
+
+
+def policy_kwargs(kwargs: Dict[str, Any], policy: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    @brief Create kwargs of a container confined by a policy (policy_from_event() output).
+
+    @param  kwargs  Create kwargs of the image (left untouched).
+    @param  policy  {"seccomp": {...}, "cap_add": [...], "cap_drop": [...]}, capability
+                    lists optional.
+    """
+    host_config = dict(kwargs.get("host_config") or {})
+    if "seccomp" in policy:
+        opts = [
+            opt
+            for opt in host_config.get("SecurityOpt") or []
+            if not opt.startswith("seccomp=")
+        ]
+        host_config["SecurityOpt"] = opts + ["seccomp=" + json.dumps(policy["seccomp"])]
+    if "cap_add" in policy:
+        host_config["CapAdd"] = list(policy["cap_add"])
+    if "cap_drop" in policy:
+        host_config["CapDrop"] = list(policy["cap_drop"])
+    return {**kwargs, "host_config": host_config}
+
+
+def load_policy(path: str) -> Optional[Dict[str, Any]]:
+    """
+    @brief Policy of a profiling result (`result/<image>.json`).
+
+    A plain list of syscall numbers gives a seccomp profile only. Capabilities are
+    confined only if the result records them.
+
+    @return Policy, or None if the result is missing.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        obj = json.load(f)
+    profile = Profile.from_json(obj)
+    policy: Dict[str, Any] = {"seccomp": seccomp_profile(profile)}
+    if isinstance(obj, dict) and "capabilities" in obj:
+        policy.update(capability_policy(profile.capabilities()))
+    return policy
+
+
+class Report:
+    """
+    @class Report
+    @brief Denials of one image run under its policy.
+    """
+
+    def __init__(
+        self,
+        image: str,
+        policy: Dict[str, Any],
+        denials: Optional[Dict[str, Dict]] = None,
+        error=None,
+    ):
+        """
+        @param image    Image reference.
+        @param policy   Applied policy.
+        @param denials  Event_t.denials() of the confined run, None if the run failed.
+        @param error    Reason of a failed run.
+        """
+        self.image = image
+        self.error = error
+        self.denied_syscalls: Dict[int, int] = {}  # {syscall number: failed calls}
+        self.denied_caps: Dict[int, int] = {}  # {capability number: failed checks}
+        if denials is None:
+            return
+        if "seccomp" in policy:
+            allowed = allowed_syscalls(policy["seccomp"])
+            err = policy["seccomp"].get("defaultErrnoRet", EPERM)
+            for nr, errnos in denials.get("syscalls", {}).items():
+                if nr not in allowed and errnos.get(err):
+                    self.denied_syscalls[nr] = errnos[err]
+        if "cap_add" in policy or "cap_drop" in policy:
+            granted = granted_capabilities(
+                policy.get("cap_add", []), policy.get("cap_drop", [])
+            )
+            for cap, errnos in denials.get("capabilities", {}).items():
+                if cap not in granted:
+                    self.denied_caps[cap] = sum(errnos.values())
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None and not self.denied_syscalls and not self.denied_caps
+
+    def missing(self) -> Profile:
+        """
+        @return Syscalls and capabilities the policy should have allowed.
+        """
+        return Profile.from_lists(self.denied_syscalls, self.denied_caps)
+
+    def to_json(self) -> Dict[str, Any]:
+        registry = get_registry("x86_64")
+        return {
+            "image": self.image,
+            "passed": self.passed,
+            "error": self.error,
+            "syscalls": {
+                registry.syscall_name(nr) or str(nr): count
+                for nr, count in sorted(self.denied_syscalls.items())
+            },
+            "capabilities": {
+                registry.cap_name(cap) or str(cap): count
+                for cap, count in sorted(self.denied_caps.items())
+            },
+            "missing": self.missing().to_json(),
+        }
+
+
+def validate(
+    session: MonitoringSession,
+    ref: str,
+    kwargs: Dict[str, Any],
+    policy: Dict[str, Any],
+    workloads: Sequence[Workload] = (),
+    duration: float = 60,
+    init: Optional[InitSpec] = None,
+    peers: Optional[Peers] = None,
+    slot: Optional[Slot] = None,
+) -> Report:
+    """
+    @brief Run one image confined by its policy and report the denials.
+
+    @param  session     Session loaded with deny=True, shared with other images.
+    @param  ref         Image reference.
+    @param  kwargs      Create kwargs of the image (policy_kwargs() is applied).
+    @param  policy      Policy to validate.
+    @param  workloads   Workloads of the image.
+    @param  duration    Run window in seconds, from readiness.
+    @param  init        Service initialization of the image.
+    @param  peers       Addresses of the images validated alongside.
+    @param  slot        Governor slot the container runs in.
+    """
+    if not session.deny:
+        raise ValueError("Validation needs a session loaded with deny=True")
+    try:
+        ev, _ = run_container(
+            session,
+            ref,
+            policy_kwargs(kwargs, policy),
+            workloads,
+            duration,
+            init=init,
+            peers=peers,
+            slot=slot,
+        )
+    except RuntimeError as e:
+        return Report(ref, policy, error=str(e))
+    if (
+        ev is None
+    ):  # Failing to start or to initialize under the policy is a finding too
+        return Report(
+            ref, policy, error="Container did not start or get ready under the policy"
+        )
+    return Report(ref, policy, ev.denials())
+
+
+class PolicyValidator:
+    """@class PolicyValidator
+    @brief Validates the policies of every image of a ProfileSpec concurrently.
+    """
+
+    def __init__(
+        self,
+        spec: ProfileSpec,
+        result_dir: str = "result",
+        workers: Optional[int] = None,
+        duration: Optional[float] = None,
+        session: Optional[MonitoringSession] = None,
+        governor: Optional[Governor] = None,
+    ):
+        """
+        @param spec         Spec the results have been profiled with.
+        @param result_dir   Directory of the results (policies are derived from them).
+        @param workers      Images validated at once (all of them if None).
+        @param duration     Run window of every image (its duration_sec if None).
+        @param session      Session loaded with deny=True. One is loaded (and released) if None.
+        @param governor     Started governor bounding the images run at once.
+        """
+        self.spec = spec
+        self.result_dir = result_dir
+        self.workers = workers
+        self.duration = duration
+        self.session = session
+        self.governor = governor
+
+    def run(self) -> Dict[str, Report]:
+        """
+        @brief Validate every image with a result and write its report.
+
+        @return {"image:tag": Report}
+        """
+        policies = {}
+        for entry in self.spec.containers:
+            policy = load_policy(
+                os.path.join(self.result_dir, f"{result_name(entry.ref)}.json")
+            )
+            if policy is None:
+                logging.warning(
+                    f"[policy.validate] No result for {entry.ref}, skipped."
+                )
+            else:
+                policies[entry.ref] = policy
+        entries = [entry for entry in self.spec.containers if entry.ref in policies]
+        if not entries:
+            return {}
+
+        session = self.session or MonitoringSession(deny=True)
+        peers = Peers(entry.ref for entry in entries)
+        reports: Dict[str, Report] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers or len(entries)) as pool:
+                futures = {
+                    pool.submit(
+                        self._validate_one, session, entry, policies[entry.ref], peers
+                    ): entry
+                    for entry in entries
+                }
+                for future in as_completed(futures):
+                    ref = futures[future].ref
+                    try:
+                        reports[ref] = future.result()
+                    except Exception as e:
+                        logging.error(f"[policy.validate] {ref} failed: {e}")
+                        reports[ref] = Report(ref, policies[ref], error=str(e))
+                    self._write(reports[ref])
+        finally:
+            if self.session is None:
+                session.cleanup()
+        return reports
+
+    def _validate_one(
+        self,
+        session: MonitoringSession,
+        entry: ContainerEntry,
+        policy: Dict[str, Any],
+        peers: Peers,
+    ) -> Report:
+        with (
+            self.governor.slot() if self.governor is not None else nullcontext()
+        ) as slot:
+            return validate(
+                session,
+                entry.ref,
+                entry.options.create_kwargs(),
+                policy,
+                entry.workloads,
+                self.duration if self.duration is not None else entry.duration_sec,
+                entry.init,
+                peers,
+                slot,
+            )
+
+    def _write(self, report: Report):
+        with open(
+            os.path.join(
+                self.result_dir, f"{result_name(report.image)}.validation.json"
+            ),
+            "w",
+        ) as f:
+            json.dump(report.to_json(), f, indent=4)
+        if report.passed:
+            logging.info(f"[policy.validate] {report.image}: no denial.")
+        else:
+            logging.warning(
+                f"[policy.validate] {report.image}: {len(report.denied_syscalls)} syscalls and "
+                f"{len(report.denied_caps)} capabilities denied{f' ({report.error})' if report.error else ''}."
+            )
+
+
+def merge(result_dir: str, report: Report) -> bool:
+    """
+    @brief Add the missing syscalls and capabilities of a report to the result of its image.
+
+    @return True if the result changed (the image should be validated again).
+    """
+    missing = report.missing()
+    if not missing:
+        return False
+    path = os.path.join(result_dir, f"{result_name(report.image)}.json")
+    with open(path) as f:
+        obj = json.load(f)
+    merged = Profile.from_json(obj) | missing
+    if isinstance(obj, list):
+        obj = merged.syscalls()
+    else:
+        obj.update(merged.to_json())
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=4)
+    logging.info(
+        f"[policy.validate] {report.image}: {len(missing)} missing entries merged into {path}."
+    )
+    return True
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    from core.fake import fake_profile, install
+    from emulating.spec import ProfileSpec
+
+    bpf = install()
+    result_dir = tempfile.mkdtemp()
+    spec = ProfileSpec.model_validate(
+        {"containers": [{"image": "a", "tag": "1"}, {"image": "b", "tag": "1"}]}
+    )
+    syscalls, caps = fake_profile("a:1")
+    with open(
+        os.path.join(result_dir, "a:1.json"), "w"
+    ) as f:  # Profiled window missed 3 syscalls
+        json.dump({"syscalls": syscalls[3:], "capabilities": caps}, f)
+    with open(os.path.join(result_dir, "b:1.json"), "w") as f:
+        json.dump(fake_profile("b:1")[0], f)
+
+    session = MonitoringSession(bpf=bpf, deny=True)
+    reports = PolicyValidator(
+        spec, result_dir, workers=2, duration=0, session=session
+    ).run()
+    a, b = reports["a:1"], reports["b:1"]
+    if sorted(a.denied_syscalls) == syscalls[:3] and not a.denied_caps:
+        print("✅ Syscalls missed by the profile reported as denials")
+    else:
+        print(f"❌ Denials of a:1: {a.to_json()}")
+    if b.passed and os.path.exists(os.path.join(result_dir, "b:1.validation.json")):
+        print("✅ Complete policy passes, reports written")
+    else:
+        print(f"❌ Report of b:1: {b.to_json()}")
+
+    if (
+        merge(result_dir, a)
+        and PolicyValidator(spec, result_dir, duration=0, session=session)
+        .run()["a:1"]
+        .passed
+    ):
+        print("✅ Merged result passes")
+    else:
+        print("❌ Merged result still denied")
+    if not bpf["denials"].items() and not bpf["event"].items():
+        print("✅ Entries forgotten after validation")
+    else:
+        print("❌ Entries left in the maps")
+
+    print("\n== Test passed ==")
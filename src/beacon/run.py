@@ -1,90 +1,46 @@
 #!/usr/bin/python3
-# Last Modified at Aug 10, 2025
+# Last Modified at Oct 19, 2026
 
 """@file run.py
-@brief  Running BeaCon with configuration
+@brief  Running BeaCon with a profile spec
 @author Haney Kang
 """
-# run_monitoring.py     
-# USAGE: ./run.py <duration> <period> <container_img>
+
+# USAGE: ./run.py <spec.json|spec.yaml> [--count]
 
 import sys
 import os
-import sched
-import time
 import logging
 
-from util.BPF import RobustBPF
-from util.container import Container
-from inst.types import cast_data, Namespace_t
+from pydantic import ValidationError
+
+from emulating.spec import load_spec
+from emulating.runner import BatchRunner
+
 
 def arg_intp(argv):
     if os.geteuid() != 0:
         print("%s: Permission Error" % (argv[0]))
         exit(1)
 
-    if len(argv) < 4 :
-        print("Usage: %s <duration> <period> <container_img>" % (argv[0]))
+    if len(argv) < 2:
+        print("Usage: %s <spec.json|spec.yaml> [--count]" % (argv[0]))
         exit(1)
-    
+
     try:
-        duration = int(argv[1])
-        period = int(argv[2])
-        if duration < period: raise ValueError
-    except ValueError:
-        print("Usage: %s <duration> <period> <container_img>" % (argv[0]))
-        print("Invalid value of <duration> and <period>")
+        spec = load_spec(argv[1])
+    except (OSError, ValueError, ValidationError) as e:
+        print("Usage: %s <spec.json|spec.yaml> [--count]" % (argv[0]))
+        print("Invalid spec: %s" % (e))
         exit(1)
 
-    return duration, period, argv[3]
-
-def read_data(init_time, data, container):
-    print("-- %f elasped --" % (time.time() - init_time))
-
-    if not container.isAlive(): return
-
-    ns = Namespace_t(**container.namespace())
-
-    ev = cast_data(data)[ns]
-    print(ev.syslist)
+    return spec, "--count" in argv[2:]
 
-def count_data(data, container):
-    if not container.isAlive(): return
-
-    ns = Namespace_t(**container.namespace())
-    syslist = cast_data(data)[ns].syslist
-    caplist = cast_data(data)[ns].caplist
-
-    print(len(syslist), len(caplist))
 
 if __name__ == "__main__":
-    logging.basicConfig(filename='log', level=logging.INFO)
-
-#    load_config(
-    duration, period, img_name = arg_intp(sys.argv)
-    
-    b = RobustBPF(src_file = "./inst/monitor.c")
-    data = b['event']
-
-    if len(sys.argv) > 5:
-        opt_num = int(sys.argv[4])
-        container = Container(img_name, opts = sys.argv[5:5 + opt_num], args = sys.argv[5+opt_num:])
-    else:
-        container = Container(img_name)
-
-    # Global scheduler for time sequential operation
-    s = sched.scheduler(time.time, time.sleep)
-
-    # Basis init time
-    init_time = time.time()
-    
-    # Monitoring operation registration
-    for delay in range(period, duration + 1, period):
-        s.enter(delay, 0, read_data, argument=(init_time, data, container,))
-
-    # Container operation registration
-    s.enter(0, 0, container.start)
-    s.enter(duration, 1, count_data, argument=(data, container,))
-    s.enter(duration, 2, container.terminate)
+    logging.basicConfig(filename="log", level=logging.INFO)
 
-    s.run()
+    spec, count = arg_intp(sys.argv)
+    results = BatchRunner(spec, count=count).run()
+    for ref, ev in results.items():
+        print(ref, "-" if ev is None else len(ev.syscalls()))
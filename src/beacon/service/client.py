@@ -0,0 +1,194 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file client.py
+@brief  Client of the profiling daemon API (service.server)
+@author Haney Kang
+"""
+
+import json
+import socket
+from http.client import HTTPConnection
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.container import split_reference
+
+
+class UnixHTTPConnection(HTTPConnection):
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class APIError(Exception):
+    def __init__(self, status: int, body: Any):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class Client:
+    """
+    @class Client
+    @brief Submit jobs to a daemon and follow them, over a unix socket or TCP.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        address: Optional[str] = None,
+        timeout: float = 30,
+        token: Optional[str] = None,
+    ):
+        """
+        @param socket_path  Unix socket of the daemon.
+        @param address      "host:port" of the daemon (if no socket_path).
+        @param timeout      Socket timeout of plain requests (streams do not time out).
+        @param token        Shared token of a TCP daemon (`daemon --token-file`).
+        """
+        if socket_path is None and address is None:
+            raise ValueError("Either socket_path or address is required")
+        self.socket_path = socket_path
+        self.address = address
+        self.timeout = timeout
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def _connect(self, timeout: Optional[float]) -> HTTPConnection:
+        if self.socket_path is not None:
+            return UnixHTTPConnection(self.socket_path, timeout)
+        host, _, port = self.address.rpartition(":")
+        return HTTPConnection(host or "127.0.0.1", int(port), timeout=timeout)
+
+    def _request(self, method: str, path: str, body: Any = None) -> Any:
+        conn = self._connect(self.timeout)
+        try:
+            data = json.dumps(body).encode() if body is not None else None
+            headers = dict(self.headers)
+            if data is not None:
+                headers["Content-Type"] = "application/json"
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+            payload = json.loads(resp.read() or b"null")
+            if resp.status >= 400:
+                raise APIError(resp.status, payload)
+            return payload
+        finally:
+            conn.close()
+
+    def submit(self, image: str, priority: int = 0, **fields) -> str:
+        """
+        @brief Queue a job (fields of service.jobs.JobRequest).
+
+        @return Job id.
+        """
+        image, tag = split_reference(image)
+        body = {"image": image, "tag": tag, "priority": priority, **fields}
+        return self._request("POST", "/jobs", body)["id"]
+
+    def job(self, job_id: str) -> Dict[str, Any]:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/jobs")
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        return self._request("DELETE", f"/jobs/{job_id}")
+
+    def health(self) -> Dict[str, int]:
+        return self._request("GET", "/health")
+
+    def events(self, job_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        @brief Yield status changes of a job until it ends.
+        """
+        conn = self._connect(None)
+        try:
+            conn.request("GET", f"/jobs/{job_id}/events", headers=self.headers)
+            resp = conn.getresponse()
+            if resp.status >= 400:
+                raise APIError(resp.status, json.loads(resp.read() or b"null"))
+            for line in iter(resp.readline, b""):
+                yield json.loads(line)
+        finally:
+            conn.close()
+
+    def wait(self, job_id: str) -> Dict[str, Any]:
+        """
+        @brief Block until a job ends.
+
+        @return Final summary (with "result" if it is done).
+        """
+        for _ in self.events(job_id):
+            pass
+        return self.job(job_id)
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import tempfile
+    from threading import Thread
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from core.fake import fake_profile
+    from service.server import Daemon, make_server
+
+    print("== Testing daemon with fake Docker and BPF ==")
+    tmp = tempfile.mkdtemp()
+    sock = os.path.join(tmp, "beacon.sock")
+    daemon = Daemon(workers=1, result_dir=os.path.join(tmp, "result"), fake=True)
+    server = make_server(daemon, socket_path=sock)
+    Thread(target=server.serve_forever, daemon=True).start()
+    client = Client(sock)
+
+    # One worker: the first job occupies it, the rest run by priority
+    first = client.submit("alpine:3", duration_sec=1)
+    low = client.submit("redis:7", priority=0, duration_sec=1)
+    high = client.submit("nginx:latest", priority=10, duration_sec=1)
+    dropped = client.submit("httpd:2", priority=-1, duration_sec=1)
+    assert client.cancel(dropped)["state"] == "cancelled"
+    print(f"✅ Queued and cancelled: {client.health()}")
+
+    statuses = [event["status"] for event in client.events(first)]
+    assert statuses == [
+        "queued",
+        "running",
+        "started",
+        "ready",
+        "monitoring",
+        "collected",
+        "done",
+    ], statuses
+    print(f"✅ Streamed: {statuses}")
+
+    results = {job_id: client.wait(job_id) for job_id in (low, high)}
+    for job_id, summary in results.items():
+        assert summary["state"] == "done", summary
+        assert summary["result"]["syscalls"] == fake_profile(summary["image"])[0]
+    started = {
+        job_id: next(
+            e["time"] for e in client.events(job_id) if e["status"] == "running"
+        )
+        for job_id in (low, high)
+    }
+    assert started[high] <= started[low], started
+    assert os.path.exists(os.path.join(tmp, "result", "nginx:latest.json"))
+    assert len(daemon.session.bpf["event"]) == 0  # Entries are released after each job
+    print("✅ Priority order, results and map cleanup")
+
+    try:
+        client._request("POST", "/jobs", {"tag": "latest"})
+        raise AssertionError("Invalid job accepted")
+    except APIError as e:
+        assert e.status == 400
+    print("✅ Invalid request rejected")
+
+    server.shutdown()
+    daemon.close()
+    print("== Test passed ==")
@@ -0,0 +1,383 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file coordinator.py
+@brief  Shard a sweep over several profiling daemons (service.server)
+@author Haney Kang
+
+@details
+Each worker host runs `beacon daemon --listen HOST:PORT --token-file FILE`, and the
+coordinator sends the same token. Create kwargs of stable_args.json are sent as spec
+options (an image needing others, e.g. host_config, fails). The coordinator keeps as
+many jobs in flight on a worker as it has job slots, and a free slot pulls the
+longest pending image (by runtime observed in previous sweeps), so that long
+images start first and short ones fill the gaps (LPT). A failed job is retried on
+another worker, and a worker that stops answering is dropped along with its slots.
+Results from all workers are merged into one result directory:
+
+    <result_dir>/<image>.json      Syscall numbers (as baseline.sweep writes them)
+    <result_dir>/sweep.json        {image: record with host, runtime and attempts}
+    <result_dir>/runtimes.json     Observed runtime per image, seeds the next sweep
+"""
+
+import os
+import sys
+import json
+import shlex
+import logging
+import tempfile
+import subprocess
+from http.client import HTTPException
+from threading import Condition, Thread
+from time import sleep, time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.container import result_name
+from service.client import APIError, Client
+
+HOST_ERRORS = 2  # Connection errors (since its last success) before a worker is dropped
+EWMA = 0.5  # Weight of the latest runtime in runtimes.json
+
+
+def spec_options(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    @brief Spec options (emulating.spec.ContainerOptions) of create kwargs of stable_args.json.
+
+    @throws ValueError on kwargs without an option (e.g. host_config), which workers refuse.
+    """
+    options: Dict[str, Any] = {}
+    for key, value in kwargs.items():
+        if key == "environment" and isinstance(value, dict):
+            options[key] = [f"{k}={v}" for k, v in value.items()]
+        elif key == "command" and isinstance(value, str):
+            options[key] = shlex.split(value)
+        elif key in ("environment", "command", "tty"):
+            options[key] = value
+        elif key == "stdin_open":
+            options["interactive"] = value
+        else:
+            raise ValueError(f"Create kwarg {key!r} is not a spec option")
+    return options
+
+
+class Task:
+    def __init__(self, image: str, options: Dict[str, Any], estimate: float):
+        self.image = image
+        self.options = options
+        self.estimate = estimate
+        self.attempts = 0
+        self.tried: Set[str] = set()
+        self.errors: List[str] = []
+
+
+class Coordinator:
+    """
+    @class Coordinator
+    @brief Pull-based LPT scheduling of images over worker daemons, with retries.
+    """
+
+    def __init__(
+        self,
+        workers: List[str],
+        result_dir: str = "result",
+        duration: int = 60,
+        max_attempts: int = 3,
+        token: Optional[str] = None,
+    ):
+        """
+        @param workers      "host:port" of each worker daemon.
+        @param result_dir   Merged result directory.
+        @param duration     Monitoring window of each image in seconds.
+        @param max_attempts Attempts of an image before it is reported as failed.
+        @param token        Shared token of the workers (`daemon --token-file`).
+        """
+        self.workers = workers
+        self.result_dir = result_dir
+        self.duration = duration
+        self.max_attempts = max_attempts
+        self.token = token
+        self.runtimes_file = os.path.join(result_dir, "runtimes.json")
+        self.runtimes: Dict[str, float] = {}
+        if os.path.exists(self.runtimes_file):
+            with open(self.runtimes_file) as f:
+                self.runtimes = json.load(f)
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, List[str]] = {}
+        self._pending: List[Task] = []
+        self._alive: Set[str] = set()
+        self._host_errors: Dict[str, int] = {}
+        self._inflight = 0
+        self._cond = Condition()
+
+    def estimate(self, image: str) -> float:
+        """Expected runtime of an image: observed before, or the mean of observed ones."""
+        if image in self.runtimes:
+            return self.runtimes[image]
+        if self.runtimes:
+            return sum(self.runtimes.values()) / len(self.runtimes)
+        return float(self.duration)
+
+    def run(self, images: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        @brief Profile every image on the workers and merge the results.
+
+        @param  images  {image: create kwargs} (e.g. stable_args.json).
+        @return {image: record} of the profiled images (failures are in `self.failed`).
+        """
+        os.makedirs(self.result_dir, exist_ok=True)
+        tasks = []
+        for image, kwargs in images.items():
+            try:
+                tasks.append(Task(image, spec_options(kwargs), self.estimate(image)))
+            except ValueError as e:
+                logging.warning(f"[service.coordinator] {image} skipped: {e}")
+                self.failed[image] = [str(e)]
+        self._pending = sorted(tasks, key=lambda task: -task.estimate)
+        threads = []
+        for address in self.workers:
+            try:
+                client = Client(address=address, timeout=5, token=self.token)
+                slots = client.health()["workers"]
+            except (OSError, HTTPException, APIError) as e:
+                logging.warning(
+                    f"[service.coordinator] Worker {address} unavailable: {e}"
+                )
+                continue
+            self._alive.add(address)
+            threads += [
+                Thread(target=self._slot, args=(address,), daemon=True)
+                for _ in range(slots)
+            ]
+        if not self._alive:
+            raise RuntimeError("No worker available")
+
+        init_time = time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for task in self._pending:  # Left over when every worker has been dropped
+            self.failed[task.image] = task.errors + ["no worker left"]
+
+        self._save()
+        logging.info(
+            f"[service.coordinator] {len(self.results)} profiled, {len(self.failed)} failed "
+            f"in {time() - init_time:.1f}s on {len(self.workers)} workers"
+        )
+        return self.results
+
+    def _take(self, host: str) -> Optional[Task]:
+        """
+        @brief Next task for a free slot of `host`, waiting while others may still fail over.
+
+        A task is not retried on a worker which already failed it, unless no other
+        worker is left.
+        """
+        with self._cond:
+            while host in self._alive:
+                for i, task in enumerate(self._pending):
+                    if host not in task.tried or not (self._alive - task.tried):
+                        self._inflight += 1
+                        return self._pending.pop(i)
+                if self._inflight == 0:
+                    return None
+                self._cond.wait()
+            return None
+
+    def _slot(self, host: str):
+        client = Client(address=host, token=self.token)
+        while True:
+            task = self._take(host)
+            if task is None:
+                return
+            task.attempts += 1
+            task.tried.add(host)
+            try:
+                record = self._profile(client, task)
+            except (OSError, HTTPException) as e:  # Worker unreachable or disconnected
+                self._retry(task, f"{host}: {e}", unreachable=host)
+                continue
+            except (APIError, RuntimeError) as e:  # The job itself failed
+                # A rejected request (e.g. host_config in its kwargs) fails on every worker
+                rejected = isinstance(e, APIError) and e.status == 400
+                self._retry(task, f"{host}: {e}", final=rejected)
+                continue
+            record["host"] = host
+            record["attempts"] = task.attempts
+            self._finish(task, record)
+
+    def _profile(self, client: Client, task: Task) -> Dict[str, Any]:
+        job_id = client.submit(
+            task.image, options=task.options, duration_sec=self.duration
+        )
+        times = {}
+        for event in client.events(job_id):
+            times[event["status"]] = event["time"]
+        summary = client.job(job_id)
+        if summary["state"] != "done":
+            raise RuntimeError(summary.get("error") or summary["state"])
+        record = summary["result"]
+        record["runtime"] = round(
+            times["done"] - times.get("running", times["done"]), 3
+        )
+        return record
+
+    def _retry(
+        self,
+        task: Task,
+        error: str,
+        unreachable: Optional[str] = None,
+        final: bool = False,
+    ):
+        logging.warning(
+            f"[service.coordinator] {task.image} attempt {task.attempts} failed: {error}"
+        )
+        task.errors.append(error)
+        with self._cond:
+            self._inflight -= 1
+            if unreachable is not None:
+                self._host_errors[unreachable] = (
+                    self._host_errors.get(unreachable, 0) + 1
+                )
+                if (
+                    self._host_errors[unreachable] >= HOST_ERRORS
+                    and unreachable in self._alive
+                ):
+                    logging.warning(
+                        f"[service.coordinator] Dropping worker {unreachable}"
+                    )
+                    self._alive.discard(unreachable)
+            if final or task.attempts >= self.max_attempts:
+                self.failed[task.image] = task.errors
+            else:
+                self._pending.insert(0, task)  # Retry before shorter images
+            self._cond.notify_all()
+
+    def _finish(self, task: Task, record: Dict[str, Any]):
+        with open(
+            os.path.join(self.result_dir, f"{result_name(task.image)}.json"), "w"
+        ) as f:
+            json.dump(record["syscalls"], f, indent=4)
+        with self._cond:
+            self._inflight -= 1
+            self._host_errors[record["host"]] = 0
+            self.results[task.image] = record
+            previous = self.runtimes.get(task.image)
+            runtime = record["runtime"]
+            self.runtimes[task.image] = (
+                runtime if previous is None else EWMA * runtime + (1 - EWMA) * previous
+            )
+            self._cond.notify_all()
+
+    def _save(self):
+        for path, body in (
+            (
+                os.path.join(self.result_dir, "sweep.json"),
+                {"results": self.results, "failed": self.failed},
+            ),
+            (self.runtimes_file, self.runtimes),
+        ):
+            tmp = path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(body, f, indent=4)
+            os.replace(tmp, path)
+
+
+def spawn_workers(
+    count: int, fake: bool = True, workers: int = 2, token_file: Optional[str] = None
+) -> Tuple[List[subprocess.Popen], List[str]]:
+    """
+    @brief Start local daemons standing in for worker hosts, on ephemeral ports.
+
+    @param  count       Number of daemons.
+    @param  fake        Run them on core.fake backends.
+    @param  workers     Job slots of each daemon.
+    @param  token_file  Token the daemons require (`daemon --token-file`).
+    @return (processes, addresses)
+    @throws RuntimeError if a daemon exits before serving.
+    """
+    cli = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cli.py"
+    )
+    procs, addresses = [], []
+    for _ in range(count):
+        cmd = [sys.executable, cli, "daemon", "--listen", "127.0.0.1:0"]
+        cmd += ["--workers", str(workers)]
+        cmd += ["--result-dir", tempfile.mkdtemp(prefix="beacon-worker-")]
+        if token_file is not None:
+            cmd += ["--token-file", token_file]
+        if fake:
+            cmd.append("--fake")
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        procs.append(proc)
+        for line in proc.stderr:  # The daemon logs the address it is bound to
+            if "Serving on " in line:
+                addresses.append(line.split("Serving on ", 1)[1].strip())
+                break
+        else:
+            raise RuntimeError(f"Worker daemon exited with {proc.wait()}")
+        Thread(target=proc.stderr.read, daemon=True).start()  # Keep the pipe drained
+    return procs, addresses
+
+
+if __name__ == "__main__":
+    import socket
+
+    from core.fake import fake_profile
+
+    logging.basicConfig(level=logging.WARNING)
+    print("== Testing coordinator with 3 local fake workers ==")
+    result_dir = tempfile.mkdtemp()
+    token_file = os.path.join(result_dir, "token")
+    with open(token_file, "w") as f:
+        f.write("secret\n")
+    procs, addresses = spawn_workers(3, token_file=token_file)
+    closed = socket.socket()  # Bound but not listening: a worker refusing connections
+    closed.bind(("127.0.0.1", 0))
+    images = {f"image{i}:latest": {} for i in range(12)}
+    images["docker:latest"] = {"host_config": {"Privileged": True}}
+    coordinator = Coordinator(
+        addresses + ["127.0.0.1:{}".format(closed.getsockname()[1])],
+        result_dir,
+        duration=1,
+        token="secret",
+    )
+
+    try:
+        Client(address=addresses[0]).health()
+        assert False, "Request without a token accepted"
+    except APIError as e:
+        assert e.status == 401, e
+    print("✅ Request without a token refused")
+
+    def kill_when_busy():  # A worker disappears with a job in flight: it must be retried
+        client = Client(address=addresses[0], token="secret")
+        while not any(job["state"] == "running" for job in client.jobs()):
+            sleep(0.01)
+        procs[0].kill()
+
+    killer = Thread(target=kill_when_busy, daemon=True)
+    killer.start()
+    results = coordinator.run(images)
+    killer.join()
+    for p in procs:
+        p.kill()
+    closed.close()
+
+    assert set(results) == set(images) - {"docker:latest"}, coordinator.failed
+    assert list(coordinator.failed) == ["docker:latest"], coordinator.failed
+    for image, record in results.items():
+        assert record["syscalls"] == fake_profile(image)[0], image
+        assert os.path.exists(os.path.join(result_dir, f"{image}.json"))
+    hosts = {record["host"] for record in results.values()}
+    retried = [image for image, record in results.items() if record["attempts"] > 1]
+    print(f"✅ {len(results)} images merged from {sorted(hosts)}, retried: {retried}")
+    assert retried, "Killed worker had no job in flight"
+    print("✅ host_config of docker:latest not sent to the workers")
+
+    rerun = Coordinator([], result_dir)
+    assert set(rerun.runtimes) == set(results)
+    print("✅ Runtimes recorded for the next sweep")
+    print("== Test passed ==")
@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file jobs.py
+@brief  Priority job queue of the profiling daemon
+@author Haney Kang
+
+@details
+A job is one container to profile (a ContainerEntry plus a priority and the create
+kwargs of stable_args.json which do not reach the host). Jobs wait in a heap ordered
+by (-priority, submission order) and a fixed number of worker threads take them,
+which bounds the number of concurrently profiled containers. Each job keeps the history of its status changes so that
+clients can follow it.
+"""
+
+import heapq
+import logging
+from itertools import count
+from threading import Condition, Lock, Thread
+from time import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from emulating.spec import ContainerEntry
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = (
+    "queued",
+    "running",
+    "done",
+    "failed",
+    "cancelled",
+)
+STATES = (QUEUED, RUNNING, DONE, FAILED, CANCELLED)
+TERMINAL = (DONE, FAILED, CANCELLED)
+
+
+class CreateKwargs(BaseModel):
+    """
+    Create kwargs of stable_args.json accepted besides the spec options. Anything which
+    reaches the host (host_config: privileges, binds, devices...) is rejected.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
+    command: Optional[Union[str, List[str]]] = None
+    environment: Optional[Union[List[str], Dict[str, str]]] = None
+    stdin_open: Optional[bool] = None
+    tty: Optional[bool] = None
+
+
+class JobRequest(ContainerEntry):
+    """Body of `POST /jobs`: a spec container entry, plus scheduling and create kwargs."""
+
+    priority: int = 0  # Higher runs first
+    kwargs: CreateKwargs = Field(default_factory=CreateKwargs)  # Over the options
+
+    def create_kwargs(self) -> Dict[str, Any]:
+        return {
+            **self.options.create_kwargs(),
+            **self.kwargs.model_dump(exclude_none=True),
+        }
+
+
+class Job:
+    """
+    @class Job
+    @brief One submitted request with its status history and result.
+    """
+
+    def __init__(self, job_id: str, request: JobRequest):
+        self.id = job_id
+        self.request = request
+        self.state = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.history: List[Dict[str, Any]] = []
+        self._cond = Condition()
+        self.update(QUEUED)
+
+    def update(self, status: str):
+        """
+        @brief Append a status: a state, or a step within RUNNING (e.g. "ready").
+        """
+        with self._cond:
+            if status in STATES:
+                self.state = status
+            self.history.append({"time": round(time(), 3), "status": status})
+            self._cond.notify_all()
+
+    def events(self, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        @brief Yield every status, including future ones, until the job ends.
+
+        @param timeout  Give up after waiting that long for a new status.
+        """
+        sent = 0
+        while True:
+            with self._cond:
+                if sent == len(self.history) and self.state not in TERMINAL:
+                    self._cond.wait(timeout)
+                pending = self.history[sent:]
+                finished = self.state in TERMINAL
+            yield from pending
+            sent += len(pending)
+            if finished or (not pending and timeout is not None):
+                return
+
+    def summary(self) -> Dict[str, Any]:
+        body = {
+            "id": self.id,
+            "image": self.request.ref,
+            "priority": self.request.priority,
+            "state": self.state,
+            "status": self.history[-1]["status"],
+        }
+        if self.error is not None:
+            body["error"] = self.error
+        if self.result is not None:
+            body["result"] = self.result
+        return body
+
+
+class JobQueue:
+    """
+    @class JobQueue
+    @brief Priority queue served by `workers` threads calling `execute(job)`.
+    """
+
+    def __init__(self, execute: Callable[[Job], Dict[str, Any]], workers: int = 4):
+        """
+        @param execute  Profiles a job and returns its result record (raises on failure).
+        @param workers  Maximum number of jobs running at once.
+        """
+        self.execute = execute
+        self.workers = workers
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List[Any] = []
+        self._seq = count()
+        self._cond = Condition(Lock())
+        self._running = 0
+        self._closed = False
+        self._threads = [Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, request: JobRequest) -> Job:
+        seq = next(self._seq)
+        job = Job(f"{seq:06d}", request)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job queue is closed")
+            self.jobs[job.id] = job
+            heapq.heappush(self._heap, (-request.priority, seq, job))
+            self._cond.notify()
+        logging.info(
+            f"[service.jobs] Job {job.id} queued: {request.ref} (priority {request.priority})"
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        @brief Cancel a queued job. Running jobs are not interrupted.
+
+        @return True if the job has been cancelled.
+        """
+        with self._cond:
+            job = self.jobs.get(job_id)
+            if job is None or job.state != QUEUED:
+                return False
+            job.update(CANCELLED)  # Skipped when popped
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            queued = sum(1 for _, _, job in self._heap if job.state == QUEUED)
+            return {"workers": self.workers, "queued": queued, "running": self._running}
+
+    def close(self, wait: bool = True):
+        """
+        @brief Stop accepting jobs. Queued jobs are cancelled, running ones finish if `wait`.
+        """
+        with self._cond:
+            self._closed = True
+            for _, _, job in self._heap:
+                if job.state == QUEUED:
+                    job.update(CANCELLED)
+            self._heap.clear()
+            self._cond.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+                if job.state != QUEUED:
+                    continue
+                job.update(RUNNING)
+                self._running += 1
+            try:
+                job.result = self.execute(job)
+                job.update(DONE)
+            except Exception as e:
+                logging.error(
+                    f"[service.jobs] Job {job.id} ({job.request.ref}) failed: {e}"
+                )
+                job.error = str(e)
+                job.update(FAILED)
+            finally:
+                with self._cond:
+                    self._running -= 1
@@ -0,0 +1,341 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file server.py
+@brief  Long-running profiling daemon with an HTTP job API
+@author Haney Kang
+
+@details
+The daemon loads inst.c once and keeps it loaded; every job reads its container's
+entry from that session and deletes it afterwards. The probes are detached while no
+job runs (--always-on keeps them attached). The API is served on a unix
+socket (mode 0600, since a job starts arbitrary containers) or on a TCP address.
+A TCP listener checks a shared token (`Authorization: Bearer <token>`), which is
+required unless it is bound to loopback, and accepts only the validated spec options
+of a job (create `kwargs` are refused):
+
+    POST   /jobs              JobRequest JSON -> 202 {"id": ...}
+    GET    /jobs              Summaries of all jobs
+    GET    /jobs/<id>         Summary, with the result once done
+    GET    /jobs/<id>/events  Status changes as NDJSON, streamed until the job ends
+    DELETE /jobs/<id>         Cancel a queued job
+    GET    /health            {"workers", "queued", "running"[, "limit" of the governor]}
+"""
+
+import os
+import hmac
+import json
+import signal
+import ipaddress
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from contextlib import nullcontext
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import ValidationError
+
+from core.container import result_name
+from core.governor import Governor
+from emulating.runner import run_container
+from monitoring.agent import MonitoringSession
+from service.jobs import Job, JobQueue, JobRequest
+
+MAX_BODY = 1 << 20
+
+
+class Daemon:
+    """
+    @class Daemon
+    @brief One MonitoringSession and the job queue profiling containers with it.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        result_dir: str = "result",
+        count: bool = False,
+        period: Optional[float] = None,
+        fake: bool = False,
+        governor: Optional[Governor] = None,
+        ondemand: bool = True,
+    ):
+        """
+        @param workers      Maximum number of containers profiled at once.
+        @param result_dir   Directory of `<image>.json` results.
+        @param count        Count calls of each syscall (result "histogram").
+        @param period       Also write `<image>.timeline.json`, sampled every `period` seconds.
+        @param fake         Use core.fake (no Docker, no BPF) instead of the real backends.
+        @param governor     Started governor bounding the jobs run at once below `workers`.
+        @param ondemand     Detach the probes while no job runs (maps are kept).
+        """
+        bpf = None
+        if fake:
+            from core.fake import install
+
+            bpf = install()
+        self.session = MonitoringSession(count, bpf=bpf, ondemand=ondemand)
+        self.result_dir = result_dir
+        self.count = count
+        self.period = period
+        self.governor = governor
+        os.makedirs(result_dir, exist_ok=True)
+        self.queue = JobQueue(self.execute, workers)
+
+    def execute(self, job: Job) -> Dict[str, Any]:
+        """
+        @brief Profile the container of a job and write its results.
+
+        @return {"image", "syscalls", "capabilities"[, "histogram"]}
+        @throws RuntimeError if no data has been collected.
+        """
+        req = job.request
+        with (
+            self.governor.slot() if self.governor is not None else nullcontext()
+        ) as slot:
+            ev, timeline = run_container(
+                self.session,
+                req.ref,
+                req.create_kwargs(),
+                req.workloads,
+                req.duration_sec,
+                self.period,
+                on_status=job.update,
+                init=req.init,
+                slot=slot,
+            )
+        if ev is None:
+            raise RuntimeError("No data (container died?)")
+
+        record = {"image": req.ref, **ev.profile.to_json()}
+        if self.count:
+            record["histogram"] = ev.histogram()
+        with open(
+            os.path.join(self.result_dir, f"{result_name(req.ref)}.json"), "w"
+        ) as f:
+            json.dump(ev.syscalls(), f, indent=4)
+        if timeline is not None:
+            with open(
+                os.path.join(self.result_dir, f"{result_name(req.ref)}.timeline.json"),
+                "w",
+            ) as f:
+                json.dump(timeline.to_json(), f)
+        return record
+
+    def close(self):
+        self.queue.close()
+        self.session.cleanup()
+        if self.governor is not None:
+            self.governor.stop()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "beacon"
+
+    @property
+    def queue(self) -> JobQueue:
+        return self.server.jobs
+
+    def address_string(self) -> str:
+        if isinstance(self.client_address, tuple) and self.client_address:
+            return str(self.client_address[0])
+        return "unix"  # Peer of a unix socket has no address
+
+    def log_message(self, format: str, *args):
+        logging.info(f"[service.server] {self.address_string()} {format % args}")
+
+    def _route(self) -> Tuple[str, Optional[str], Optional[str]]:
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        return (
+            parts[0] if parts else "",
+            parts[1] if len(parts) > 1 else None,
+            parts[2] if len(parts) > 2 else None,
+        )
+
+    def _send(self, code: int, body: Any):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        """
+        @brief Check the token of a TCP listener, answering 401 if it does not match.
+        """
+        token = self.server.token
+        if token is None:
+            return True
+        scheme, _, given = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme == "Bearer" and hmac.compare_digest(given.encode(), token.encode()):
+            return True
+        self.close_connection = True  # The body, if any, is not read
+        self._send(401, {"error": "Missing or invalid token"})
+        return False
+
+    def _job(self, job_id: Optional[str]) -> Optional[Job]:
+        job = self.queue.get(job_id) if job_id else None
+        if job is None:
+            self._send(404, {"error": f"No such job: {job_id}"})
+        return job
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        resource, job_id, sub = self._route()
+        if resource == "health":
+            stats = self.queue.stats()
+            governor = self.server.governor
+            if governor is not None:
+                stats["limit"] = governor.limit
+            self._send(200, stats)
+        elif resource == "jobs" and job_id is None:
+            self._send(200, [job.summary() for job in list(self.queue.jobs.values())])
+        elif resource == "jobs" and sub is None:
+            job = self._job(job_id)
+            if job is not None:
+                self._send(200, job.summary())
+        elif resource == "jobs" and sub == "events":
+            job = self._job(job_id)
+            if job is not None:
+                self._stream(job)
+        else:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        resource, job_id, _ = self._route()
+        if resource != "jobs" or job_id is not None:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self._send(413, {"error": "Request too large"})
+            return
+        try:
+            request = JobRequest.model_validate_json(self.rfile.read(length))
+        except ValidationError as e:
+            self._send(400, {"error": json.loads(e.json(include_url=False))})
+            return
+        if self.server.tcp and request.kwargs.model_dump(exclude_none=True):
+            self._send(
+                400, {"error": "Create kwargs are refused over TCP, use options"}
+            )
+            return
+        try:
+            job = self.queue.submit(request)
+        except RuntimeError as e:
+            self._send(503, {"error": str(e)})
+            return
+        self._send(202, {"id": job.id})
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+        resource, job_id, _ = self._route()
+        if resource != "jobs" or job_id is None:
+            self._send(404, {"error": f"Unknown path: {self.path}"})
+            return
+        job = self._job(job_id)
+        if job is None:
+            return
+        if self.queue.cancel(job.id):
+            self._send(200, job.summary())
+        else:
+            self._send(409, {"error": f"Job is {job.state}", "state": job.state})
+
+    def _stream(self, job: Job):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for event in job.events():
+                line = (json.dumps(event) + "\n").encode()
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)  # Stale socket of a previous run
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+
+def is_loopback(host: str) -> bool:
+    """True if `host` (address or name) of a listener is only reachable locally."""
+    if host in ("", "localhost"):
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+def make_server(
+    daemon: Daemon,
+    socket_path: Optional[str] = None,
+    listen: Optional[str] = None,
+    token: Optional[str] = None,
+):
+    """
+    @brief Bind the API of a daemon to a unix socket or to "host:port".
+
+    @param  token   Shared token of a TCP listener (required off loopback).
+    @return socketserver instance (call serve_forever()).
+    @throws ValueError if a non-loopback address is given without a token.
+    """
+    if socket_path is not None:
+        server = UnixHTTPServer(socket_path, Handler)
+        server.token, server.tcp = None, False  # Access is granted by the file mode
+    elif listen is not None:
+        host, _, port = listen.rpartition(":")
+        if not token and not is_loopback(host):
+            raise ValueError(f"Refusing to serve on {listen} without a token")
+        server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+        server.token, server.tcp = token or None, True
+    else:
+        raise ValueError("Either socket_path or listen is required")
+    server.jobs = daemon.queue
+    server.governor = daemon.governor
+    return server
+
+
+def serve(
+    daemon: Daemon,
+    socket_path: Optional[str] = None,
+    listen: Optional[str] = None,
+    token: Optional[str] = None,
+):
+    """
+    @brief Serve the API until interrupted, then drain running jobs and unload the session.
+    """
+    try:
+        server = make_server(daemon, socket_path, listen, token)
+    except (ValueError, OSError):
+        daemon.close()
+        raise
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, signal.default_int_handler)  # Stop like on Ctrl-C
+    address = socket_path or "{}:{}".format(*server.server_address[:2])
+    logging.info(f"[service.server] Serving on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        daemon.close()
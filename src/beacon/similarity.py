@@ -0,0 +1,465 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file similarity.py
+@brief  Find profiled images which behave like a given one (MinHash signatures, LSH buckets).
+@author Haney Kang
+
+@details
+Each profile is a set of elements: syscall n is element n, capability c is element
+SYS_BITS + c. Its MinHash signature holds, for each of `num_perm` random hash
+functions, the minimum hash of its elements, so that two signatures agree on a
+position with probability equal to the Jaccard similarity of the two sets.
+
+Signatures are cut into `bands` bands of `num_perm / bands` rows, and each band is
+a key of its own bucket table. Images sharing at least one bucket are candidates:
+a pair of similarity s becomes one with probability 1 - (1 - s^rows)^bands (about
+0.5 at s = 0.42 with the defaults, 0.99 from s = 0.6). Only candidates are compared
+exactly (core.profile.Profile.jaccard), so a query does not scan the catalog.
+
+The index is built incrementally from `result/*.json` (files newer than their
+entry are re-read) and saved to `result/similarity.json`:
+
+    index = SimilarityIndex.load(path)
+    index.update("result")
+    index.similar("nginx:latest", k=5)
+    category_report(index, load_categories())
+"""
+
+import os
+import json
+import random
+import logging
+from statistics import mean, pstdev
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.profile import CAP_BITS, SYS_BITS, Profile
+
+ANALYSIS_JSON = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tool", "inspector", "analysis.json"
+)
+INDEX_FILE = "similarity.json"
+ELEMENTS = SYS_BITS + CAP_BITS
+EMPTY = (1 << 64) - 1  # Signature value of an empty profile
+NOT_PROFILES = (
+    ".timeline.json",
+    ".validation.json",
+)  # Suffixes of other outputs of an image
+OTHER_FILES = (INDEX_FILE, "sweep.json", "runtimes.json")  # service.coordinator outputs
+
+
+def elements(profile: Profile) -> List[int]:
+    """
+    @return Set elements of a profile: syscalls, then capabilities shifted by SYS_BITS.
+    """
+    return list(profile.iter_syscalls()) + [
+        SYS_BITS + cap for cap in profile.iter_capabilities()
+    ]
+
+
+class SimilarityIndex:
+    """
+    @class SimilarityIndex
+    @brief MinHash/LSH index of the profiles of images, with incremental inserts.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        """
+        @param num_perm Hash functions of a signature (estimation error ~ 1/sqrt(num_perm)).
+        @param bands    LSH bands, dividing num_perm. More bands find less similar pairs.
+        @param seed     Seed of the hash functions (signatures of different seeds do not compare).
+        """
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.seed = seed
+        rnd = random.Random(seed)
+        ## The universe is small, so each hash function is a table of random 64-bit values
+        self._hashes = [
+            [rnd.getrandbits(64) for _ in range(ELEMENTS)] for _ in range(num_perm)
+        ]
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [
+            {} for _ in range(bands)
+        ]
+        self.profiles: Dict[str, Profile] = {}
+        self.signatures: Dict[str, List[int]] = {}
+        self.mtimes: Dict[str, float] = {}  # {image: mtime of its result file}
+
+    def signature(self, profile: Profile) -> List[int]:
+        elems = elements(profile)
+        if not elems:
+            return [EMPTY] * self.num_perm
+        return [min(map(table.__getitem__, elems)) for table in self._hashes]
+
+    def _bands(self, signature: List[int]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows : (band + 1) * self.rows])
+
+    def add(self, image: str, profile: Profile, signature: Optional[List[int]] = None):
+        """
+        @brief Insert or replace the profile of an image.
+        """
+        if image in self.profiles:
+            self.remove(image)
+        signature = signature or self.signature(profile)
+        self.profiles[image] = profile
+        self.signatures[image] = signature
+        for band, key in self._bands(signature):
+            self._buckets[band].setdefault(key, set()).add(image)
+
+    def remove(self, image: str):
+        signature = self.signatures.pop(image, None)
+        if signature is None:
+            return
+        del self.profiles[image]
+        self.mtimes.pop(image, None)
+        for band, key in self._bands(signature):
+            bucket = self._buckets[band][key]
+            bucket.discard(image)
+            if not bucket:
+                del self._buckets[band][key]
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def __contains__(self, image: str) -> bool:
+        return image in self.profiles
+
+    def estimate(self, a: List[int], b: List[int]) -> float:
+        """
+        @return Jaccard similarity estimated from two signatures.
+        """
+        return sum(x == y for x, y in zip(a, b)) / self.num_perm
+
+    def candidates(self, signature: List[int]) -> Set[str]:
+        """
+        @return Images sharing at least one LSH bucket with a signature.
+        """
+        found: Set[str] = set()
+        for band, key in self._bands(signature):
+            found |= self._buckets[band].get(key, set())
+        return found
+
+    def query(
+        self, profile: Profile, k: int = 10, threshold: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        @brief Approximate nearest neighbors of a profile.
+
+        @param  k           Maximum number of neighbors.
+        @param  threshold   Minimum Jaccard similarity.
+        @return [(image, Jaccard similarity)], most similar first.
+        """
+        scored = [
+            (image, profile.jaccard(self.profiles[image]))
+            for image in self.candidates(self.signature(profile))
+        ]
+        scored = [(image, score) for image, score in scored if score >= threshold]
+        return sorted(scored, key=lambda item: (-item[1], item[0]))[:k]
+
+    def similar(
+        self, image: str, k: int = 10, threshold: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        @brief Indexed images behaving like an indexed image (itself excluded).
+
+        @throws KeyError if the image is not indexed.
+        """
+        profile = self.profiles[image]
+        return [
+            item for item in self.query(profile, k + 1, threshold) if item[0] != image
+        ][:k]
+
+    def clusters(self, threshold: float = 0.7) -> List[List[str]]:
+        """
+        @brief Groups of images linked by pairs of similarity >= threshold (single linkage).
+
+        Only pairs sharing a bucket are compared, so the cost follows the bucket sizes.
+
+        @return Clusters of at least two images, largest first.
+        """
+        parent = {image: image for image in self.profiles}
+
+        def find(image: str) -> str:
+            while parent[image] != image:
+                parent[image] = parent[parent[image]]
+                image = parent[image]
+            return image
+
+        compared: Set[Tuple[str, str]] = set()
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                members = sorted(bucket)
+                for i, a in enumerate(members):
+                    for b in members[i + 1 :]:
+                        if (a, b) in compared or find(a) == find(b):
+                            continue
+                        compared.add((a, b))
+                        if self.profiles[a].jaccard(self.profiles[b]) >= threshold:
+                            parent[find(a)] = find(b)
+        groups: Dict[str, List[str]] = {}
+        for image in self.profiles:
+            groups.setdefault(find(image), []).append(image)
+        return sorted(
+            (sorted(group) for group in groups.values() if len(group) > 1),
+            key=lambda g: (-len(g), g),
+        )
+
+    def update(self, result_dir: str) -> List[str]:
+        """
+        @brief Index the results which are new or changed since they were indexed.
+
+        @return Images (re)indexed.
+        """
+        changed = []
+        for name in sorted(os.listdir(result_dir)):
+            if (
+                not name.endswith(".json")
+                or name.endswith(NOT_PROFILES)
+                or name in OTHER_FILES
+            ):
+                continue
+            path = os.path.join(result_dir, name)
+            image = name[: -len(".json")]
+            mtime = os.path.getmtime(path)
+            if self.mtimes.get(image) == mtime:
+                continue
+            try:
+                with open(path) as f:
+                    profile = Profile.from_json(json.load(f))
+            except (ValueError, IndexError, AttributeError, TypeError) as e:
+                logging.warning(f"[similarity] {path} is not a profile, skipped: {e}")
+                continue
+            self.add(image, profile)
+            self.mtimes[image] = mtime
+            changed.append(image)
+        return changed
+
+    def save(self, path: str):
+        body = {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "seed": self.seed,
+            "images": {
+                image: {
+                    "mtime": self.mtimes.get(image),
+                    "profile": profile.to_json(),
+                    "signature": self.signatures[image],
+                }
+                for image, profile in self.profiles.items()
+            },
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(body, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, **params) -> "SimilarityIndex":
+        """
+        @brief Load a saved index, or create an empty one (with `params`) if the file is missing.
+        """
+        if not os.path.exists(path):
+            return cls(**params)
+        with open(path) as f:
+            body = json.load(f)
+        index = cls(body["num_perm"], body["bands"], body["seed"])
+        for image, entry in body["images"].items():
+            index.add(image, Profile.from_json(entry["profile"]), entry["signature"])
+            if entry.get("mtime") is not None:
+                index.mtimes[image] = entry["mtime"]
+        return index
+
+
+def load_categories(path: str = ANALYSIS_JSON) -> Dict[str, List[str]]:
+    """
+    @brief Categories of the official images (tool/inspector/analysis.json).
+
+    @return {image: [category, ...]}, uncategorized images excluded.
+    """
+    with open(path) as f:
+        analysis = json.load(f)
+    categories: Dict[str, List[str]] = {}
+    for category, body in analysis.items():
+        if category == "None":
+            continue
+        for image in body.get("containers", []):
+            categories.setdefault(image, []).append(category)
+    return categories
+
+
+def suggest_categories(
+    index: SimilarityIndex,
+    profile: Profile,
+    categories: Dict[str, List[str]],
+    k: int = 10,
+    exclude: Optional[str] = None,
+) -> List[Tuple[str, float]]:
+    """
+    @brief Categories of the nearest categorized neighbors, weighted by similarity.
+
+    @param  exclude Indexed image the profile belongs to (not a neighbor of itself).
+    @return [(category, share of the neighbor weight)], most likely first.
+    """
+    votes: Counter = Counter()
+    for image, score in index.query(profile, k + 1):
+        if image == exclude:
+            continue
+        for category in categories.get(image, []):
+            votes[category] += score
+    total = sum(votes.values())
+    return (
+        [(category, weight / total) for category, weight in votes.most_common()]
+        if total
+        else []
+    )
+
+
+def category_report(
+    index: SimilarityIndex, categories: Dict[str, List[str]], z: float = 2.0
+) -> Dict[str, Dict[str, object]]:
+    """
+    @brief Cohesion of each category over the indexed images, and its outliers.
+
+    @param  z   An image is an outlier if its mean similarity to the other members is
+                `z` standard deviations below the category mean.
+    @return {category: {"members", "cohesion" (mean pairwise Jaccard), "medoid", "outliers"}}
+    """
+    members: Dict[str, List[str]] = {}
+    for image, cats in categories.items():
+        if image in index:
+            for category in cats:
+                members.setdefault(category, []).append(image)
+
+    report: Dict[str, Dict[str, object]] = {}
+    for category, images in sorted(members.items()):
+        images = sorted(images)
+        if len(images) < 2:
+            report[category] = {
+                "members": images,
+                "cohesion": None,
+                "medoid": images[0],
+                "outliers": [],
+            }
+            continue
+        closeness = {
+            image: mean(
+                index.profiles[image].jaccard(index.profiles[other])
+                for other in images
+                if other != image
+            )
+            for image in images
+        }
+        cohesion = mean(closeness.values())
+        spread = pstdev(closeness.values())
+        report[category] = {
+            "members": images,
+            "cohesion": round(cohesion, 4),
+            "medoid": max(images, key=lambda image: (closeness[image], image)),
+            "outliers": [
+                image
+                for image in images
+                if len(images) > 3 and closeness[image] < cohesion - z * spread
+            ],
+        }
+    return report
+
+
+if __name__ == "__main__":
+    import tempfile
+    from time import perf_counter
+
+    from core.fake import fake_profile
+
+    rnd = random.Random(0)
+    families = {}
+    index = SimilarityIndex()
+    for family in range(20):  # 20 behaviors, 50 variants each
+        base = set(rnd.sample(range(335), 90))
+        families[family] = base
+        for variant in range(50):
+            syscalls = (base - set(rnd.sample(sorted(base), 5))) | set(
+                rnd.sample(range(335), 5)
+            )
+            index.add(
+                f"f{family}-{variant}:latest", Profile.from_lists(syscalls, [0, 1])
+            )
+
+    init_time = perf_counter()
+    hits = sum(
+        all(
+            image.startswith(f"f{family}-")
+            for image, _ in index.query(Profile.from_lists(families[family]), k=10)
+        )
+        for family in families
+    )
+    per_query = (perf_counter() - init_time) / len(families)
+    if hits == len(families):
+        print(
+            f"✅ Nearest neighbors are of the same family ({per_query * 1e3:.1f} ms/query over {len(index)} images)"
+        )
+    else:
+        print(f"❌ Only {hits}/{len(families)} queries found their family")
+
+    estimate = index.estimate(
+        index.signatures["f0-0:latest"], index.signatures["f0-1:latest"]
+    )
+    exact = index.profiles["f0-0:latest"].jaccard(index.profiles["f0-1:latest"])
+    if abs(estimate - exact) < 0.15:
+        print(
+            f"✅ Signature estimate {estimate:.2f} close to exact Jaccard {exact:.2f}"
+        )
+    else:
+        print(f"❌ Estimate {estimate:.2f}, exact {exact:.2f}")
+
+    clusters = index.clusters(0.7)
+    if len(clusters) == len(families) and all(len(c) == 50 for c in clusters):
+        print("✅ One cluster per family")
+    else:
+        print(f"❌ {len(clusters)} clusters of sizes {[len(c) for c in clusters]}")
+
+    categories = {
+        f"f{family}-{variant}:latest": [f"cat{family % 4}"]
+        for family in range(8)
+        for variant in range(50)
+    }
+    outsider = Profile.from_lists(fake_profile("outsider")[0])
+    index.add("f0-50:latest", outsider)
+    categories["f0-50:latest"] = ["cat0"]
+    report = category_report(index, categories)
+    suggestion = suggest_categories(index, Profile.from_lists(families[5]), categories)
+    if "f0-50:latest" in report["cat0"]["outliers"] and suggestion[0][0] == "cat1":
+        print("✅ Outlier of a category detected, category of a new profile suggested")
+    else:
+        print(f"❌ Outliers {report['cat0']['outliers']}, suggestion {suggestion[:2]}")
+
+    result_dir = tempfile.mkdtemp()
+    for image in ("a:1", "b:1"):
+        with open(os.path.join(result_dir, f"{image}.json"), "w") as f:
+            json.dump(fake_profile(image)[0], f)
+    with open(os.path.join(result_dir, "a:1.validation.json"), "w") as f:
+        json.dump({"passed": True}, f)
+    for name in ("sweep.json", "runtimes.json", "notes.json"):  # Not profiles
+        with open(os.path.join(result_dir, name), "w") as f:
+            json.dump({"a:1": 1.0}, f)
+    path = os.path.join(result_dir, INDEX_FILE)
+    index = SimilarityIndex.load(path)
+    first = index.update(result_dir)
+    index.save(path)
+    index = SimilarityIndex.load(path)
+    with open(os.path.join(result_dir, "c:1.json"), "w") as f:
+        json.dump(fake_profile("c:1")[0], f)
+    second = index.update(result_dir)
+    if (
+        first == ["a:1", "b:1"]
+        and second == ["c:1"]
+        and index.similar("a:1", 5) is not None
+    ):
+        print("✅ Incremental update re-reads new results only, index saved and loaded")
+    else:
+        print(f"❌ Updates {first} then {second}")
+
+    print("\n== Test passed ==")
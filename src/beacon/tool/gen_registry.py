@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+# Last Modified at Oct 19, 2026
+
+"""@file gen_registry.py
+@brief  Generate `event_tables.py` (syscall and capability tables) from Linux uapi headers.
+@author Haney Kang
+
+@details
+The headers are expanded by the C preprocessor (`cpp -dM`) with the macros each
+architecture defines, so conditional and aliased numbers (asm-generic `__NR3264_*`)
+are resolved the way the kernel build does.
+
+USAGE (from src/beacon):
+    python -m tool.gen_registry [--cpp cpp] [--include DIR ...]
+"""
+
+import os
+import re
+import argparse
+import subprocess
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DST = os.path.join(BASE_DIR, "event_tables.py")
+
+## {arch: (header, predefined macros)}
+ARCHES = {
+    "x86_64": ("asm/unistd_64.h", []),
+    "aarch64": (
+        "asm-generic/unistd.h",
+        [
+            "__BITS_PER_LONG=64",
+            "__ARCH_WANT_RENAMEAT",
+            "__ARCH_WANT_NEW_STAT",
+            "__ARCH_WANT_SET_GET_RLIMIT",
+            "__ARCH_WANT_SYS_CLONE3",
+            "__ARCH_WANT_MEMFD_SECRET",
+        ],
+    ),
+    "i386": ("asm/unistd_32.h", []),
+}
+CAP_HEADER = "linux/capability.h"
+
+DEFINE = re.compile(r"^#define (\w+) (.+)$")
+NOT_SYSCALL = {"__NR_syscalls", "__NR_arch_specific_syscall"}
+
+
+def macros(
+    header: str, defines: List[str], cpp: str, includes: List[str]
+) -> Dict[str, str]:
+    """
+    @brief Dump the macros defined after including `header`.
+
+    @return {macro name: replacement text}
+    """
+    cmd = (
+        [cpp, "-dM", "-P"] + [f"-D{d}" for d in defines] + [f"-I{i}" for i in includes]
+    )
+    proc = subprocess.run(
+        cmd + ["-"],
+        input=f"#include <{header}>\n",
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    result = {}
+    for line in proc.stdout.splitlines():
+        m = DEFINE.match(line)
+        if m:
+            result[m.group(1)] = m.group(2).strip()
+    return result
+
+
+def resolve(name: str, table: Dict[str, str]) -> Optional[int]:
+    """
+    @brief Evaluate a macro to an integer following aliases (e.g., __NR_fcntl -> __NR3264_fcntl).
+    """
+    value = table.get(name)
+    for _ in range(8):
+        if value is None:
+            return None
+        value = value.strip("() ")
+        if re.fullmatch(r"\d+", value):
+            return int(value)
+        value = table.get(value)
+    return None
+
+
+def number_table(table: Dict[str, str], prefix: str, exclude=()) -> List[Optional[str]]:
+    """
+    @brief Build the number -> name array of the macros starting with `prefix`.
+    """
+    pairs = {}
+    for macro in table:
+        if not macro.startswith(prefix) or macro in exclude:
+            continue
+        num = resolve(macro, table)
+        if num is not None:
+            pairs[num] = macro
+    array: List[Optional[str]] = [None] * (max(pairs) + 1 if pairs else 0)
+    for num, macro in pairs.items():
+        array[num] = macro
+    return array
+
+
+def _literal(name: Optional[str]) -> str:
+    return "None" if name is None else f'"{name}"'
+
+
+def render(
+    syscalls: Dict[str, List[Optional[str]]], capabilities: List[Optional[str]]
+) -> str:
+    lines = [
+        "#!/usr/bin/python3",
+        "# Generated by tool/gen_registry.py from Linux uapi headers. DO NOT EDIT.",
+        "",
+        '"""@file event_tables.py',
+        "@brief  Number -> name tables of syscalls (per architecture) and capabilities.",
+        '"""',
+        "",
+        "SYSCALLS = {",
+    ]
+    for arch, array in syscalls.items():
+        lines.append(f'    "{arch}": (')
+        for num, name in enumerate(array):
+            lines.append(f"        {_literal(name)},  # {num}")
+        lines.append("    ),")
+    lines.append("}")
+    lines.append("")
+    lines.append("CAPABILITIES = (")
+    for num, name in enumerate(capabilities):
+        lines.append(f"    {_literal(name)},  # {num}")
+    lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cpp", default="cpp")
+    parser.add_argument(
+        "--include", action="append", default=[], help="Extra include directory"
+    )
+    parser.add_argument("--output", default=DST)
+    args = parser.parse_args()
+
+    syscalls = {}
+    for arch, (header, defines) in ARCHES.items():
+        table = macros(header, defines, args.cpp, args.include)
+        array = number_table(table, "__NR_", NOT_SYSCALL)
+        syscalls[arch] = [name[len("__NR_") :] if name else None for name in array]
+        print(f"{arch}: {sum(1 for name in array if name)} syscalls")
+
+    table = macros(CAP_HEADER, [], args.cpp, args.include)
+    capabilities = number_table(table, "CAP_", {"CAP_LAST_CAP"})
+    print(f"capabilities: {sum(1 for name in capabilities if name)}")
+
+    with open(args.output, "w") as f:
+        f.write(render(syscalls, capabilities))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+# Last Modified at Oct 19, 2026
+
+"""@file conftest.py
+@brief  Modules of BeaCon are imported from src/beacon, as when run with `python -m`.
+"""
+
+import os
+import sys
+
+BEACON_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "beacon"
+)
+sys.path.insert(0, BEACON_DIR)
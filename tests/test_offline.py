@@ -0,0 +1,19 @@
+# Last Modified at Oct 19, 2026
+
+"""@file test_offline.py
+@brief  Outputs of the cases of bench.offline, on small fake tables (no timing).
+"""
+
+import argparse
+
+import pytest
+
+from bench.offline import CASES
+
+PARAMS = argparse.Namespace(entries=64, cpus=4, containers=5, images=5)
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_case_output(name):
+    run, check = CASES[name](PARAMS)
+    assert check(run())
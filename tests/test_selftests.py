@@ -0,0 +1,40 @@
+# Last Modified at Oct 19, 2026
+
+"""@file test_selftests.py
+@brief  Self-tests (`__main__` blocks) of the modules which run on core.fake, without root.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+from conftest import BEACON_DIR
+
+MODULES = [
+    "core.governor",
+    "core.journal",
+    "core.profile",
+    "emulating.init",
+    "event_registry",
+    "policy.cbpf",
+    "policy.validate",
+    "service.client",
+    "service.coordinator",
+    "similarity",
+]
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_self_test(module):
+    proc = subprocess.run(
+        [sys.executable, "-m", module],
+        cwd=BEACON_DIR,
+        env={**os.environ, "PYTHONPATH": BEACON_DIR},
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert "❌" not in proc.stdout, proc.stdout